@@ -8,10 +8,11 @@ import sys
 
 import click
 
-from .constants import CX_DIR, KEGG_BEL, KEGG_FILES, PPI_DIR, REACTOME_BEL, REACTOME_FILES, SPIA_DIR, UNIVERSE_DIR, \
-    WIKIPATHWAYS_BEL, WIKIPATHWAYS_FILES
+from .constants import CX_DIR, KEGG_BEL, KEGG_FILES, PPI_DIR, RDF_CACHE, REACTOME_BEL, REACTOME_FILES, SPIA_DIR, \
+    UNIVERSE_DIR, WIKIPATHWAYS_BEL, WIKIPATHWAYS_FILES
 from .export_utils import export_helper, generate_universe, iterate_universe_graphs
 from .kegg.cli import main as kegg_cli
+from .rdf_cache import RdfCache
 from .reactome.cli import main as reactome_cli
 from .wikipathways.cli import main as wikipathways_cli
 
@@ -146,5 +147,25 @@ def universe(
                       specie=specie)
 
 
+@main.group()
+def cache():
+    """Manage the cache of parsed RDF files."""
+
+
+@cache.command()
+@click.option('--max-age', type=int, help='Also remove the files that were not used in this number of days')
+def evict(max_age):
+    """Remove the files that do not exist anymore (e.g., from old releases) from the cache."""
+    evicted = RdfCache().evict(max_age=max_age * 24 * 60 * 60 if max_age is not None else None)
+    click.echo(f'{evicted} files removed from {RDF_CACHE}')
+
+
+@cache.command()
+def clear():
+    """Remove all the files from the cache."""
+    RdfCache().clear()
+    click.echo(f'{RDF_CACHE} was cleared')
+
+
 if __name__ == '__main__':
     main()
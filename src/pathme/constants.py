@@ -26,6 +26,15 @@ def get_data_dir() -> str:
 DATA_DIR = get_data_dir()
 DEFAULT_CACHE_CONNECTION = get_connection()
 
+#: Cache of parsed RDF files
+RDF_CACHE = os.path.join(DATA_DIR, 'rdf_cache.db')
+
+#: Snapshot of the HGNC mappings used to resolve gene identifiers
+HGNC_SNAPSHOT = os.path.join(DATA_DIR, 'hgnc_snapshot.tables')
+
+#: Snapshot of the ChEBI mappings used to resolve chemicals
+CHEBI_SNAPSHOT = os.path.join(DATA_DIR, 'chebi_snapshot.tables')
+
 # Databases contained in PathMe
 #: KEGG
 KEGG = 'kegg'
@@ -39,12 +48,14 @@ REACTOME = 'reactome'
 REACTOME_DIR = os.path.join(DATA_DIR, REACTOME)
 REACTOME_BEL = os.path.join(REACTOME_DIR, 'bel')
 REACTOME_FILES = os.path.join(REACTOME_DIR, 'rdf')
+REACTOME_SHARDS = os.path.join(REACTOME_DIR, 'shards')
 
 #: WikiPathways
 WIKIPATHWAYS = 'wikipathways'
 WIKIPATHWAYS_DIR = os.path.join(DATA_DIR, WIKIPATHWAYS)
 WIKIPATHWAYS_BEL = os.path.join(WIKIPATHWAYS_DIR, 'bel')
 WIKIPATHWAYS_FILES = os.path.join(WIKIPATHWAYS_DIR, 'rdf', 'wp')
+WIKIPATHWAYS_GPML_FILES = os.path.join(WIKIPATHWAYS_DIR, 'gpml')
 
 SPIA_DIR = os.path.join(DATA_DIR, 'spia')
 CX_DIR = os.path.join(DATA_DIR, 'cx')
@@ -76,6 +87,11 @@ ensure_pathme_folders()
 
 UNKNOWN = 'unknown'
 
+#: Species converted by default
+DEFAULT_SPECIES = 'Homo_sapiens'
+#: Value of the ``--species`` options that selects every species in a release
+ALL_SPECIES = 'all'
+
 # Other namespaces
 
 #: InterPro
@@ -148,6 +164,9 @@ RDF_REACTOME = 'ftp://ftp.ebi.ac.uk/pub/databases/RDF/reactome/r67/reactome-biop
 #: WikiPathways RDF
 RDF_WIKIPATHWAYS = 'http://data.wikipathways.org/20200310/rdf/wikipathways-20200310-rdf-wp.zip'
 
+#: WikiPathways GPML (human)
+GPML_WIKIPATHWAYS = 'http://data.wikipathways.org/20200310/gpml/wikipathways-20200310-gpml-Homo_sapiens.zip'
+
 #: Mapping to compare conversion of entities from KEGG XML (i.e. KGML) to BEL
 KEGG_STATS_COLUMN_NAMES = {
     'nodes': 'BEL Nodes',
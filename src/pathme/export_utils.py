@@ -32,7 +32,7 @@ from pybel_tools.analysis.spia import bel_to_spia_matrices, spia_matrices_to_exc
 from .constants import KEGG, KEGG_BEL, KEGG_FILES, KEGG_KGML_URL, KEGG_PATHWAYS_URL, \
     PATHME_DIR, REACTOME, REACTOME_BEL, REACTOME_FILES, UNIVERSE_DIR, WIKIPATHWAYS, \
     WIKIPATHWAYS_BEL, WIKIPATHWAYS_FILES
-from .normalize_names import normalize_graph_names
+from .normalize_names import NameNormalizer, normalize_graph_names
 from .pybel_utils import flatten_complex_nodes
 
 logger = logging.getLogger(__name__)
@@ -137,6 +137,9 @@ def export_helper(
     if not reactome_manager.is_populated():
         logger.warning('Reactome Manager is not populated')
 
+    # Nodes shared by many pathways are only normalized once
+    normalizer = NameNormalizer()
+
     # Load each pickle and export it as excel file
     for path in paths:
         if not path.endswith('.pickle'):
@@ -144,7 +147,7 @@ def export_helper(
 
         if path in kegg_pickles:
             pathway_graph = from_pickle(os.path.join(kegg_path, path))
-            normalize_graph_names(pathway_graph, KEGG)
+            normalize_graph_names(pathway_graph, KEGG, normalizer)
 
         elif path in reactome_pickles:
             # Load BELGraph
@@ -174,11 +177,11 @@ def export_helper(
                 pathway_graph += child_graph
 
             # Normalize graph names
-            normalize_graph_names(pathway_graph, REACTOME)
+            normalize_graph_names(pathway_graph, REACTOME, normalizer)
 
         elif path in wp_pickles:
             pathway_graph = from_pickle(os.path.join(wikipathways_path, path))
-            normalize_graph_names(pathway_graph, WIKIPATHWAYS)
+            normalize_graph_names(pathway_graph, WIKIPATHWAYS, normalizer)
 
         else:
             logger.warning(f'Unknown pickle file: {path}')
@@ -211,6 +214,8 @@ def export_helper(
         else:
             raise ValueError(f'Unknown export format: {fmt}')
 
+    logger.info('Names: %s', normalizer.summarize())
+
 
 def iterate_indra_statements(**kwargs) -> Iterable['indra.statements.Statement']:
     """Iterate over INDRA statements for the universe."""
@@ -236,12 +241,18 @@ def iterate_universe_graphs(
     n_paths = len(kegg_pickle_paths) + len(reactome_pickle_paths) + len(wp_pickle_paths)
     logger.info(f'{n_paths} graphs will be put in the universe')
 
-    yield from _iterate_wp(wp_pickle_paths, wikipathways_path, flatten, normalize_names)
-    yield from _iterate_kegg(kegg_pickle_paths, kegg_path, flatten, normalize_names)
-    yield from _iterate_reactome(reactome_pickle_paths, reactome_path, flatten, normalize_names)
+    # Nodes shared by many pathways are only normalized once
+    normalizer = NameNormalizer() if normalize_names else None
+
+    yield from _iterate_wp(wp_pickle_paths, wikipathways_path, flatten, normalizer)
+    yield from _iterate_kegg(kegg_pickle_paths, kegg_path, flatten, normalizer)
+    yield from _iterate_reactome(reactome_pickle_paths, reactome_path, flatten, normalizer)
+
+    if normalizer is not None:
+        logger.info('Names: %s', normalizer.summarize())
 
 
-def _iterate_wp(wp_pickle_paths, wikipathways_path, flatten, normalize_names):
+def _iterate_wp(wp_pickle_paths, wikipathways_path, flatten, normalizer):
     for path in tqdm(wp_pickle_paths, desc=f'Loading WP pickles from {wikipathways_path}'):
         if not path.endswith('.pickle'):
             continue
@@ -251,14 +262,14 @@ def _iterate_wp(wp_pickle_paths, wikipathways_path, flatten, normalize_names):
         if flatten:
             flatten_complex_nodes(graph)
 
-        if normalize_names:
-            normalize_graph_names(graph, WIKIPATHWAYS)
+        if normalizer is not None:
+            normalize_graph_names(graph, WIKIPATHWAYS, normalizer)
 
         _update_graph(graph, path, WIKIPATHWAYS)
         yield WIKIPATHWAYS, path, graph
 
 
-def _iterate_kegg(kegg_pickle_paths, kegg_path, flatten, normalize_names):
+def _iterate_kegg(kegg_pickle_paths, kegg_path, flatten, normalizer):
     for path in tqdm(kegg_pickle_paths, desc=f'Loading KEGG pickles from {kegg_path}'):
         if not path.endswith('.pickle'):
             continue
@@ -267,14 +278,14 @@ def _iterate_kegg(kegg_pickle_paths, kegg_path, flatten, normalize_names):
         if flatten:
             flatten_complex_nodes(graph)
 
-        if normalize_names:
-            normalize_graph_names(graph, KEGG)
+        if normalizer is not None:
+            normalize_graph_names(graph, KEGG, normalizer)
 
         _update_graph(graph, path, KEGG)
         yield KEGG, path, graph
 
 
-def _iterate_reactome(reactome_pickle_paths, reactome_path, flatten, normalize_names):
+def _iterate_reactome(reactome_pickle_paths, reactome_path, flatten, normalizer):
     for file in tqdm(reactome_pickle_paths, desc=f'Loading Reactome pickles from {reactome_path}'):
         if not file.endswith('.pickle'):
             continue
@@ -284,8 +295,8 @@ def _iterate_reactome(reactome_pickle_paths, reactome_path, flatten, normalize_n
         if flatten:
             flatten_complex_nodes(graph)
 
-        if normalize_names:
-            normalize_graph_names(graph, REACTOME)
+        if normalizer is not None:
+            normalize_graph_names(graph, REACTOME, normalizer)
 
         _update_graph(graph, file, REACTOME)
         yield REACTOME, file, graph
@@ -16,6 +16,8 @@ from .convert_to_bel import kegg_to_pickles
 from .utils import download_kgml_files, get_kegg_pathway_ids
 from ..constants import KEGG_BEL, KEGG_FILES
 from ..export_utils import get_paths_in_folder
+from ..metrics import export_resolution_metrics
+from ..resolver import get_chebi_resolver, get_hgnc_resolver
 from ..utils import summarize_helper
 
 logger = logging.getLogger(__name__)
@@ -49,8 +51,13 @@ def download(connection):
 @main.command()
 @click.option('-f', '--flatten', is_flag=True, default=False)
 @click.option('-e', '--export-folder', default=KEGG_BEL, show_default=True)
+@click.option(
+    '-t', '--threads', type=int, default=1, show_default=True,
+    help='Number of files converted at the same time, overlapping their requests to the KEGG API',
+)
+@click.option('--metrics-path', help='JSON file with the resolution metrics. Defaults to next to the export folder')
 @click.option('-v', '--debug', is_flag=True, default=False, help='Debug mode')
-def bel(flatten, export_folder, debug):
+def bel(flatten, export_folder, threads, metrics_path, debug):
     """Convert KEGG to BEL."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     logger.setLevel(logging.INFO)
@@ -68,6 +75,8 @@ def bel(flatten, export_folder, debug):
         click.echo('bio2bel_hgnc was not populated. Populating now.')
         hgnc_manager.populate()
 
+    hgnc_manager = get_hgnc_resolver(hgnc_manager)
+
     logger.info('Initiating ChEBI Manager')
     chebi_manager = ChebiManager()
 
@@ -75,6 +84,8 @@ def bel(flatten, export_folder, debug):
         click.echo('bio2bel_chebi was not populated. Populating now.')
         chebi_manager.populate()
 
+    chebi_manager = get_chebi_resolver(chebi_manager)
+
     if flatten:
         logger.info('Flattening mode activated')
 
@@ -90,10 +101,13 @@ def bel(flatten, export_folder, debug):
         chebi_manager=chebi_manager,
         flatten=flatten,
         export_folder=export_folder,
+        threads=threads,
     )
 
     logger.info('KEGG exported in %.2f seconds', time.time() - t)
 
+    export_resolution_metrics(export_folder, metrics_path)
+
 
 @main.command()
 @click.option('-e', '--export-folder', default=KEGG_BEL, show_default=True)
@@ -5,6 +5,7 @@
 import logging
 import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from itertools import product
 
 import tqdm
@@ -24,6 +25,8 @@ from ..constants import (
     KEGG_MODIFICATIONS, PUBCHEM, UNIPROT,
 )
 from ..export_utils import add_annotation_key
+from ..metrics import InstrumentedManager
+from ..resolver import get_thread_safe_manager, release_thread_session
 from ..utils import add_bel_metadata
 
 __all__ = [
@@ -61,7 +64,9 @@ def kegg_to_bel(path, hgnc_manager, chebi_manager, flatten=False):
     graph.graph['pathway_id'] = root.attrib['name']
 
     # Parse file and get entities and interactions
-    genes_dict, compounds_dict, maps_dict, orthologs_dict = get_entity_nodes(xml_tree, hgnc_manager, chebi_manager)
+    genes_dict, compounds_dict, maps_dict, orthologs_dict = get_entity_nodes(
+        xml_tree, InstrumentedManager.wrap(hgnc_manager), InstrumentedManager.wrap(chebi_manager),
+    )
     relations_list = get_all_relationships(xml_tree)
 
     # Get compounds and reactions
@@ -679,17 +684,45 @@ def get_bel_types(path, hgnc_manager, chebi_manager, flatten=None):
     return bel_stats
 
 
-def kegg_to_pickles(resource_files, resource_folder, hgnc_manager, chebi_manager, flatten=None, export_folder=None):
+def _kegg_file_to_pickle(
+    kgml_path: str, pickle_path: str, hgnc_manager, chebi_manager, flatten: bool, thread: bool = False,
+) -> None:
+    """Convert a KGML file to BEL and export it to a pickle.
+
+    :param thread: whether it runs in a thread of a pool. If so, the database sessions of the thread are closed at the
+     end (see :func:`pathme.resolver.release_thread_session`)
+    """
+    try:
+        bel_graph = kegg_to_bel(
+            path=kgml_path,
+            hgnc_manager=hgnc_manager,
+            chebi_manager=chebi_manager,
+            flatten=flatten,
+        )
+    finally:
+        if thread:
+            release_thread_session(hgnc_manager, chebi_manager)
+
+    to_pickle(bel_graph, pickle_path)
+
+
+def kegg_to_pickles(
+    resource_files, resource_folder, hgnc_manager, chebi_manager, flatten=None, export_folder=None, threads=1,
+):
     """Export WikiPathways to Pickles.
 
     :param iter[str] resource_files: iterator with file names
     :param str resource_folder: path folder
     :param Optional[str] export_folder: export folder
+    :param int threads: number of files converted at the same time. Threads spend most of their time waiting for the
+     KEGG API, so they overlap the requests of different files
     """
     if export_folder is None:
         export_folder = resource_folder
 
-    for kgml_file in tqdm.tqdm(resource_files, desc=f'Exporting KEGG to BEL in {export_folder}'):
+    paths = []
+
+    for kgml_file in resource_files:
         _name = kgml_file[:-len('.xml')]
         _flatten = 'flatten' if flatten else 'unflatten'
 
@@ -703,11 +736,26 @@ def kegg_to_pickles(resource_files, resource_folder, hgnc_manager, chebi_manager
         if not kgml_file.endswith('.xml') or os.path.exists(pickle_path):
             continue
 
-        bel_graph = kegg_to_bel(
-            path=os.path.join(resource_folder, kgml_file),
-            hgnc_manager=hgnc_manager,
-            chebi_manager=chebi_manager,
-            flatten=True if flatten else False,
-        )
+        paths.append((os.path.join(resource_folder, kgml_file), pickle_path))
+
+    desc = f'Exporting KEGG to BEL in {export_folder}'
+
+    if threads <= 1 or len(paths) <= 1:
+        for kgml_path, pickle_path in tqdm.tqdm(paths, desc=desc):
+            _kegg_file_to_pickle(kgml_path, pickle_path, hgnc_manager, chebi_manager, bool(flatten))
+
+        return
+
+    hgnc_manager = get_thread_safe_manager(hgnc_manager)
+    chebi_manager = get_thread_safe_manager(chebi_manager)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(
+                _kegg_file_to_pickle, kgml_path, pickle_path, hgnc_manager, chebi_manager, bool(flatten), thread=True,
+            )
+            for kgml_path, pickle_path in paths
+        ]
 
-        to_pickle(bel_graph, pickle_path)
+        for future in tqdm.tqdm(futures, desc=desc):
+            future.result()
@@ -6,6 +6,7 @@ import itertools as itt
 import json
 import logging
 import os
+import threading
 from collections import defaultdict
 from xml.etree.ElementTree import parse
 
@@ -14,6 +15,7 @@ import requests
 from bio2bel_kegg.constants import API_KEGG_GET
 from bio2bel_kegg.parsers import parse_description
 from ..constants import CHEBI, CHEBI_NAME, HGNC, HGNC_SYMBOL, KEGG_CACHE, KEGG_ID, KEGG_TYPE, PUBCHEM, UNIPROT
+from ..metrics import get_resolution_metrics
 from ..wikipathways.utils import merge_two_dicts
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,7 @@ def _post_process_api_query(node_meta_data, hgnc_manager, chebi_manager):
     :rtype: dict[str,str]
     """
     node_dict = {}
+    metrics = get_resolution_metrics()
 
     if 'DBLINKS' in node_meta_data:
 
@@ -59,6 +62,7 @@ def _post_process_api_query(node_meta_data, hgnc_manager, chebi_manager):
             # Get protein identifiers
             if resource == HGNC:
                 hgnc_entry = hgnc_manager.get_gene_by_hgnc_id(identifier)
+                metrics.record_resolution(HGNC, identifier, bool(hgnc_entry))
 
                 if not hgnc_entry:
                     continue
@@ -68,6 +72,7 @@ def _post_process_api_query(node_meta_data, hgnc_manager, chebi_manager):
 
             elif resource == UNIPROT:
                 hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(identifier)
+                metrics.record_resolution(UNIPROT, identifier, bool(hgnc_entry))
 
                 if not hgnc_entry:
                     continue
@@ -89,6 +94,7 @@ def _post_process_api_query(node_meta_data, hgnc_manager, chebi_manager):
                     # Split multiple identifiers and get their names
                     for chebi_id in identifier.split(' '):
                         chebi_entry = chebi_manager.get_chemical_by_chebi_id(chebi_id)
+                        metrics.record_resolution(CHEBI, chebi_id, bool(chebi_entry))
 
                         # If the id is found in the database stick the name
                         if chebi_entry:
@@ -112,7 +118,11 @@ def _process_kegg_api_get_entity(entity, entity_type, hgnc_manager, chebi_manage
     """
     _entity_filepath = os.path.join(KEGG_CACHE, f'{entity}.json')
 
-    if os.path.exists(_entity_filepath):
+    # Cached entities were resolved when they were first retrieved, so they are only counted as cache hits
+    cached = os.path.exists(_entity_filepath)
+    get_resolution_metrics().record_cache('kegg_api', cached)
+
+    if cached:
         with open(_entity_filepath) as f:
             return json.load(f)
 
@@ -125,9 +135,13 @@ def _process_kegg_api_get_entity(entity, entity_type, hgnc_manager, chebi_manage
     node_dict[KEGG_ID] = entity
     node_dict[KEGG_TYPE] = entity_type
 
-    with open(_entity_filepath, 'w') as f:
+    # Written atomically, since other threads or processes might be reading the cache at the same time
+    tmp_filepath = f'{_entity_filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_filepath, 'w') as f:
         json.dump(node_dict, f)
 
+    os.replace(tmp_filepath, _entity_filepath)
+
     return node_dict
 
 
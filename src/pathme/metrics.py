@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""Metrics of the resolution of identifiers.
+
+The converters look up the identifiers of the nodes in HGNC and ChEBI, through the Bio2BEL managers or the resolvers of
+:mod:`pathme.resolver`. Each process records in :func:`get_resolution_metrics`:
+
+- the number of lookups of each kind and the time spent on them
+- the cache hits and misses of the resolvers and of the KEGG API
+- the number of identifiers of each namespace that were (not) resolved, and the pathways of the unresolved ones
+
+Worker processes send their metrics with :func:`collect_resolution_metrics` and the main process merges them, so the
+``bel`` commands export the metrics of the whole conversion as JSON (see :func:`export_resolution_metrics`).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Mapping, Optional
+
+__all__ = [
+    'ResolutionMetrics',
+    'InstrumentedManager',
+    'get_resolution_metrics',
+    'collect_resolution_metrics',
+    'get_metrics_path',
+    'export_resolution_metrics',
+]
+
+logger = logging.getLogger(__name__)
+
+#: Version of the format of the exported metrics
+METRICS_VERSION = 1
+
+
+class ResolutionMetrics:
+    """Metrics of the resolution of identifiers. Safe to update from several threads."""
+
+    def __init__(self):
+        """Create empty metrics."""
+        self.lookups = Counter()
+        self.seconds = defaultdict(float)
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.resolved = Counter()
+        self.unresolved = Counter()
+        #: Dictionary from namespace to the unresolved identifiers, with the pathways where they were found
+        self.unresolved_identifiers = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def record_lookup(self, lookup: str, seconds: float) -> None:
+        """Record a lookup (e.g., 'get_gene_by_uniprot_id') and the time it took."""
+        with self._lock:
+            self.lookups[lookup] += 1
+            self.seconds[lookup] += seconds
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Record whether a lookup was answered from a cache (e.g., the HGNC snapshot) or not."""
+        with self._lock:
+            if hit:
+                self.cache_hits[cache] += 1
+            else:
+                self.cache_misses[cache] += 1
+
+    def record_resolution(
+        self,
+        namespace: str,
+        identifier: Any,
+        resolved: bool,
+        pathway_id: Optional[str] = None,
+    ) -> None:
+        """Record whether the identifier of a node could be resolved.
+
+        :param namespace: namespace of the identifier (e.g., uniprot)
+        :param identifier: identifier
+        :param resolved: whether it was resolved to a standard identifier (e.g., HGNC)
+        :param pathway_id: pathway of the node
+        """
+        with self._lock:
+            if resolved:
+                self.resolved[namespace] += 1
+                return
+
+            self.unresolved[namespace] += 1
+            pathways = self.unresolved_identifiers[namespace].setdefault(str(identifier), set())
+            if pathway_id is not None:
+                pathways.add(str(pathway_id))
+
+    @property
+    def unresolved_count(self) -> int:
+        """Get the number of distinct identifiers that could not be resolved."""
+        return sum(
+            len(identifiers)
+            for identifiers in self.unresolved_identifiers.values()
+        )
+
+    def merge(self, other: 'ResolutionMetrics') -> None:
+        """Add the metrics of another process or thread."""
+        with self._lock:
+            self.lookups.update(other.lookups)
+            for lookup, seconds in other.seconds.items():
+                self.seconds[lookup] += seconds
+            self.cache_hits.update(other.cache_hits)
+            self.cache_misses.update(other.cache_misses)
+            self.resolved.update(other.resolved)
+            self.unresolved.update(other.unresolved)
+
+            for namespace, identifiers in other.unresolved_identifiers.items():
+                for identifier, pathways in identifiers.items():
+                    self.unresolved_identifiers[namespace].setdefault(identifier, set()).update(pathways)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON serializable dictionary with the metrics."""
+        with self._lock:
+            return {
+                'version': METRICS_VERSION,
+                'lookups': {
+                    lookup: {'count': count, 'seconds': self.seconds[lookup]}
+                    for lookup, count in sorted(self.lookups.items())
+                },
+                'caches': {
+                    cache: {'hits': self.cache_hits[cache], 'misses': self.cache_misses[cache]}
+                    for cache in sorted(set(self.cache_hits) | set(self.cache_misses))
+                },
+                'resolutions': {
+                    namespace: {'resolved': self.resolved[namespace], 'unresolved': self.unresolved[namespace]}
+                    for namespace in sorted(set(self.resolved) | set(self.unresolved))
+                },
+                'unresolved': {
+                    namespace: {
+                        identifier: sorted(pathways)
+                        for identifier, pathways in sorted(identifiers.items())
+                    }
+                    for namespace, identifiers in sorted(self.unresolved_identifiers.items())
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'ResolutionMetrics':
+        """Load the metrics from a dictionary built with :meth:`to_dict`."""
+        metrics = cls()
+
+        for lookup, lookup_metrics in data['lookups'].items():
+            metrics.lookups[lookup] = lookup_metrics['count']
+            metrics.seconds[lookup] = lookup_metrics['seconds']
+
+        for cache, cache_metrics in data['caches'].items():
+            metrics.cache_hits[cache] = cache_metrics['hits']
+            metrics.cache_misses[cache] = cache_metrics['misses']
+
+        for namespace, resolutions in data['resolutions'].items():
+            metrics.resolved[namespace] = resolutions['resolved']
+            metrics.unresolved[namespace] = resolutions['unresolved']
+
+        for namespace, identifiers in data['unresolved'].items():
+            metrics.unresolved_identifiers[namespace] = {
+                identifier: set(pathways)
+                for identifier, pathways in identifiers.items()
+            }
+
+        return metrics
+
+    def dump(self, path: str) -> None:
+        """Export the metrics to a JSON file."""
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def summarize(self) -> str:
+        """Summarize the metrics in one line."""
+        return (
+            f'{sum(self.lookups.values())} lookups in {sum(self.seconds.values()):.2f} seconds, '
+            f'{sum(self.resolved.values())} identifiers resolved, '
+            f'{self.unresolved_count} distinct identifiers could not be resolved'
+        )
+
+
+#: Metrics of this process
+_metrics = ResolutionMetrics()
+_metrics_lock = threading.Lock()
+
+
+def get_resolution_metrics() -> ResolutionMetrics:
+    """Get the metrics of this process."""
+    return _metrics
+
+
+def collect_resolution_metrics() -> ResolutionMetrics:
+    """Get the metrics recorded in this process since they were last collected, and start new ones.
+
+    Worker processes call it at the end of each task and send the metrics (see :meth:`ResolutionMetrics.to_dict`) to
+    the main process, which merges them in its own.
+    """
+    global _metrics
+
+    with _metrics_lock:
+        metrics, _metrics = _metrics, ResolutionMetrics()
+
+    return metrics
+
+
+def get_metrics_path(export_folder: str) -> str:
+    """Get the path of the metrics of a conversion, next to its export folder (e.g., bel.metrics.json)."""
+    return f'{os.path.normpath(export_folder)}.metrics.json'
+
+
+class InstrumentedManager:
+    """Proxy of a manager (or resolver) that records the time and number of its lookups (its ``get_*`` methods)."""
+
+    def __init__(self, manager):
+        """Wrap a manager.
+
+        :param manager: HGNC or ChEBI manager or resolver
+        """
+        self.manager = manager
+
+    def __getattr__(self, name: str):
+        """Get an attribute of the manager, timing it if it is a lookup."""
+        attribute = getattr(self.manager, name)
+
+        if not name.startswith('get_') or not callable(attribute):
+            return attribute
+
+        def _lookup(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                get_resolution_metrics().record_lookup(name, time.perf_counter() - start)
+
+        return _lookup
+
+    @classmethod
+    def wrap(cls, manager):
+        """Wrap a manager, unless it is None or already wrapped."""
+        if manager is None or isinstance(manager, cls):
+            return manager
+
+        return cls(manager)
+
+
+def export_resolution_metrics(export_folder: str, path: Optional[str] = None) -> str:
+    """Export the metrics of this process (merged with the ones of its workers) at the end of a conversion.
+
+    :param export_folder: export folder of the conversion
+    :param path: path of the JSON file. Defaults to :func:`get_metrics_path`
+    :return: path of the JSON file
+    """
+    path = path or get_metrics_path(export_folder)
+
+    metrics = get_resolution_metrics()
+    metrics.dump(path)
+    logger.info('Resolution of identifiers: %s. Metrics exported to %s', metrics.summarize(), path)
+
+    return path
@@ -3,15 +3,13 @@
 """Methods to normalize names across databases."""
 
 import logging
-from collections import defaultdict
-from typing import List
-
-from networkx import relabel_nodes
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Type
 
 from pybel import BELGraph
-from pybel.dsl import Abundance, BiologicalProcess, CentralDogma, ListAbundance, MicroRna, Protein, Reaction
+from pybel.constants import IDENTIFIER, NAME, NAMESPACE
+from pybel.dsl import Abundance, BaseEntity, BiologicalProcess, CentralDogma, ListAbundance, MicroRna, Protein, Reaction
 from .constants import REACTOME, WIKIPATHWAYS
-from .pybel_utils import multi_relabel
+from .pybel_utils import relabel_nodes_in_place
 
 logger = logging.getLogger(__name__)
 
@@ -123,152 +121,234 @@ def munge_reactome_gene(gene):
     return gene
 
 
-def normalize_graph_names(graph: BELGraph, database: str) -> None:
-    """Normalize graph names."""
-    # Victim to Survivor (one to one node) mapping
-    one_to_one_mapping = {}
-    # Victim to Survivors (one to many nodes) mapping
-    one_to_many_mapping = defaultdict(set)
-
-    for node in graph.nodes():
-
-        # Skip ListAbundances and Reactions since they do not have a name
-        if isinstance(node, ListAbundance) or isinstance(node, Reaction) or not node.name:
-            continue
-
-        # Normalize names: Lower case name and strip quotes or white spaces
-        lower_name = node.name.lower().strip('"').strip()
-
-        # Dealing with Genes/miRNAs
-        if isinstance(node, CentralDogma):
-
-            ##################
-            # miRNA entities #
-            ##################
-
-            if lower_name.startswith("mir"):
-
-                # Reactome preprocessing to flat multiple identifiers
-                if database == REACTOME:
-                    reactome_cell = munge_reactome_gene(lower_name)
-                    if isinstance(reactome_cell, list):
-                        for lower_name in reactome_cell:
-                            one_to_many_mapping[node].add(
-                                MicroRna(
-                                    node.namespace, name=lower_name.replace("mir-", "mir"), identifier=node.identifier,
-                                ),
-                            )
-
-                    if lower_name.endswith(' genes'):
-                        lower_name = lower_name[:-len(' genes')]
-                    elif lower_name.endswith(' gene'):
-                        lower_name = lower_name[:-len(' gene')]
-                    one_to_one_mapping[node] = MicroRna(
-                        node.namespace,
-                        name=lower_name.replace("mir-", "mir"),  # Special case for Reactome
-                    )
-                    continue
+def _normalize_node(node: BaseEntity, database: str) -> Tuple[Optional[BaseEntity], Set[BaseEntity]]:
+    """Normalize the name of a node.
 
-                # KEGG and Reactome
-                one_to_one_mapping[node] = MicroRna(
-                    node.namespace, name=node.name.replace("mir-", "mir"), identifier=node.identifier,
-                )
+    :param node: node of a pathway
+    :param database: database of the pathway (e.g., kegg)
+    :return: the survivor of the node (if it is relabeled to one node) and its survivors (if it is expanded to many)
+    """
+    survivor = None
+    survivors = set()
 
-            ##################
-            # Genes entities #
-            ##################
-
-            else:
-                # Reactome preprocessing to flat multiple identifiers
-                if database == REACTOME:
-                    reactome_cell = munge_reactome_gene(lower_name)
-                    if isinstance(reactome_cell, list):
-                        for lower_name in reactome_cell:
-                            if lower_name in BLACK_LIST_REACTOME:  # Filter entities in black list
-                                continue
-                            elif lower_name.startswith("("):  # remove redundant parentheses
-                                lower_name = lower_name.strip("(").strip(")")
-
-                            one_to_many_mapping[node].add(
-                                Protein(node.namespace, name=lower_name, identifier=node.identifier),
-                            )
-                    else:
-                        one_to_one_mapping[node] = Protein(node.namespace, name=lower_name, identifier=node.identifier)
-
-                    continue
-
-                # WikiPathways and KEGG do not require any processing of genes
-                elif database == WIKIPATHWAYS and lower_name in WIKIPATHWAYS_BIOL_PROCESS:
-                    one_to_one_mapping[node] = BiologicalProcess(
-                        node.namespace, name=lower_name, identifier=node.identifier,
-                    )
-                    continue
+    # Skip ListAbundances and Reactions since they do not have a name
+    if isinstance(node, ListAbundance) or isinstance(node, Reaction) or not node.name:
+        return survivor, survivors
 
-                one_to_one_mapping[node] = Protein(node.namespace, name=lower_name, identifier=node.identifier)
+    # Normalize names: Lower case name and strip quotes or white spaces
+    lower_name = node.name.lower().strip('"').strip()
 
-        #######################
-        # Metabolite entities #
-        #######################
+    # Dealing with Genes/miRNAs
+    if isinstance(node, CentralDogma):
 
-        elif isinstance(node, Abundance):
+        ##################
+        # miRNA entities #
+        ##################
 
-            if database == 'wikipathways':
-                # Biological processes that are captured as abundance in
-                # BEL since they were characterized wrong in WikiPathways
-                if lower_name in WIKIPATHWAYS_BIOL_PROCESS:
-                    one_to_one_mapping[node] = BiologicalProcess(
-                        node.namespace, name=lower_name, identifier=node.identifier,
-                    )
-                    continue
-
-                # Abundances to BiologicalProcesses
-                elif (
-                    node.namespace in {'WIKIDATA', 'WIKIPATHWAYS', 'REACTOME'}
-                    and lower_name not in WIKIPATHWAYS_METAB
-                ):
-                    one_to_one_mapping[node] = BiologicalProcess(
-                        node.namespace, name=lower_name, identifier=node.identifier,
-                    )
-                    continue
+        if lower_name.startswith("mir"):
 
-                # Fix naming in duplicate entity
-                if lower_name in WIKIPATHWAYS_NAME_NORMALIZATION:
-                    lower_name = WIKIPATHWAYS_NAME_NORMALIZATION[lower_name]
+            # Reactome preprocessing to flat multiple identifiers
+            if database == REACTOME:
+                reactome_cell = munge_reactome_gene(lower_name)
+                if isinstance(reactome_cell, list):
+                    for lower_name in reactome_cell:
+                        survivors.add(
+                            MicroRna(
+                                node.namespace, name=lower_name.replace("mir-", "mir"), identifier=node.identifier,
+                            ),
+                        )
 
-            elif database == REACTOME:
-                # Curated proteins that were coded as metabolites
-                if lower_name in REACTOME_PROT:
-                    one_to_one_mapping[node] = Protein(
-                        node.namespace, name=lower_name, identifier=node.identifier,
-                    )
-                    continue
-
-                # Flat multiple identifiers (this is not trivial because most of ChEBI names contain commas,
-                # so a clever way to fix some of the entities is to check that all identifiers contain letters)
-                elif "," in lower_name and all(
-                    string.isalpha()
-                    for string in lower_name.split(",")
-                ):
-                    for string in lower_name.split(","):
-                        one_to_many_mapping[node].add(
-                            Abundance(node.namespace, name=string, identifier=node.identifier),
+                if lower_name.endswith(' genes'):
+                    lower_name = lower_name[:-len(' genes')]
+                elif lower_name.endswith(' gene'):
+                    lower_name = lower_name[:-len(' gene')]
+                survivor = MicroRna(
+                    node.namespace,
+                    name=lower_name.replace("mir-", "mir"),  # Special case for Reactome
+                )
+                return survivor, survivors
+
+            # KEGG and Reactome
+            survivor = MicroRna(
+                node.namespace, name=node.name.replace("mir-", "mir"), identifier=node.identifier,
+            )
+
+        ##################
+        # Genes entities #
+        ##################
+
+        else:
+            # Reactome preprocessing to flat multiple identifiers
+            if database == REACTOME:
+                reactome_cell = munge_reactome_gene(lower_name)
+                if isinstance(reactome_cell, list):
+                    for lower_name in reactome_cell:
+                        if lower_name in BLACK_LIST_REACTOME:  # Filter entities in black list
+                            continue
+                        elif lower_name.startswith("("):  # remove redundant parentheses
+                            lower_name = lower_name.strip("(").strip(")")
+
+                        survivors.add(
+                            Protein(node.namespace, name=lower_name, identifier=node.identifier),
                         )
-                    continue
+                else:
+                    survivor = Protein(node.namespace, name=lower_name, identifier=node.identifier)
 
-            one_to_one_mapping[node] = Abundance(node.namespace, name=lower_name, identifier=node.identifier)
+                return survivor, survivors
 
-        #################################
-        # Biological Processes entities #
-        #################################
+            # WikiPathways and KEGG do not require any processing of genes
+            elif database == WIKIPATHWAYS and lower_name in WIKIPATHWAYS_BIOL_PROCESS:
+                survivor = BiologicalProcess(
+                    node.namespace, name=lower_name, identifier=node.identifier,
+                )
+                return survivor, survivors
 
-        elif isinstance(node, BiologicalProcess):
-            # KEGG normalize name by removing the title prefix
-            if lower_name.startswith('title:'):
-                lower_name = lower_name[len('title:'):]
+            survivor = Protein(node.namespace, name=lower_name, identifier=node.identifier)
 
-            one_to_one_mapping[node] = BiologicalProcess(
-                node.namespace, name=lower_name, identifier=node.identifier,
-            )
+    #######################
+    # Metabolite entities #
+    #######################
+
+    elif isinstance(node, Abundance):
+
+        if database == 'wikipathways':
+            # Biological processes that are captured as abundance in
+            # BEL since they were characterized wrong in WikiPathways
+            if lower_name in WIKIPATHWAYS_BIOL_PROCESS:
+                survivor = BiologicalProcess(
+                    node.namespace, name=lower_name, identifier=node.identifier,
+                )
+                return survivor, survivors
+
+            # Abundances to BiologicalProcesses
+            elif (
+                node.namespace in {'WIKIDATA', 'WIKIPATHWAYS', 'REACTOME'}
+                and lower_name not in WIKIPATHWAYS_METAB
+            ):
+                survivor = BiologicalProcess(
+                    node.namespace, name=lower_name, identifier=node.identifier,
+                )
+                return survivor, survivors
+
+            # Fix naming in duplicate entity
+            if lower_name in WIKIPATHWAYS_NAME_NORMALIZATION:
+                lower_name = WIKIPATHWAYS_NAME_NORMALIZATION[lower_name]
 
-    relabel_nodes(graph, one_to_one_mapping)
-    multi_relabel(graph, one_to_many_mapping)
+        elif database == REACTOME:
+            # Curated proteins that were coded as metabolites
+            if lower_name in REACTOME_PROT:
+                survivor = Protein(
+                    node.namespace, name=lower_name, identifier=node.identifier,
+                )
+                return survivor, survivors
+
+            # Flat multiple identifiers (this is not trivial because most of ChEBI names contain commas,
+            # so a clever way to fix some of the entities is to check that all identifiers contain letters)
+            elif "," in lower_name and all(
+                string.isalpha()
+                for string in lower_name.split(",")
+            ):
+                for string in lower_name.split(","):
+                    survivors.add(
+                        Abundance(node.namespace, name=string, identifier=node.identifier),
+                    )
+                return survivor, survivors
+
+        survivor = Abundance(node.namespace, name=lower_name, identifier=node.identifier)
+
+    #################################
+    # Biological Processes entities #
+    #################################
+
+    elif isinstance(node, BiologicalProcess):
+        # KEGG normalize name by removing the title prefix
+        if lower_name.startswith('title:'):
+            lower_name = lower_name[len('title:'):]
+
+        survivor = BiologicalProcess(
+            node.namespace, name=lower_name, identifier=node.identifier,
+        )
+
+    return survivor, survivors
+
+
+class NameNormalizer:
+    """Normalize the names of the nodes of many graphs, remembering the normalization of each node.
+
+    The normalization only depends on the database and the function, namespace, name and identifier of a node, so it
+    is computed once for each distinct node across all the graphs of a run (e.g., a universe build or an export).
+    """
+
+    def __init__(self):
+        """Initialize the memo of the normalized nodes."""
+        self._survivors: Dict[
+            Tuple[str, Type[BaseEntity], str, str, str],
+            Tuple[Optional[BaseEntity], FrozenSet[BaseEntity]],
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._survivors)
+
+    def normalize_node(self, node: BaseEntity, database: str) -> Tuple[Optional[BaseEntity], FrozenSet[BaseEntity]]:
+        """Normalize the name of a node, or get it from the memo if the node has already been normalized.
+
+        :param node: node of a pathway
+        :param database: database of the pathway (e.g., kegg)
+        :return: the survivor of the node (if it is relabeled to one node) and its survivors (if it is expanded to many)
+        """
+        # Nodes without a name (e.g., complexes) are never normalized
+        key = database, type(node), node.get(NAMESPACE), node.get(NAME), node.get(IDENTIFIER)
+
+        rv = self._survivors.get(key)
+        if rv is not None:
+            self.hits += 1
+            return rv
+
+        self.misses += 1
+        survivor, survivors = _normalize_node(node, database)
+        rv = self._survivors[key] = survivor, frozenset(survivors)
+        return rv
+
+    def normalize_graph(self, graph: BELGraph, database: str) -> None:
+        """Normalize graph names, in place.
+
+        :param graph: graph of a pathway
+        :param database: database of the pathway (e.g., kegg)
+        """
+        # Victim to Survivor (one to one node) mapping
+        one_to_one_mapping = {}
+        # Victim to Survivors (one to many nodes) mapping
+        one_to_many_mapping = {}
+
+        for node in graph:
+            survivor, survivors = self.normalize_node(node, database)
+
+            if survivor is not None:
+                one_to_one_mapping[node] = survivor
+            if survivors:
+                one_to_many_mapping[node] = survivors
+
+        relabel_nodes_in_place(graph, one_to_one_mapping, one_to_many_mapping)
+
+    def summarize(self) -> str:
+        """Summarize the use of the memo."""
+        lookups = self.hits + self.misses
+        return (
+            f'normalized {len(self)} distinct nodes for {lookups} nodes '
+            f'({self.hits / lookups if lookups else 0.0:.1%} hits)'
+        )
+
+
+def normalize_graph_names(graph: BELGraph, database: str, normalizer: Optional[NameNormalizer] = None) -> None:
+    """Normalize graph names, in place.
+
+    :param graph: graph of a pathway
+    :param database: database of the pathway (e.g., kegg)
+    :param normalizer: normalizer shared by the graphs of a run. If none, the nodes of this graph are normalized again.
+    """
+    if normalizer is None:
+        normalizer = NameNormalizer()
+
+    normalizer.normalize_graph(graph, database)
@@ -2,8 +2,9 @@
 
 """PyBEL generalized utils."""
 
+import itertools as itt
 import logging
-from typing import Iterable, Mapping
+from typing import Iterable, Mapping, Optional, Tuple
 
 from pybel import BELGraph
 from pybel.dsl import BaseEntity
@@ -19,15 +20,113 @@ def flatten_complex_nodes(graph: BELGraph) -> None:
     reaction_cartesian_expansion(graph)
 
 
-def multi_relabel(graph: BELGraph, mapping_dict: Mapping[BaseEntity, Iterable[BaseEntity]]) -> None:
-    """Expand one victim to multiple survivor nodes, in place."""
-    for victim, survivors in mapping_dict.items():
-        for survivor in survivors:
+def relabel_nodes_in_place(
+    graph: BELGraph,
+    mapping: Mapping[BaseEntity, BaseEntity],
+    multi_mapping: Optional[Mapping[BaseEntity, Iterable[BaseEntity]]] = None,
+) -> None:
+    """Relabel nodes to one survivor, then expand nodes to multiple survivors, in place.
+
+    It gives the same graph as :func:`networkx.relabel_nodes` followed by :func:`multi_relabel`, without copying the
+    graph: only the edges of the victims are rewritten, in a single pass. Survivors that are already in the graph are
+    merged with the victims and the edges between two expanded victims link all their survivors. The data of the edges
+    of a victim is moved to its first survivor and only copied for the others.
+
+    :param graph: graph
+    :param mapping: dictionary from victim to its survivor
+    :param multi_mapping: dictionary from victim to its survivors, applied to the graph relabeled with the mapping
+    """
+    # Victims relabeled to themselves (e.g., names that were already normalized) are kept as they are. Nodes are
+    # compared with != as dictionaries, so a survivor with the same BEL but other attributes still replaces its victim
+    mapping = {
+        victim: survivor
+        for victim, survivor in mapping.items()
+        if victim in graph and victim != survivor
+    }
+    survivors = set(mapping.values())
+    multi_mapping = {
+        victim: set(victim_survivors)
+        for victim, victim_survivors in (multi_mapping or {}).items()
+        if victim in survivors or (victim in graph and victim not in mapping)
+    }
+
+    victims = {
+        victim
+        for victim in itt.chain(mapping, multi_mapping)
+        if victim in graph
+    }
+    if not victims:
+        return
+
+    def _get_survivors(node: BaseEntity) -> Tuple[BaseEntity, ...]:
+        node = mapping.get(node, node)
+        return tuple(multi_mapping.get(node, (node,)))
+
+    survivors_of = {
+        victim: _get_survivors(victim)
+        for victim in victims
+    }
+
+    # The edges are rewired per pair of nodes with all their keys, since hashing the nodes is the most expensive part.
+    # The edges between two victims are both out and in edges of victims, so they are only taken once
+    adjacencies = [
+        (victim, v, keydict)
+        for victim in victims
+        for v, keydict in graph._succ[victim].items()
+    ]
+    adjacencies.extend(
+        (u, victim, keydict)
+        for victim in victims
+        for u, keydict in graph._pred[victim].items()
+        if u not in victims
+    )
+    nodes_data = [
+        (survivor, graph.nodes[victim])
+        for victim, survivor in mapping.items()
+        if survivor not in multi_mapping
+    ]
 
-            for u, _, k, d in graph.in_edges(victim, keys=True, data=True):
-                graph.add_edge(u, survivor, key=k, **d)
+    connected_victims = {
+        victim
+        for victim in victims
+        if graph._succ[victim] or graph._pred[victim]
+    }
 
-            for _, v, k, d in graph.out_edges(victim, keys=True, data=True):
-                graph.add_edge(survivor, v, key=k, **d)
+    graph.remove_nodes_from(victims)
 
-    graph.remove_nodes_from(mapping_dict.keys())
+    for survivor, data in nodes_data:
+        graph.add_node(survivor, **data)
+    # Like networkx.MultiDiGraph.add_edge, the survivors of a victim are only added if the victim had edges
+    graph.add_nodes_from(
+        survivor
+        for victim in connected_victims
+        for survivor in survivors_of[victim]
+    )
+
+    # Same as graph.add_edge(u_survivor, v_survivor, key=key, **data) for each edge, but the data of the edges of the
+    # victims, which are not in the graph anymore, is given to their first survivors instead of being copied.
+    # It writes in the private adjacency dictionaries of networkx.MultiDiGraph, in which graph._succ[u][v] and
+    # graph._pred[v][u] are the same dictionary from edge key to edge data. This relies on the layout of networkx 2
+    # (pybel 0.13 requires networkx>=2.1) and was checked with networkx 2.5.1, so check it again when upgrading
+    for u, v, keydict in adjacencies:
+        is_first = True
+        for u_survivor in survivors_of.get(u, (u,)):
+            u_successors = graph._succ[u_survivor]
+            for v_survivor in survivors_of.get(v, (v,)):
+                survivor_keydict = u_successors.get(v_survivor)
+                if survivor_keydict is None:
+                    survivor_keydict = u_successors[v_survivor] = graph._pred[v_survivor][u_survivor] = {}
+
+                for key, data in keydict.items():
+                    survivor_data = survivor_keydict.get(key)
+                    if survivor_data is not None:
+                        survivor_data.update(data)
+                    else:
+                        survivor_keydict[key] = data if is_first else dict(data)
+
+                is_first = False
+
+
+def multi_relabel(graph: BELGraph, mapping_dict: Mapping[BaseEntity, Iterable[BaseEntity]]) -> None:
+    """Expand one victim to multiple survivor nodes, in place."""
+    relabel_nodes_in_place(graph, {}, mapping_dict)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""Consolidated cache of parsed RDF files.
+
+Every parsed file is stored as an entry of a single SQLite database, keyed by the path of the file and checked against
+the SHA-1 of its content, so entries are refreshed when the file changes. Graphs are stored with a compact encoding:
+a table with the distinct terms of the graph and an array with the indexes of the terms of each triple.
+"""
+
+import array
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+import rdflib
+from rdflib.term import BNode, Literal, URIRef
+
+from .constants import RDF_CACHE
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'RdfCache',
+    'encode_graph',
+    'decode_graph',
+    'get_file_sha1',
+]
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS rdf_graph (
+    path TEXT PRIMARY KEY,
+    sha1 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    format TEXT NOT NULL,
+    accessed REAL NOT NULL,
+    terms BLOB NOT NULL,
+    triples BLOB NOT NULL
+)
+"""
+
+#: Codes of the types of RDF terms in the term table
+_URI, _BNODE, _LITERAL = 0, 1, 2
+
+#: Type code of the triples array (unsigned int of at least 4 bytes)
+_INDEX_TYPE = 'I' if array.array('I').itemsize >= 4 else 'L'
+
+
+def get_file_sha1(path: str) -> str:
+    """Get the SHA-1 of the content of a file, read in chunks.
+
+    The hash is only used to notice changes in files, not for security.
+
+    :param path: file path
+    """
+    try:
+        sha1 = hashlib.sha1(usedforsecurity=False)
+    except TypeError:  # The flag is only available since Python 3.9
+        sha1 = hashlib.sha1()  # noqa: S324
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+def _encode_term(term: rdflib.term.Node) -> List:
+    """Encode a RDF term as a JSON serializable list."""
+    if isinstance(term, URIRef):
+        return [_URI, str(term)]
+
+    if isinstance(term, BNode):
+        return [_BNODE, str(term)]
+
+    return [
+        _LITERAL,
+        str(term),
+        str(term.datatype) if term.datatype is not None else None,
+        term.language,
+    ]
+
+
+def _decode_term(encoded_term: List) -> rdflib.term.Node:
+    """Decode a RDF term encoded by :func:`_encode_term`."""
+    if encoded_term[0] == _URI:
+        return URIRef(encoded_term[1])
+
+    if encoded_term[0] == _BNODE:
+        return BNode(encoded_term[1])
+
+    _, value, datatype, language = encoded_term
+    return Literal(value, datatype=datatype, lang=language)
+
+
+def encode_graph(graph: rdflib.Graph) -> Tuple[bytes, bytes]:
+    """Encode a RDF graph as a table of terms and an array of triples of term indexes.
+
+    :param graph: RDF graph
+    :return: compressed JSON with the namespace bindings and the terms, and compressed array with the triples
+    """
+    term_indexes = {}
+    triples = array.array(_INDEX_TYPE)
+
+    for triple in graph:
+        for term in triple:
+            index = term_indexes.get(term)
+            if index is None:
+                index = term_indexes[term] = len(term_indexes)
+            triples.append(index)
+
+    terms = {
+        'namespaces': [[prefix, str(namespace)] for prefix, namespace in graph.namespaces()],
+        'terms': [_encode_term(term) for term in term_indexes],
+    }
+
+    return (
+        zlib.compress(json.dumps(terms, separators=(',', ':')).encode('utf-8')),
+        zlib.compress(triples.tobytes()),
+    )
+
+
+def decode_graph(terms: bytes, triples: bytes) -> rdflib.Graph:
+    """Decode a RDF graph encoded by :func:`encode_graph`.
+
+    :param terms: compressed JSON with the namespace bindings and the terms
+    :param triples: compressed array with the triples
+    """
+    terms = json.loads(zlib.decompress(terms).decode('utf-8'))
+    nodes = [_decode_term(term) for term in terms['terms']]
+
+    indexes = array.array(_INDEX_TYPE)
+    indexes.frombytes(zlib.decompress(triples))
+
+    graph = rdflib.Graph()
+
+    for prefix, namespace in terms['namespaces']:
+        graph.bind(prefix, namespace)
+
+    add = graph.store.add
+    for start in range(0, len(indexes), 3):
+        add((nodes[indexes[start]], nodes[indexes[start + 1]], nodes[indexes[start + 2]]), graph)
+
+    return graph
+
+
+class RdfCache:
+    """Cache of parsed RDF files in a SQLite database."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the cache.
+
+        :param path: path of the SQLite database. Defaults to ``rdf_cache.db`` in the PathMe data folder
+        """
+        self.path = path or RDF_CACHE
+
+        with self._connect() as connection:
+            connection.execute(_CREATE_TABLE)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connect to the database in a transaction. Waits while other processes are writing to it."""
+        connection = sqlite3.connect(self.path, timeout=300)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def parse(self, path: str, fmt: str) -> rdflib.Graph:
+        """Get the graph of a RDF file from the cache, parsing and caching it if it is missing or outdated.
+
+        :param path: RDF file path
+        :param fmt: RDF file format
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT sha1, size, mtime, terms, triples FROM rdf_graph WHERE path = ? AND format = ?',
+                (key, fmt),
+            ).fetchone()
+
+        sha1 = None
+
+        if row is not None:
+            cached_sha1, size, mtime, terms, triples = row
+
+            # Only hash the file again if it was touched since it was cached
+            if (size, mtime) != (stat.st_size, stat.st_mtime):
+                sha1 = get_file_sha1(path)
+
+            if sha1 is None or sha1 == cached_sha1:
+                with self._connect() as connection:
+                    connection.execute(
+                        'UPDATE rdf_graph SET accessed = ?, size = ?, mtime = ? WHERE path = ?',
+                        (time.time(), stat.st_size, stat.st_mtime, key),
+                    )
+
+                return decode_graph(terms, triples)
+
+            logger.debug('%s changed since it was cached', path)
+
+        graph = rdflib.Graph()
+        graph.parse(path, format=fmt)
+
+        terms, triples = encode_graph(graph)
+
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO rdf_graph VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, sha1 or get_file_sha1(path), stat.st_size, stat.st_mtime, fmt, time.time(), terms, triples),
+            )
+
+        return graph
+
+    def evict(self, max_age: Optional[float] = None) -> int:
+        """Remove the entries of files that do not exist anymore (e.g., from old releases) or that were not used lately.
+
+        :param max_age: remove the entries that were not used in this number of seconds
+        :return: number of removed entries
+        """
+        with self._connect() as connection:
+            rows = connection.execute('SELECT path, accessed FROM rdf_graph').fetchall()
+
+        evicted_paths = [
+            (path,)
+            for path, accessed in rows
+            if not os.path.exists(path) or (max_age is not None and time.time() - accessed > max_age)
+        ]
+
+        if not evicted_paths:
+            return 0
+
+        with self._connect() as connection:
+            connection.executemany('DELETE FROM rdf_graph WHERE path = ?', evicted_paths)
+
+        # Give the space back to the file system (cannot run inside a transaction)
+        connection = sqlite3.connect(self.path, timeout=300)
+        try:
+            connection.execute('VACUUM')
+        finally:
+            connection.close()
+
+        return len(evicted_paths)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._connect() as connection:
+            connection.execute('DELETE FROM rdf_graph')
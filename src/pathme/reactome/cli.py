@@ -2,6 +2,7 @@
 
 """Command line interface."""
 
+import json
 import logging
 import os
 import time
@@ -12,11 +13,19 @@ from tqdm import tqdm
 from bio2bel_chebi import Manager as ChebiManager
 from bio2bel_hgnc import Manager as HgncManager
 from pybel import from_pickle
-from .rdf_sparql import get_reactome_statistics, reactome_to_bel
-from .utils import untar_file
-from ..constants import DATA_DIR, DEFAULT_CACHE_CONNECTION, RDF_REACTOME, REACTOME_BEL, REACTOME_FILES
+from .partition import partition_reactome_file, reactome_shards_to_bel
+from .rdf_sparql import get_reactome_statistics, reactome_species_to_bel
+from .utils import get_reactome_species_files, untar_file
+from ..constants import (
+    DATA_DIR, DEFAULT_CACHE_CONNECTION, DEFAULT_SPECIES, RDF_REACTOME, REACTOME_BEL, REACTOME_FILES, REACTOME_SHARDS,
+)
 from ..export_utils import get_paths_in_folder
-from ..utils import make_downloader, statistics_to_df, summarize_helper
+from ..metrics import export_resolution_metrics
+from ..resolver import get_chebi_resolver, get_hgnc_resolver
+from ..utils import (
+    get_species_export_folder, get_statistics_cache_key, load_statistics_cache, make_downloader, parse_species_option,
+    statistics_to_df, summarize_helper, summarize_statistics_cache,
+)
 from ..wikipathways.utils import get_file_name_from_url
 
 __all__ = [
@@ -26,13 +35,30 @@ __all__ = [
 logger = logging.getLogger(__name__)
 
 
+def _get_statistics_name(species: str) -> str:
+    """Return the name of the statistics files of a species."""
+    if species == DEFAULT_SPECIES:
+        return 'reactome_statistics'
+
+    return f'reactome_{species}_statistics'
+
+
+def _get_statistics_cache(species: str) -> str:
+    """Return the path of the per-pathway statistics written during the conversion of a species."""
+    return os.path.join(DATA_DIR, f'{_get_statistics_name(species)}.json')
+
+
 @click.group()
 def main():
     """Manage Reactome."""
 
 
 @main.command(help='Downloads Reactome RDF files')
-def download():
+@click.option(
+    '-s', '--species', multiple=True, default=[DEFAULT_SPECIES], show_default=True,
+    help='Species to extract from the release. Can be given multiple times, comma separated or "all"',
+)
+def download(species):
     """Download Reactome RDF."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     logger.setLevel(logging.INFO)
@@ -40,13 +66,53 @@ def download():
     logger.info('Downloading Reactome RDF file')
 
     cached_file = os.path.join(REACTOME_FILES, get_file_name_from_url(RDF_REACTOME))
-    make_downloader(RDF_REACTOME, cached_file, REACTOME_FILES, untar_file)
+    make_downloader(RDF_REACTOME, cached_file, REACTOME_FILES, untar_file, species=parse_species_option(species))
     logger.info('Reactome was downloaded')
 
 
 @main.command()
+@click.option(
+    '-s', '--species', multiple=True, default=[DEFAULT_SPECIES], show_default=True,
+    help='Species to partition. Can be given multiple times, comma separated or "all"',
+)
+@click.option('-o', '--shard-folder', default=REACTOME_SHARDS, show_default=True)
+def partition(species, shard_folder):
+    """Split Reactome into one RDF file per pathway."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+
+    species_files = get_reactome_species_files(REACTOME_FILES, parse_species_option(species))
+
+    for species_name, resource_file in species_files.items():
+        index = partition_reactome_file(resource_file, os.path.join(shard_folder, species_name))
+        logger.info('%s partitioned in %d pathways', species_name, len(index))
+
+
+@main.command()
+@click.option('-c', '--connection', help=f"Defaults to {DEFAULT_CACHE_CONNECTION}")
+@click.option(
+    '-s', '--species', multiple=True, default=[DEFAULT_SPECIES], show_default=True,
+    help='Species to convert (e.g., Mus_musculus). Can be given multiple times, comma separated or "all"',
+)
+@click.option('-e', '--export-folder', default=REACTOME_BEL, show_default=True)
+@click.option('-j', '--jobs', type=int, help='Number of species converted in parallel. Defaults to the number of CPUs')
+@click.option('--statistics', is_flag=True, help='Also compute the RDF and BEL statistics of each pathway')
+@click.option(
+    '--shard-folder',
+    help=f'Convert the pathways from the shards written by "pathme reactome partition" (e.g., {REACTOME_SHARDS})',
+)
+@click.option(
+    '-p', '--pathway', 'pathways', multiple=True,
+    help='Convert again the given pathway (name of its BEL pickle without extension). Requires --shard-folder',
+)
+@click.option(
+    '--hgnc-snapshot/--no-hgnc-snapshot', default=True, show_default=True,
+    help='Load all the HGNC mappings in memory. Otherwise, the genes of each pathway are resolved in batch',
+)
+@click.option('--metrics-path', help='JSON file with the resolution metrics. Defaults to next to the export folder')
 @click.option('-v', '--verbose', is_flag=True)
-def bel(verbose):
+def bel(
+    connection, species, export_folder, jobs, statistics, shard_folder, pathways, hgnc_snapshot, metrics_path, verbose,
+):
     """Convert Reactome to BEL."""
     logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     if verbose:
@@ -56,20 +122,70 @@ def bel(verbose):
 
     t = time.time()
 
+    if pathways and not shard_folder:
+        raise click.UsageError('--pathway requires --shard-folder')
+
+    species_names = parse_species_option(species)
+
+    if shard_folder:
+        if species_names is None:
+            species_names = sorted(os.listdir(shard_folder))
+        species_files = None
+    else:
+        species_files = get_reactome_species_files(REACTOME_FILES, species_names)
+        species_names = list(species_files)
+
     logger.info('Initiating HGNC Manager')
-    hgnc_manager = HgncManager()
-    chebi_manager = ChebiManager()
+    hgnc_manager = HgncManager(connection=connection)
+    chebi_manager = ChebiManager(connection=connection)
 
+    # Populate once before forking so the workers share the same HGNC and ChEBI databases
     if not hgnc_manager.is_populated():
         click.echo('bio2bel_hgnc was not populated. Populating now.')
         hgnc_manager.populate()
 
-    resource_file = os.path.join(REACTOME_FILES, 'Homo_sapiens.owl')
+    if not chebi_manager.is_populated():
+        click.echo('bio2bel_chebi was not populated. Populating now.')
+        chebi_manager.populate()
+
+    # Write the snapshots of the mappings before forking, so the workers map them instead of querying the databases
+    if hgnc_snapshot:
+        get_hgnc_resolver(hgnc_manager)
 
-    reactome_to_bel(resource_file, hgnc_manager, chebi_manager)
+    get_chebi_resolver(chebi_manager)
+
+    logger.info('Converting Reactome for: %s', ', '.join(species_names))
+
+    if shard_folder:
+        # Species one after the other, the pathways of each of them in parallel
+        for species_name in species_names:
+            reactome_shards_to_bel(
+                os.path.join(shard_folder, species_name),
+                export_folder=get_species_export_folder(export_folder, species_name),
+                connection=connection,
+                processes=jobs,
+                pathways=pathways or None,
+                statistics_path=_get_statistics_cache(species_name) if statistics else None,
+                hgnc_snapshot=hgnc_snapshot,
+            )
+
+    else:
+        reactome_species_to_bel(
+            species_files,
+            export_folder=export_folder,
+            connection=connection,
+            processes=jobs,
+            statistics_paths={
+                species_name: _get_statistics_cache(species_name)
+                for species_name in species_files
+            } if statistics else None,
+            hgnc_snapshot=hgnc_snapshot,
+        )
 
     logger.info('Reactome exported in %.2f seconds', time.time() - t)
 
+    export_resolution_metrics(export_folder, metrics_path)
+
 
 @main.command()
 @click.option('-e', '--export-folder', default=REACTOME_BEL, show_default=True)
@@ -92,24 +208,46 @@ def summarize(export_folder):
 @click.option('-v', '--verbose', is_flag=True)
 @click.option('-x', '--only-canonical', default=True, help='Parse only canonical pathways')
 @click.option('-e', '--export', default=False, help='Export to datasheet csv and xls')
-def statistics(connection, verbose, only_canonical, export):
+@click.option(
+    '-s', '--species', multiple=True, default=[DEFAULT_SPECIES], show_default=True,
+    help='Species to analyze. Can be given multiple times, comma separated or "all"',
+)
+def statistics(connection, verbose, only_canonical, export, species):
     """Generate statistics for a database."""
     logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     if verbose:
         logger.setLevel(logging.DEBUG)
 
     logger.info('Initiating HGNC Manager')
-    hgnc_manager = HgncManager()
-    chebi_manager = ChebiManager()
+    hgnc_manager = get_hgnc_resolver(HgncManager(connection=connection))
+    chebi_manager = get_chebi_resolver(ChebiManager(connection=connection))
+
+    species_files = get_reactome_species_files(REACTOME_FILES, parse_species_option(species))
+
+    for species_name, resource_file in species_files.items():
+        statistics_cache = _get_statistics_cache(species_name)
+
+        # Reuse the statistics computed by "pathme reactome bel --statistics" from the same file instead of converting
+        # everything again
+        pathways_statistics = load_statistics_cache(statistics_cache, get_statistics_cache_key(resource_file))
+
+        if pathways_statistics:
+            logger.info('Loading statistics for %s from %s', species_name, statistics_cache)
+            global_statistics, all_pathways_statistics = summarize_statistics_cache(pathways_statistics)
 
-    resource_file = os.path.join(REACTOME_FILES, 'Homo_sapiens.owl')
+        else:
+            logger.info('Generating statistics for %s', species_name)
+            global_statistics, all_pathways_statistics = get_reactome_statistics(
+                resource_file, hgnc_manager, chebi_manager,
+            )
 
-    global_statistics, all_pathways_statistics = get_reactome_statistics(resource_file, hgnc_manager, chebi_manager)
+        logger.info('%s: %s', species_name, json.dumps(global_statistics['bel_vs_rdf']))
 
-    if export:
-        df = statistics_to_df(all_pathways_statistics)
-        df.to_excel(os.path.join(DATA_DIR, 'reactome_statistics.xlsx'))
-        df.to_csv(os.path.join(DATA_DIR, 'reactome_statistics.csv'))
+        if export:
+            file_name = _get_statistics_name(species_name)
+            df = statistics_to_df(all_pathways_statistics)
+            df.to_excel(os.path.join(DATA_DIR, f'{file_name}.xlsx'))
+            df.to_csv(os.path.join(DATA_DIR, f'{file_name}.csv'))
 
 
 if __name__ == '__main__':
@@ -12,8 +12,10 @@ from pybel.dsl import (
     BaseEntity, NamedComplexAbundance, abundance, activity, bioprocess, complex_abundance,
     composite_abundance, gene, protein, reaction, rna,
 )
-from .utils import get_valid_node_parameters, process_multiple_proteins
+from .utils import get_gene_lookups, get_valid_node_parameters, process_multiple_proteins
 from ..constants import ACTIVITY_ALLOWED_MODIFIERS, REACTOME_CITATION, UNKNOWN
+from ..metrics import InstrumentedManager
+from ..resolver import prefetch_hgnc_lookups
 from ..utils import add_bel_metadata, parse_id_uri
 
 __all__ = [
@@ -52,6 +54,15 @@ def convert_to_bel(
 
     graph.graph['pathway_id'] = identifier
 
+    # Resolve the genes of all the nodes at once instead of one query per node
+    hgnc_manager = prefetch_hgnc_lookups(hgnc_manager, (
+        lookup
+        for node in nodes.values()
+        for lookup in get_gene_lookups(node)
+    ))
+    hgnc_manager = InstrumentedManager.wrap(hgnc_manager)
+    chebi_manager = InstrumentedManager.wrap(chebi_manager)
+
     nodes = nodes_to_bel(nodes, graph, hgnc_manager, chebi_manager)
 
     for interaction in interactions:
@@ -80,7 +91,9 @@ def node_to_bel(node: Dict, graph, hgnc_manager: HgncManager, chebi_manager: Che
     """Convert node dictionary to BEL node object."""
     node_types = node['entity_type']
 
-    identifier, name, namespace = get_valid_node_parameters(node, hgnc_manager, chebi_manager)
+    identifier, name, namespace = get_valid_node_parameters(
+        node, hgnc_manager, chebi_manager, graph.graph.get('pathway_id'),
+    )
     members = set()
 
     if namespace == 'hgnc_multiple_entry':
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+
+"""This module partitions the Reactome BioPAX file into one small RDF shard per pathway.
+
+Each shard contains the triples that the SPARQL queries in :mod:`pathme.reactome.rdf_sparql` need to convert its
+pathway: the pathway itself, its components, the participants and controls of its reactions, the members of the
+complexes (recursively) and the entity references and cross-references of all of them. Shards are written as gzipped
+N-Triples next to an ``index.json`` file, so a pathway can be converted without loading the whole release.
+"""
+
+import gzip
+import json
+import logging
+import os
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import rdflib
+from rdflib import Namespace, RDF
+from tqdm import tqdm
+
+from bio2bel_chebi import Manager as ChebiManager
+from bio2bel_hgnc import Manager as HgncManager
+from .rdf_sparql import GET_ALL_PATHWAYS, PREFIXES, export_reactome_pathway, get_reactome_pathway_file_name
+from ..constants import REACTOME_BEL
+from ..metrics import ResolutionMetrics, collect_resolution_metrics, get_resolution_metrics
+from ..resolver import get_chebi_resolver, get_hgnc_resolver
+from ..utils import export_statistics_cache, get_statistics_cache_key, load_statistics_cache, parse_rdf
+
+__all__ = [
+    'get_reactome_pathway_triples',
+    'partition_reactome_graph',
+    'partition_reactome_file',
+    'load_reactome_shard_index',
+    'load_reactome_shard',
+    'reactome_shards_to_bel',
+]
+
+logger = logging.getLogger(__name__)
+
+BIOPAX = Namespace('http://www.biopax.org/release/biopax-level3.owl#')
+
+#: Name of the file describing the shards in a shard folder
+SHARD_INDEX = 'index.json'
+
+#: Name of the file with the key of the BioPAX file the shards were written from (see
+#: :func:`pathme.utils.get_statistics_cache_key`)
+SHARD_SOURCE = 'source.json'
+
+Triple = Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+
+
+class _PathwayTriples:
+    """Collect the triples needed to convert Reactome pathways, memoizing the closure of each entity."""
+
+    def __init__(self, rdf_graph: rdflib.Graph):
+        """Initialize the collector.
+
+        :param rdf_graph: RDF graph of the Reactome release
+        """
+        self.rdf_graph = rdf_graph
+        self.entity_triples = {}
+        self.shared_triples = self._get_control_type_triples()
+
+    def _get_control_type_triples(self) -> Set[Triple]:
+        """Get one controlType statement per control type in the graph.
+
+        The control type pattern of the reaction participants query is evaluated even when a reaction has no control,
+        in which case it matches every control type of the graph. These statements are added to every shard so the
+        query returns the same results as on the whole release.
+        """
+        control_types = {}
+        for control, _, control_type in self.rdf_graph.triples((None, BIOPAX.controlType, None)):
+            control_types.setdefault(control_type, (control, BIOPAX.controlType, control_type))
+
+        return set(control_types.values())
+
+    def _get_description(self, subject: rdflib.term.Node) -> Set[Triple]:
+        """Get the statements about a resource and its entity reference and cross-references."""
+        triples = set(self.rdf_graph.triples((subject, None, None)))
+
+        references = [
+            obj
+            for _, predicate, obj in triples
+            if predicate in {BIOPAX.entityReference, BIOPAX.xref}
+        ]
+        for reference in references:
+            triples.update(self.rdf_graph.triples((reference, None, None)))
+
+        return triples
+
+    def get_entity_triples(self, entity: rdflib.term.Node) -> Set[Triple]:
+        """Get the statements about an entity (Protein, Complex, SmallMolecule...) and its complex components.
+
+        :param entity: URI of the entity
+        """
+        triples = self.entity_triples.get(entity)
+        if triples is not None:
+            return triples
+
+        # Guard against complexes that (directly or not) contain themselves
+        self.entity_triples[entity] = set()
+
+        triples = self._get_description(entity)
+        for component in self.rdf_graph.objects(entity, BIOPAX.component):
+            triples |= self.get_entity_triples(component)
+
+        self.entity_triples[entity] = triples
+        return triples
+
+    def get_reaction_triples(self, reaction: rdflib.term.Node) -> Set[Triple]:
+        """Get the statements about a reaction, its participants and the controls acting on it.
+
+        :param reaction: URI of the reaction
+        """
+        triples = self._get_description(reaction)
+
+        for predicate in (BIOPAX.left, BIOPAX.right):
+            for participant in self.rdf_graph.objects(reaction, predicate):
+                triples |= self.get_entity_triples(participant)
+
+        for control in self.rdf_graph.subjects(BIOPAX.controlled, reaction):
+            triples |= self._get_description(control)
+
+        return triples
+
+    def get_pathway_triples(self, pathway: rdflib.term.Node) -> Set[Triple]:
+        """Get the statements needed to convert a pathway.
+
+        :param pathway: URI of the pathway
+        """
+        triples = self._get_description(pathway) | self.shared_triples
+
+        for component in self.rdf_graph.objects(pathway, BIOPAX.pathwayComponent):
+            component_types = set(self.rdf_graph.objects(component, RDF.type))
+
+            if BIOPAX.BiochemicalReaction in component_types:
+                triples |= self.get_reaction_triples(component)
+            else:
+                triples |= self.get_entity_triples(component)
+
+        return triples
+
+
+def get_reactome_pathway_triples(pathway_uri: rdflib.URIRef, rdf_graph: rdflib.Graph) -> Set[Triple]:
+    """Get the statements needed to convert a Reactome pathway.
+
+    :param pathway_uri: URI of the pathway
+    :param rdf_graph: RDF graph of the Reactome release
+    """
+    return _PathwayTriples(rdf_graph).get_pathway_triples(pathway_uri)
+
+
+def _write_shard(triples: Iterable[Triple], path: str) -> None:
+    """Write triples to a gzipped N-Triples file."""
+    shard_graph = rdflib.Graph()
+    for triple in triples:
+        shard_graph.add(triple)
+
+    tmp_path = f'{path}.tmp'
+    with gzip.open(tmp_path, 'wb') as file:
+        file.write(shard_graph.serialize(format='nt'))
+
+    os.replace(tmp_path, path)
+
+
+def partition_reactome_graph(rdf_graph: rdflib.Graph, shard_folder: str) -> Dict[str, Dict[str, str]]:
+    """Write one shard per pathway of a Reactome RDF graph.
+
+    :param rdf_graph: RDF graph of the Reactome release
+    :param shard_folder: folder where the shards and their index are written
+    :return: dictionary from pathway file name (see :func:`pathme.reactome.rdf_sparql.get_reactome_pathway_file_name`)
+     to the URI, name and shard file of the pathway
+    """
+    os.makedirs(shard_folder, exist_ok=True)
+
+    # The shards of a graph do not come from a known file
+    source_path = os.path.join(shard_folder, SHARD_SOURCE)
+    if os.path.exists(source_path):
+        os.remove(source_path)
+
+    collector = _PathwayTriples(rdf_graph)
+    index = {}
+
+    for pathway_uri, pathway_name in tqdm(
+        rdf_graph.query(GET_ALL_PATHWAYS, initNs=PREFIXES),
+        desc=f'Partitioning Reactome to {shard_folder}',
+    ):
+        file_name = get_reactome_pathway_file_name(pathway_uri)
+        if file_name in index:  # pathways with multiple names
+            continue
+
+        shard = f'{file_name}.nt.gz'
+
+        _write_shard(collector.get_pathway_triples(pathway_uri), os.path.join(shard_folder, shard))
+
+        index[file_name] = {
+            'uri': str(pathway_uri),
+            'name': str(pathway_name),
+            'shard': shard,
+        }
+
+    with open(os.path.join(shard_folder, SHARD_INDEX), 'w') as file:
+        json.dump(index, file, indent=2, sort_keys=True)
+
+    return index
+
+
+def partition_reactome_file(resource_file: str, shard_folder: str) -> Dict[str, Dict[str, str]]:
+    """Write one shard per pathway of a Reactome BioPAX file.
+
+    :param resource_file: BioPAX file of a species (e.g., Homo_sapiens.owl)
+    :param shard_folder: folder where the shards and their index are written
+    """
+    logger.info('Parsing Reactome RDF file')
+    rdf_graph = parse_rdf(resource_file, fmt='xml')
+
+    index = partition_reactome_graph(rdf_graph, shard_folder)
+
+    with open(os.path.join(shard_folder, SHARD_SOURCE), 'w') as file:
+        json.dump(get_statistics_cache_key(resource_file), file, indent=2, sort_keys=True)
+
+    return index
+
+
+def load_reactome_shard_index(shard_folder: str) -> Dict[str, Dict[str, str]]:
+    """Load the index of a shard folder.
+
+    :param shard_folder: folder written by :func:`partition_reactome_graph`
+    """
+    index_path = os.path.join(shard_folder, SHARD_INDEX)
+
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(
+            f'There are no Reactome shards in {shard_folder}. Please run "python3 -m pathme reactome partition"',
+        )
+
+    with open(index_path) as file:
+        return json.load(file)
+
+
+def _load_shard_source(shard_folder: str) -> Optional[Dict[str, str]]:
+    """Load the key of the BioPAX file the shards were written from. None if it is not known.
+
+    :param shard_folder: folder written by :func:`partition_reactome_file`
+    """
+    source_path = os.path.join(shard_folder, SHARD_SOURCE)
+
+    if not os.path.exists(source_path):
+        return None
+
+    with open(source_path) as file:
+        return json.load(file)
+
+
+def load_reactome_shard(path: str) -> rdflib.Graph:
+    """Load the RDF graph of a shard.
+
+    :param path: path to the gzipped N-Triples file
+    """
+    rdf_graph = rdflib.Graph()
+
+    with gzip.open(path, 'rb') as file:
+        rdf_graph.parse(file, format='nt')
+
+    return rdf_graph
+
+
+#: Managers of a shard conversion worker process
+_worker_managers = {}
+
+
+def _init_shard_worker(connection: Optional[str], hgnc_snapshot: bool = True) -> None:
+    """Initialize a worker process and open its managers.
+
+    :param connection: database connection string used by the managers
+    :param hgnc_snapshot: load the HGNC mappings from the snapshot of the database. Otherwise, the genes of each
+     pathway are resolved in batch
+    """
+    # Forked workers start with a copy of the metrics of the parent process, which are already counted there
+    collect_resolution_metrics()
+
+    _open_shard_managers(connection, hgnc_snapshot)
+
+
+def _open_shard_managers(connection: Optional[str], hgnc_snapshot: bool = True) -> None:
+    """Open the managers used to convert the shards in this process.
+
+    :param connection: database connection string used by the managers
+    :param hgnc_snapshot: load the HGNC mappings from the snapshot of the database. Otherwise, the genes of each
+     pathway are resolved in batch
+    """
+    hgnc_manager = HgncManager(connection=connection)
+    _worker_managers['hgnc'] = get_hgnc_resolver(hgnc_manager) if hgnc_snapshot else hgnc_manager
+    _worker_managers['chebi'] = get_chebi_resolver(ChebiManager(connection=connection))
+
+
+def _shard_to_bel(task: Tuple[str, str, str, str, bool]) -> Tuple[str, Optional[Dict], Dict]:
+    """Convert the pathway of a shard to BEL.
+
+    :param task: pathway file name, pathway URI, shard path, pickle path and whether statistics are computed
+    :return: the pathway file name, its statistics and the resolution metrics of the conversion (see
+     :mod:`pathme.metrics`)
+    """
+    file_name, pathway_uri, shard_path, pickle_file, statistics = task
+
+    pathway_statistics = export_reactome_pathway(
+        rdflib.URIRef(pathway_uri),
+        load_reactome_shard(shard_path),
+        _worker_managers['hgnc'],
+        _worker_managers['chebi'],
+        pickle_file,
+        statistics=statistics,
+    )
+
+    return file_name, pathway_statistics, collect_resolution_metrics().to_dict()
+
+
+def _iterate_results(results, total: int, export_folder: str):
+    """Iterate over the results of the conversion with a progress bar."""
+    return tqdm(results, total=total, desc=f'Exporting Reactome BEL to {export_folder}')
+
+
+def _update_statistics(pathways_statistics: Optional[Dict[str, Dict]], results) -> None:
+    """Consume the results of the conversion, keeping the statistics of each pathway and merging the metrics."""
+    for file_name, pathway_statistics, pathway_metrics in results:
+        get_resolution_metrics().merge(ResolutionMetrics.from_dict(pathway_metrics))
+
+        if pathways_statistics is not None:
+            pathways_statistics[file_name] = pathway_statistics
+
+
+def reactome_shards_to_bel(
+    shard_folder: str,
+    export_folder: str = REACTOME_BEL,
+    connection: Optional[str] = None,
+    processes: Optional[int] = None,
+    pathways: Optional[Iterable[str]] = None,
+    statistics_path: Optional[str] = None,
+    hgnc_snapshot: bool = True,
+) -> None:
+    """Create Reactome BEL graphs from the shards of a species.
+
+    Pathways are converted in parallel, each worker loading only the shard of the pathway it converts.
+
+    :param shard_folder: folder written by :func:`partition_reactome_graph`
+    :param export_folder: folder where the BEL graphs are exported
+    :param connection: database connection string used by the managers
+    :param processes: number of worker processes. Defaults to the number of CPUs
+    :param pathways: pathways (e.g., R-HSA-109581) to convert again even if they were already exported. If None, all
+     pathways that have not been exported yet are converted
+    :param statistics_path: if given, the RDF and BEL statistics of each pathway are computed during the conversion
+     and exported to this JSON file (see :func:`pathme.utils.load_statistics_cache`). The statistics computed from
+     another version of the BioPAX file are computed again
+    :param hgnc_snapshot: load all the HGNC mappings in memory (see :func:`pathme.resolver.get_hgnc_resolver`).
+     Otherwise, the genes of each pathway are resolved in batch
+    """
+    index = load_reactome_shard_index(shard_folder)
+
+    statistics_key = _load_shard_source(shard_folder)
+    pathways_statistics = load_statistics_cache(statistics_path, statistics_key) if statistics_path else None
+
+    if pathways is not None:
+        pathways = set(pathways)
+        unknown_pathways = pathways.difference(index)
+        if unknown_pathways:
+            raise ValueError(f'Pathways not found in {shard_folder}: {", ".join(sorted(unknown_pathways))}')
+
+    os.makedirs(export_folder, exist_ok=True)
+
+    tasks: List[Tuple[str, str, str, str, bool]] = []
+    for file_name, entry in sorted(index.items()):
+        pickle_file = os.path.join(export_folder, f'{file_name}.pickle')
+
+        if pathways is not None:
+            if file_name not in pathways:
+                continue
+
+            if os.path.exists(pickle_file):
+                os.remove(pickle_file)
+
+        elif os.path.exists(pickle_file) and (pathways_statistics is None or file_name in pathways_statistics):
+            continue
+
+        tasks.append((
+            file_name,
+            entry['uri'],
+            os.path.join(shard_folder, entry['shard']),
+            pickle_file,
+            pathways_statistics is not None,
+        ))
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1 or len(tasks) <= 1:
+        _open_shard_managers(connection, hgnc_snapshot)
+        results = _iterate_results(map(_shard_to_bel, tasks), len(tasks), export_folder)
+        _update_statistics(pathways_statistics, results)
+
+    else:
+        with Pool(processes=processes, initializer=_init_shard_worker, initargs=(connection, hgnc_snapshot)) as pool:
+            results = pool.imap_unordered(_shard_to_bel, tasks, chunksize=max(1, len(tasks) // (processes * 8)))
+            _update_statistics(pathways_statistics, _iterate_results(results, len(tasks), export_folder))
+
+    if pathways_statistics is not None:
+        export_statistics_cache(pathways_statistics, statistics_path, statistics_key)
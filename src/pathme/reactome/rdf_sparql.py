@@ -5,17 +5,25 @@
 import logging
 import os
 from collections import defaultdict
-from typing import Any, Dict, List, Set, Tuple, Union
+from multiprocessing import Pool
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 import rdflib
 from rdflib import URIRef
 from rdflib.namespace import DC, DCTERMS, Namespace, OWL, RDF, RDFS, SKOS, XSD
 from tqdm import tqdm
 
-from pybel import BELGraph, to_pickle
+from bio2bel_chebi import Manager as ChebiManager
+from bio2bel_hgnc import Manager as HgncManager
+from pybel import BELGraph, from_pickle, to_pickle
 from .convert_to_bel import convert_to_bel
 from ..constants import REACTOME_BEL
-from ..utils import get_pathway_statitics, parse_rdf, query_result_to_dict
+from ..metrics import ResolutionMetrics, collect_resolution_metrics, get_resolution_metrics
+from ..resolver import get_chebi_resolver, get_hgnc_resolver
+from ..utils import (
+    add_pathway_statistics, export_statistics_cache, get_pathway_statitics, get_species_export_folder,
+    get_statistics_cache_key, load_statistics_cache, parse_rdf, query_result_to_dict,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -268,11 +276,29 @@ def _get_pathway_components(
     return nodes, list(interactions.values())
 
 
+def _get_reactome_pathway_statistics(nodes, interactions, bel_graph: BELGraph) -> Dict[str, Dict[str, int]]:
+    """Get the RDF and BEL types statistics of a Reactome pathway.
+
+    :param dict nodes: nodes extracted from the RDF
+    :param list interactions: interactions extracted from the RDF
+    :param bel_graph: BEL graph converted from the nodes and interactions
+    """
+    nodes_types = [
+        node['entity_type'] for node in nodes.values()
+    ]
+    edges_types = [
+        edge['metadata']['interaction_type'] for edge in interactions
+    ]
+
+    return get_pathway_statitics(nodes_types, edges_types, bel_graph)
+
+
 def get_reactome_statistics(resource_file, hgnc_manager, chebi_manager):
     """Get types statistics for Reactome.
 
     :param str resource_file: RDF file
     :param bio2bel_hgnc.Manager hgnc_manager: Hgnc Manager
+    :return: global statistics and statistics of each pathway
     """
     logger.info('Parsing Reactome RDF file')
     rdf_graph = parse_rdf(resource_file, fmt='xml')
@@ -280,25 +306,19 @@ def get_reactome_statistics(resource_file, hgnc_manager, chebi_manager):
     spaqrl_all_pathways = rdf_graph.query(GET_ALL_PATHWAYS, initNs=PREFIXES)
 
     global_statistics = defaultdict(lambda: defaultdict(int))
+    all_pathways_statistics = {}
 
     for pathway_uri, _pathway_title in tqdm(spaqrl_all_pathways, desc='Generating Reactome Statistics'):
         nodes, edges = _get_pathway_components(pathway_uri, rdf_graph)
         pathway_metadata = _get_pathway_metadata(pathway_uri, rdf_graph)
 
-        nodes_types = [
-            node['entity_type'] for node in nodes.values()
-        ]
-        edges_types = [
-            edge['metadata']['interaction_type'] for edge in edges
-        ]
-
         bel_graph = convert_to_bel(nodes, edges, pathway_metadata, hgnc_manager, chebi_manager)
 
-        global_statistics, pathway_statistics = get_pathway_statitics(
-            nodes_types, edges_types, bel_graph, global_statistics=global_statistics,
-        )
+        pathway_statistics = _get_reactome_pathway_statistics(nodes, edges, bel_graph)
+        add_pathway_statistics(global_statistics, pathway_statistics)
+        all_pathways_statistics[bel_graph.name] = pathway_statistics
 
-    return global_statistics
+    return global_statistics, all_pathways_statistics
 
 
 def reactome_pathway_to_bel(pathway_uri, rdf_graph, hgnc_manager, chebi_manager) -> BELGraph:
@@ -314,31 +334,186 @@ def reactome_pathway_to_bel(pathway_uri, rdf_graph, hgnc_manager, chebi_manager)
     return convert_to_bel(nodes, interactions, pathway_metadata, hgnc_manager, chebi_manager)
 
 
-def reactome_to_bel(resource_file: str, hgnc_manager, chebi_manager, export_folder=REACTOME_BEL):
+def get_reactome_pathway_file_name(pathway_uri: str) -> str:
+    """Get the name of the file where a Reactome pathway is exported.
+
+    :param pathway_uri: URI of the pathway
+    """
+    # Take the identifier of the pathway which is placed at the end of the URL and also strip the number
+    # next to it. (probably version of pathway)
+    return pathway_uri.split('/')[-1].split('.')[0]
+
+
+def export_reactome_pathway(
+    pathway_uri,
+    rdf_graph: rdflib.Graph,
+    hgnc_manager,
+    chebi_manager,
+    pickle_file: str,
+    statistics: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Convert a Reactome pathway to BEL and export it to a pickle.
+
+    If the pickle already exists, it is only loaded to compute the statistics.
+
+    :param pathway_uri: URI of the pathway
+    :param rdf_graph: RDF graph containing the pathway
+    :param bio2bel_hgnc.Manager hgnc_manager: Bio2BEL HGNC Manager
+    :param bio2bel_chebi.Manager chebi_manager: Bio2BEL ChEBI Manager
+    :param pickle_file: path of the exported pickle
+    :param statistics: compute the RDF and BEL statistics of the pathway
+    :return: name and statistics of the pathway if statistics is true
+    """
+    pathway_metadata = _get_pathway_metadata(pathway_uri, rdf_graph)
+    nodes, interactions = _get_pathway_components(pathway_uri, rdf_graph)
+
+    # Only the statistics are missing, reuse the exported graph
+    if os.path.exists(pickle_file):
+        bel_graph = from_pickle(pickle_file)
+    else:
+        bel_graph = convert_to_bel(nodes, interactions, pathway_metadata, hgnc_manager, chebi_manager)
+
+        # Export BELGraph to pickle
+        to_pickle(bel_graph, pickle_file)
+
+    if not statistics:
+        return None
+
+    return {
+        'name': bel_graph.name,
+        'statistics': _get_reactome_pathway_statistics(nodes, interactions, bel_graph),
+    }
+
+
+def reactome_to_bel(
+    resource_file: str,
+    hgnc_manager,
+    chebi_manager,
+    export_folder=REACTOME_BEL,
+    statistics_path: Optional[str] = None,
+):
     """Create Reactome BEL graphs.
 
     :param resource_file: rdf reactome file (there is only one)
     :param bio2bel_hgnc.Manager hgnc_manager: uniprot id to hgnc symbol dictionary
-    :return:
+    :param export_folder: folder where the BEL graphs are exported
+    :param statistics_path: if given, the RDF and BEL statistics of each pathway are computed during the conversion
+     and exported to this JSON file (see :func:`pathme.utils.load_statistics_cache`). The statistics computed from
+     another version of the resource file are computed again
     """
     logger.info('Parsing Reactome RDF file')
     rdf_graph = parse_rdf(resource_file, fmt='xml')
 
     pathways_uris_to_names = rdf_graph.query(GET_ALL_PATHWAYS, initNs=PREFIXES)
 
+    statistics_key = get_statistics_cache_key(resource_file) if statistics_path else None
+    pathways_statistics = load_statistics_cache(statistics_path, statistics_key) if statistics_path else None
+
     for pathway_uri, _pathway_name in tqdm(pathways_uris_to_names, desc=f'Exporting Reactome BEL to {export_folder}'):
 
-        # Take the identifier of the pathway which is placed at the end of the URL and also strip the number
-        # next to it. (probably version of pathway)
-        file_name = pathway_uri.split('/')[-1].split('.')[0]
+        file_name = get_reactome_pathway_file_name(pathway_uri)
 
         pickle_file = os.path.join(export_folder, f'{file_name}.pickle')
 
         # Skip if BEL file already exists
-        if os.path.exists(pickle_file):
+        if os.path.exists(pickle_file) and (pathways_statistics is None or file_name in pathways_statistics):
             continue
 
-        bel_graph = reactome_pathway_to_bel(pathway_uri, rdf_graph, hgnc_manager, chebi_manager)
+        pathway_statistics = export_reactome_pathway(
+            pathway_uri,
+            rdf_graph,
+            hgnc_manager,
+            chebi_manager,
+            pickle_file,
+            statistics=pathways_statistics is not None,
+        )
 
-        # Export BELGraph to pickle
-        to_pickle(bel_graph, pickle_file)
+        if pathways_statistics is not None:
+            pathways_statistics[file_name] = pathway_statistics
+
+    if pathways_statistics is not None:
+        export_statistics_cache(pathways_statistics, statistics_path, statistics_key)
+
+
+def _reactome_species_to_bel(task: Tuple[str, str, str, Optional[str], Optional[str], bool]) -> Tuple[str, Dict]:
+    """Convert the Reactome file of a species to BEL in a worker process.
+
+    Each worker opens its own managers since database sessions can not be shared across processes.
+
+    :param task: species name, OWL file, export folder, database connection, statistics file and whether the HGNC
+     mappings are loaded in memory
+    :return: the species that was converted and the resolution metrics of the conversion (see :mod:`pathme.metrics`)
+    """
+    species, resource_file, export_folder, connection, statistics_path, hgnc_snapshot = task
+
+    hgnc_manager = HgncManager(connection=connection)
+    if hgnc_snapshot:
+        hgnc_manager = get_hgnc_resolver(hgnc_manager)
+    chebi_manager = get_chebi_resolver(ChebiManager(connection=connection))
+
+    os.makedirs(export_folder, exist_ok=True)
+    reactome_to_bel(
+        resource_file, hgnc_manager, chebi_manager, export_folder=export_folder, statistics_path=statistics_path,
+    )
+
+    return species, collect_resolution_metrics().to_dict()
+
+
+def reactome_species_to_bel(
+    species_files: Mapping[str, str],
+    export_folder: str = REACTOME_BEL,
+    connection: Optional[str] = None,
+    processes: Optional[int] = None,
+    statistics_paths: Optional[Mapping[str, str]] = None,
+    hgnc_snapshot: bool = True,
+) -> None:
+    """Create Reactome BEL graphs for multiple species.
+
+    Every species is exported to its own folder (see :func:`pathme.utils.get_species_export_folder`). All workers
+    resolve against the same HGNC and ChEBI databases.
+
+    :param species_files: dictionary from species name to OWL file
+    :param export_folder: base folder where the BEL graphs are exported
+    :param connection: database connection string used by the managers
+    :param processes: number of worker processes. Defaults to one per species (up to the number of CPUs)
+    :param statistics_paths: dictionary from species name to the JSON file where the statistics of its pathways are
+     exported. If None, no statistics are computed
+    :param hgnc_snapshot: load all the HGNC mappings in memory (see :func:`pathme.resolver.get_hgnc_resolver`).
+     Otherwise, the genes of each pathway are resolved in batch
+    """
+    # Schedule the largest files first so a big species does not end up running alone at the end
+    tasks = [
+        (
+            species,
+            resource_file,
+            get_species_export_folder(export_folder, species),
+            connection,
+            statistics_paths and statistics_paths.get(species),
+            hgnc_snapshot,
+        )
+        for species, resource_file in sorted(
+            species_files.items(),
+            key=lambda item: os.path.getsize(item[1]),
+            reverse=True,
+        )
+    ]
+
+    if not tasks:
+        logger.warning('No Reactome species files to convert')
+        return
+
+    if processes is None:
+        processes = min(len(tasks), os.cpu_count() or 1)
+
+    if processes <= 1 or len(tasks) == 1:
+        for task in tasks:
+            logger.info('Converting Reactome %s', task[0])
+            _, species_metrics = _reactome_species_to_bel(task)
+            get_resolution_metrics().merge(ResolutionMetrics.from_dict(species_metrics))
+        return
+
+    # Forked workers start with a copy of the metrics of this process, so they start new ones
+    with Pool(processes=processes, initializer=collect_resolution_metrics) as pool:
+        for species, species_metrics in pool.imap_unordered(_reactome_species_to_bel, tasks):
+            get_resolution_metrics().merge(ResolutionMetrics.from_dict(species_metrics))
+            logger.info('Reactome %s exported', species)
@@ -2,15 +2,20 @@
 
 """This module has utilities method for parsing, handling WikiPathways RDF and data."""
 
+import json
 import logging
+import os
+import shutil
+import subprocess  # noqa: S404
 import tarfile
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from bio2bel_chebi import Manager as ChebiManager
 from bio2bel_hgnc import Manager as HgncManager
 from bio2bel_hgnc.models import HumanGene
 from pybel.dsl import protein
-from ..constants import ENSEMBL, HGNC, UNIPROT, UNKNOWN
+from ..constants import CHEBI, ENSEMBL, HGNC, UNIPROT, UNKNOWN
+from ..metrics import get_resolution_metrics
 from ..utils import parse_id_uri
 
 logger = logging.getLogger(__name__)
@@ -26,13 +31,44 @@ def get_hgnc_node_info(gene: HumanGene) -> Tuple[str, str, str]:
     return str(gene.identifier), gene.symbol, HGNC
 
 
+def get_gene_lookups(node: Dict) -> List[Tuple[str, str]]:
+    """Get the HGNC lookups that :func:`get_valid_node_parameters` makes for a node and its complex components.
+
+    They are collected for all the nodes of a pathway, so they are resolved in a few queries
+    (see :func:`pathme.resolver.prefetch_hgnc_lookups`).
+
+    :return: pairs of lookup and identifier
+    """
+    lookups = []
+
+    if 'uri_id' in node:
+        _, _, namespace, identifier = parse_id_uri(node['uri_id'])
+
+        if namespace in {'uniprot', 'ensembl'}:
+            lookups.append((namespace, identifier))
+
+    for component in node.get('complex_components') or ():
+        lookups.extend(get_gene_lookups(component))
+
+    return lookups
+
+
 def get_valid_node_parameters(
     node,
     hgnc_manager: HgncManager,
     chebi_manager: ChebiManager,
+    pathway_id: Optional[str] = None,
 ) -> Tuple[str, str, str]:
-    """Get valid node parameters."""
+    """Get valid node parameters.
+
+    :param node: node dictionary
+    :param hgnc_manager: HGNC manager
+    :param chebi_manager: ChEBI manager
+    :param pathway_id: pathway of the node, recorded if its identifier is not resolved (see :mod:`pathme.metrics`)
+    :return: identifier, name and namespace
+    """
     namespace = None
+    metrics = get_resolution_metrics()
 
     if 'uri_id' in node:
         _, _, namespace, identifier = parse_id_uri(node['uri_id'])
@@ -42,6 +78,7 @@ def get_valid_node_parameters(
     if namespace == 'uniprot':
 
         hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(identifier)
+        metrics.record_resolution(UNIPROT, identifier, bool(hgnc_entry), pathway_id)
 
         if not hgnc_entry:
             logger.debug('UniProt id: %s could not be converted to HGNC', identifier)
@@ -57,6 +94,7 @@ def get_valid_node_parameters(
 
     elif namespace == 'ensembl':
         hgnc_entry = hgnc_manager.get_gene_by_ensembl_id(identifier)
+        metrics.record_resolution(ENSEMBL, identifier, bool(hgnc_entry), pathway_id)
 
         if not hgnc_entry:
             logger.debug('ENSEMBL id: %s could not be converted to HGNC', identifier)
@@ -85,9 +123,13 @@ def get_valid_node_parameters(
     if 'display_name' in node:
         name = node['display_name']
         if namespace == 'chebi' or namespace == 'CHEBI':
-            if not chebi_manager.get_chemical_by_chebi_name(node['display_name']):
+            if chebi_manager.get_chemical_by_chebi_name(node['display_name']):
+                metrics.record_resolution(CHEBI, identifier, True, pathway_id)
+
+            else:
                 identifier = identifier.replace('CHEBI:', '')
                 chem = chebi_manager.get_chemical_by_chebi_id(identifier)
+                metrics.record_resolution(CHEBI, identifier, bool(chem), pathway_id)
 
                 # In case chebi id is outdated use the identifier as the name
                 if chem:
@@ -118,12 +160,206 @@ def process_multiple_proteins(hgnc_entries: List) -> List:
     ]
 
 
-def untar_file(file_path: str, export_folder: str) -> None:
-    """Unzip file into a destination folder.
+def get_reactome_species_files(resource_folder: str, species: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Get the BioPAX files of the species extracted from the Reactome release.
+
+    :param resource_folder: folder containing the per-species OWL files (e.g., Homo_sapiens.owl)
+    :param species: species names to look for. If None, all species in the folder are returned
+    :return: dictionary from species name to OWL file path
+    """
+    if species is None:
+        return {
+            file_name[:-len('.owl')]: os.path.join(resource_folder, file_name)
+            for file_name in sorted(os.listdir(resource_folder))
+            if file_name.endswith('.owl')
+        }
+
+    species_files = {
+        species_name: os.path.join(resource_folder, f'{species_name}.owl')
+        for species_name in species
+    }
+
+    missing_species = [
+        species_name
+        for species_name, path in species_files.items()
+        if not os.path.exists(path)
+    ]
+    if missing_species:
+        raise FileNotFoundError(
+            f'Reactome files not found in {resource_folder} for: {", ".join(missing_species)}. '
+            f'Please run "python3 -m pathme reactome download --species {",".join(missing_species)}"',
+        )
+
+    return species_files
+
+
+def _get_bz2_decompressor() -> Optional[str]:
+    """Return a parallel bz2 decompressor available in the system, if any."""
+    for executable in ('lbzip2', 'pbzip2'):
+        path = shutil.which(executable)
+        if path is not None:
+            return path
+
+    return None
+
+
+def _get_stamp_path(file_path: str, export_folder: str) -> str:
+    """Return the path of the stamp that describes what was extracted from an archive."""
+    return os.path.join(export_folder, f'.{os.path.basename(file_path)}.stamp.json')
+
+
+def _get_archive_stamp(file_path: str) -> Dict[str, float]:
+    """Return the size and modification time of an archive."""
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
 
-    :param file_path: name of the file
-    :param export_folder: name of the file
+
+def _load_stamp(file_path: str, export_folder: str) -> Dict:
+    """Load the extraction stamp of an archive, discarding it if the archive has changed since it was written."""
+    stamp_path = _get_stamp_path(file_path, export_folder)
+
+    if not os.path.exists(stamp_path):
+        return {}
+
+    with open(stamp_path) as file:
+        try:
+            stamp = json.load(file)
+        except ValueError:
+            return {}
+
+    if stamp.get('archive') != _get_archive_stamp(file_path):
+        return {}
+
+    return stamp
+
+
+def _is_extracted(member: Dict[str, float], path: str) -> bool:
+    """Check if an extracted file still matches the size and modification time of its archive member."""
+    if not os.path.exists(path):
+        return False
+
+    stat = os.stat(path)
+    return stat.st_size == member['size'] and int(stat.st_mtime) == int(member['mtime'])
+
+
+def _get_member_species(member_name: str) -> Optional[str]:
+    """Return the species of a member of the Reactome BioPAX archive (e.g., Homo_sapiens.owl -> Homo_sapiens)."""
+    file_name = os.path.basename(member_name)
+    if not file_name.endswith('.owl'):
+        return None
+
+    return file_name[:-len('.owl')]
+
+
+def untar_file(
+    file_path: str,
+    export_folder: str,
+    species: Optional[Iterable[str]] = None,
+    parallel: bool = True,
+) -> List[str]:
+    """Extract the species files of the Reactome BioPAX archive into a destination folder.
+
+    The archive is streamed, so only the requested members are written to disk and reading stops as soon as all of
+    them have been found. Members already extracted from the same archive (checked by size and modification time) are
+    not extracted again.
+
+    :param file_path: path to the tar.bz2 archive
+    :param export_folder: folder where the files are extracted
+    :param species: species to extract (e.g., Homo_sapiens). If None, all species are extracted
+    :param parallel: use lbzip2 or pbzip2 to decompress the archive if any of them is installed
+    :return: paths of the extracted files
     """
-    tar_ref = tarfile.open(file_path, 'r:bz2')
-    tar_ref.extractall(export_folder)
-    tar_ref.close()
+    species = None if species is None else set(species)
+
+    stamp = _load_stamp(file_path, export_folder)
+    extracted_members = stamp.get('members', {})
+
+    # Skip the archive if everything requested is already there. Extracting all species requires a previous run
+    # that went through the whole archive since otherwise the members are unknown.
+    if stamp and (species is not None or stamp.get('complete')):
+        requested = set(extracted_members) if species is None else species
+        paths = {
+            member_species: os.path.join(export_folder, f'{member_species}.owl')
+            for member_species in sorted(requested)
+        }
+        if requested.issubset(extracted_members) and all(
+            _is_extracted(extracted_members[member_species], path)
+            for member_species, path in paths.items()
+        ):
+            logger.info('using extracted files in %s', export_folder)
+            return list(paths.values())
+
+    os.makedirs(export_folder, exist_ok=True)
+
+    decompressor = _get_bz2_decompressor() if parallel else None
+    process = None
+
+    if decompressor is not None:
+        logger.info('decompressing %s with %s', file_path, decompressor)
+        process = subprocess.Popen([decompressor, '-dc', file_path], stdout=subprocess.PIPE)  # noqa: S603
+        tar_ref = tarfile.open(fileobj=process.stdout, mode='r|')
+    else:
+        tar_ref = tarfile.open(file_path, mode='r|bz2')
+
+    pending = None if species is None else set(species)
+    extracted_paths = []
+    complete = False
+
+    try:
+        for member in tar_ref:
+            member_species = _get_member_species(member.name)
+
+            if not member.isfile() or member_species is None:
+                continue
+
+            if pending is not None and member_species not in pending:
+                continue
+
+            path = os.path.join(export_folder, f'{member_species}.owl')
+            logger.info('extracting %s', path)
+
+            # Write to a temporary file first so an interrupted extraction never looks complete
+            tmp_path = f'{path}.tmp'
+            with tar_ref.extractfile(member) as source, open(tmp_path, 'wb') as destination:
+                shutil.copyfileobj(source, destination)
+            os.replace(tmp_path, path)
+            os.utime(path, (member.mtime, member.mtime))
+
+            extracted_members[member_species] = {'size': member.size, 'mtime': member.mtime}
+            extracted_paths.append(path)
+
+            if pending is not None:
+                pending.discard(member_species)
+                if not pending:
+                    break
+        else:
+            complete = True
+
+    finally:
+        tar_ref.close()
+        if process is not None:
+            process.stdout.close()
+            if complete:
+                process.wait()
+            else:
+                process.kill()
+                process.wait()
+
+    if complete and process is not None and process.returncode != 0:
+        raise RuntimeError(f'{decompressor} failed to decompress {file_path}')
+
+    if pending:
+        logger.warning('species not found in %s: %s', file_path, ', '.join(sorted(pending)))
+
+    with open(_get_stamp_path(file_path, export_folder), 'w') as file:
+        json.dump(
+            {
+                'archive': _get_archive_stamp(file_path),
+                'complete': complete and species is None or stamp.get('complete', False),
+                'members': extracted_members,
+            },
+            file,
+            indent=2,
+        )
+
+    return extracted_paths
@@ -0,0 +1,652 @@
+# -*- coding: utf-8 -*-
+
+"""In-memory resolution of gene identifiers to HGNC and of chemicals to ChEBI.
+
+The converters resolve the genes of every node through the HGNC manager, one database query per lookup. An
+:class:`HgncResolver` loads the needed HGNC mappings (symbols, alias symbols, UniProt, Entrez and ENSEMBL identifiers)
+once and answers the same lookups from dictionaries, so it can be given to the converters instead of the manager.
+The mappings are kept in a snapshot file of memory mapped tables (see :mod:`pathme.tables`): worker processes and later
+runs open it in constant time without querying the database, and all the workers share a single copy of the mappings.
+
+When loading all the mappings is not worth it (e.g., small runs or workers with little memory), the converters collect
+the identifiers of a pathway first and :func:`prefetch_hgnc_lookups` resolves them with one query per lookup.
+
+Likewise, a :class:`ChebiResolver` answers the ChEBI lookups of the converters, since the same small molecules (e.g.,
+ATP or water) are looked up in thousands of pathways.
+
+Resolvers loaded from snapshots are read only, so they can be shared by threads. Managers can be shared by threads
+once they have a session per thread (see :func:`get_thread_safe_manager` and :func:`release_thread_session`).
+"""
+
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy import func
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm.exc import MultipleResultsFound
+
+from bio2bel_chebi import Manager as ChebiManager
+from bio2bel_chebi.models import Chemical
+from bio2bel_hgnc import Manager as HgncManager
+from bio2bel_hgnc.models import AliasSymbol, HumanGene, UniProt
+from .constants import CHEBI_SNAPSHOT, HGNC_SNAPSHOT
+from .metrics import get_resolution_metrics
+from .tables import MappedTables, write_tables
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'HgncGene',
+    'HgncResolver',
+    'get_hgnc_resolver',
+    'prefetch_hgnc_lookups',
+    'ChebiChemical',
+    'ChebiResolver',
+    'get_chebi_resolver',
+    'get_thread_safe_manager',
+    'release_thread_session',
+]
+
+#: Version of the format of the snapshot files
+SNAPSHOT_VERSION = 2
+
+#: Lookups of the HGNC manager that can be prefetched (see :meth:`HgncResolver.from_lookups`)
+HGNC_LOOKUPS = ('hgnc_id', 'symbol', 'entrez', 'ensembl', 'uniprot', 'alias_symbol')
+
+#: Maximum number of identifiers in each ``IN (...)`` clause, below the limit of variables of SQLite
+MAX_IN_CLAUSE = 500
+
+#: Columns of :class:`bio2bel_hgnc.models.HumanGene` loaded in a :class:`HgncGene`
+_GENE_COLUMNS = (HumanGene.id, HumanGene.identifier, HumanGene.symbol, HumanGene.entrez, HumanGene.ensembl_gene)
+
+
+class HgncGene(NamedTuple):
+    """A human gene, with the attributes of :class:`bio2bel_hgnc.models.HumanGene` used by the converters."""
+
+    #: Primary key in the HGNC database
+    id: int  # noqa: A003
+    #: HGNC identifier
+    identifier: int
+    #: HGNC symbol
+    symbol: str
+    #: Entrez gene identifier
+    entrez: Optional[str]
+    #: ENSEMBL gene identifier
+    ensembl_gene: Optional[str]
+
+
+def _get_single(genes: Optional[List[HgncGene]]) -> Optional[HgncGene]:
+    """Get the only gene of a lookup. Raises a ValueError for ambiguous lookups, like the HGNC manager."""
+    if not genes:
+        return None
+
+    if 1 < len(genes):
+        raise ValueError(f'{genes}')
+
+    return genes[0]
+
+
+def _get_lookup_key(lookup: str, identifier) -> Union[int, str, None]:
+    """Get the key of an identifier in a lookup. Alias symbols are case sensitive, other identifiers are not."""
+    if lookup == 'hgnc_id':
+        return str(int(identifier)) if str(identifier).isdigit() else None
+
+    if lookup == 'alias_symbol':
+        return identifier
+
+    return str(identifier).lower()
+
+
+def _chunk(keys: Iterable, size: int = MAX_IN_CLAUSE) -> Iterable[List]:
+    """Split the keys of a lookup in chunks for the ``IN (...)`` clauses."""
+    keys = sorted(keys)
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
+def _get_database_key(manager, models: Iterable) -> Dict:
+    """Get the database of a manager and the number of entries the resolver loads from it.
+
+    Snapshots are only reused for the same key, so they are built again when the database is populated again.
+    """
+    return {
+        'database': repr(manager.engine.url),  # Without the password
+        'counts': [
+            manager.session.query(model).count()
+            for model in models
+        ],
+    }
+
+
+def _write_snapshot(path: str, records: Sequence[NamedTuple], fields: Sequence[str], indexes, key: Optional[Dict]):
+    """Write the records of a resolver and its indexes to a snapshot file (see :mod:`pathme.tables`)."""
+    write_tables(
+        path,
+        columns={
+            field: [getattr(record, field) for record in records]
+            for field in fields
+        },
+        indexes=indexes,
+        metadata={'version': SNAPSHOT_VERSION, 'key': key},
+    )
+
+
+def _map_snapshot(path: str, key: Optional[Dict]) -> Optional[MappedTables]:
+    """Map a snapshot file if it exists, has the current version and comes from the given database."""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        tables = MappedTables(path)
+    except ValueError:
+        logger.info('%s is outdated', path)
+        return None
+
+    metadata = tables.metadata or {}
+    if metadata.get('version') != SNAPSHOT_VERSION or (key is not None and metadata.get('key') != key):
+        logger.info('%s is outdated', path)
+        return None
+
+    return tables
+
+
+class _MappedRecords(Sequence):
+    """Records of a snapshot (e.g., genes), read from its memory mapped columns."""
+
+    def __init__(self, tables: MappedTables, record_type):
+        self._record_type = record_type
+        self._columns = [tables.get_column(field) for field in record_type._fields]
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __getitem__(self, index: int):
+        return self._record_type(*(column[index] for column in self._columns))
+
+
+class HgncResolver:
+    """Resolver of gene identifiers to HGNC loaded in memory.
+
+    It has the lookups of :class:`bio2bel_hgnc.Manager` used by the converters, with the same results. As in the
+    default SQLite database, symbols and identifiers are matched case insensitively.
+
+    A resolver can also hold only the mappings of some identifiers (see :meth:`from_lookups`). Lookups of other
+    identifiers are then made by its fallback manager.
+    """
+
+    def __init__(
+        self,
+        genes: Sequence[HgncGene],
+        indexes: Mapping[str, Mapping[str, Sequence[int]]],
+        fallback: Optional[HgncManager] = None,
+        lookups: Optional[Mapping[str, Set]] = None,
+    ):
+        """Build a resolver from its genes and the indexes of each lookup.
+
+        :param genes: genes
+        :param indexes: dictionary from lookup (see :data:`HGNC_LOOKUPS`) to a dictionary from each key to the
+         positions of its genes
+        :param fallback: manager for the lookups that are not loaded. If None, all the mappings are loaded
+        :param lookups: keys of the loaded identifiers of each lookup, with a fallback
+        """
+        self.genes = genes
+        self.indexes = indexes
+        self.fallback = fallback
+        self.lookups = lookups or {}
+
+    @classmethod
+    def from_rows(
+        cls,
+        genes: Iterable[Tuple[int, int, str, Optional[str], Optional[str]]],
+        uniprots: Iterable[Tuple[str, int]] = (),
+        alias_symbols: Iterable[Tuple[str, int]] = (),
+        fallback: Optional[HgncManager] = None,
+        lookups: Optional[Mapping[str, Set]] = None,
+    ) -> 'HgncResolver':
+        """Build the lookup dictionaries.
+
+        :param genes: database key, HGNC identifier, symbol, Entrez and ENSEMBL identifiers of each gene
+        :param uniprots: UniProt identifiers with the index of their gene
+        :param alias_symbols: alias symbols with the index of their gene, in database order
+        :param fallback: manager for the lookups that are not loaded. If None, all the mappings are loaded
+        :param lookups: keys of the loaded identifiers of each lookup (see :data:`HGNC_LOOKUPS`), with a fallback
+        """
+        genes = [HgncGene(*gene) for gene in genes]
+        indexes = {lookup: defaultdict(list) for lookup in HGNC_LOOKUPS}
+
+        for gene_index, gene in enumerate(genes):
+            indexes['hgnc_id'][str(gene.identifier)].append(gene_index)
+            indexes['symbol'][gene.symbol.lower()].append(gene_index)
+            if gene.entrez:
+                indexes['entrez'][gene.entrez.lower()].append(gene_index)
+            if gene.ensembl_gene:
+                indexes['ensembl'][gene.ensembl_gene.lower()].append(gene_index)
+
+        for uniprot_id, gene_index in uniprots:
+            indexes['uniprot'][uniprot_id.lower()].append(gene_index)
+
+        for alias_symbol, gene_index in alias_symbols:
+            indexes['alias_symbol'][alias_symbol].append(gene_index)
+
+        return cls(genes, indexes, fallback=fallback, lookups=lookups)
+
+    @classmethod
+    def from_manager(cls, hgnc_manager: HgncManager) -> 'HgncResolver':
+        """Load the mappings from the HGNC database, with one query per mapping."""
+        session = hgnc_manager.session
+
+        genes = session.query(
+            HumanGene.id, HumanGene.identifier, HumanGene.symbol, HumanGene.entrez, HumanGene.ensembl_gene,
+        ).order_by(HumanGene.id).all()
+
+        gene_indexes = {
+            gene[0]: index
+            for index, gene in enumerate(genes)
+        }
+
+        uniprots = session.query(UniProt.uniprotid, HumanGene.id).select_from(HumanGene).join(
+            HumanGene.uniprots,
+        ).order_by(HumanGene.id, UniProt.id)
+
+        alias_symbols = session.query(AliasSymbol.alias_symbol, AliasSymbol.hgnc_id).order_by(AliasSymbol.id)
+
+        return cls.from_rows(
+            genes,
+            [
+                (uniprot_id, gene_indexes[gene_id])
+                for uniprot_id, gene_id in uniprots
+            ],
+            [
+                (alias_symbol, gene_indexes[gene_id])
+                for alias_symbol, gene_id in alias_symbols
+                if gene_id in gene_indexes
+            ],
+        )
+
+    @classmethod
+    def from_lookups(cls, hgnc_manager: HgncManager, lookups: Iterable[Tuple[str, str]]) -> 'HgncResolver':
+        """Load the mappings of the given identifiers, with one query per lookup.
+
+        The mappings are loaded with ``IN (...)`` queries instead of one query per identifier. The resolver gives the
+        same results as the manager for these identifiers, and uses the manager for any other.
+
+        :param hgnc_manager: HGNC manager
+        :param lookups: pairs of lookup (see :data:`HGNC_LOOKUPS`) and identifier
+        """
+        keys = defaultdict(set)
+        for lookup, identifier in lookups:
+            if not isinstance(identifier, str):
+                continue
+
+            key = _get_lookup_key(lookup, identifier)
+            if key is not None:
+                keys[lookup].add(key)
+
+        session = hgnc_manager.session
+
+        gene_columns = {
+            'hgnc_id': HumanGene.identifier,
+            'symbol': func.lower(HumanGene.symbol),
+            'entrez': func.lower(HumanGene.entrez),
+            'ensembl': func.lower(HumanGene.ensembl_gene),
+        }
+
+        genes = {}
+        for lookup, column in gene_columns.items():
+            for chunk in _chunk(keys[lookup]):
+                genes.update(
+                    (gene[0], gene)
+                    for gene in session.query(*_GENE_COLUMNS).filter(
+                        column.in_([int(key) for key in chunk] if lookup == 'hgnc_id' else chunk),
+                    )
+                )
+
+        uniprots = []
+        for chunk in _chunk(keys['uniprot']):
+            query = session.query(UniProt.uniprotid, *_GENE_COLUMNS).select_from(HumanGene).join(
+                HumanGene.uniprots,
+            ).filter(func.lower(UniProt.uniprotid).in_(chunk)).order_by(HumanGene.id, UniProt.id)
+
+            for uniprot_id, *gene in query:
+                genes[gene[0]] = gene
+                uniprots.append((uniprot_id, gene[0]))
+
+        alias_symbols = []
+        for chunk in _chunk(keys['alias_symbol']):
+            query = session.query(AliasSymbol.alias_symbol, *_GENE_COLUMNS).join(
+                HumanGene, AliasSymbol.hgnc_id == HumanGene.id,
+            ).filter(AliasSymbol.alias_symbol.in_(chunk)).order_by(AliasSymbol.id)
+
+            for alias_symbol, *gene in query:
+                genes[gene[0]] = gene
+                alias_symbols.append((alias_symbol, gene[0]))
+
+        gene_ids = sorted(genes)
+        gene_indexes = {
+            gene_id: index
+            for index, gene_id in enumerate(gene_ids)
+        }
+
+        return cls.from_rows(
+            [genes[gene_id] for gene_id in gene_ids],
+            [(uniprot_id, gene_indexes[gene_id]) for uniprot_id, gene_id in uniprots],
+            [(alias_symbol, gene_indexes[gene_id]) for alias_symbol, gene_id in alias_symbols],
+            fallback=hgnc_manager,
+            lookups=keys,
+        )
+
+    def _is_loaded(self, lookup: str, key) -> bool:
+        """Check whether the mappings of an identifier are loaded. Otherwise, it is looked up in the fallback."""
+        loaded = self.fallback is None or (key is not None and key in self.lookups.get(lookup, ()))
+        get_resolution_metrics().record_cache(f'hgnc_{lookup}', loaded)
+        return loaded
+
+    def to_snapshot(self, path: str, key: Optional[Dict] = None) -> None:
+        """Export the mappings to a snapshot file (see :mod:`pathme.tables`).
+
+        :param path: path of the snapshot
+        :param key: database the mappings come from (see :func:`get_hgnc_resolver`)
+        """
+        _write_snapshot(path, self.genes, HgncGene._fields, self.indexes, key)
+
+    @classmethod
+    def from_snapshot(cls, path: str, key: Optional[Dict] = None) -> Optional['HgncResolver']:
+        """Map the mappings of a snapshot file.
+
+        The file is memory mapped, so it is opened in constant time and all the processes using it share its pages.
+
+        :param path: path of the snapshot
+        :param key: if given, the snapshot is only loaded if it comes from this database
+        :return: the resolver. None if the snapshot does not exist, has another version or comes from another database
+        """
+        tables = _map_snapshot(path, key)
+
+        if tables is None:
+            return None
+
+        return cls(
+            _MappedRecords(tables, HgncGene),
+            {
+                lookup: tables.get_index(lookup)
+                for lookup in HGNC_LOOKUPS
+            },
+        )
+
+    def _get_genes(self, lookup: str, key: str) -> List[HgncGene]:
+        """Get the genes of a key in a lookup."""
+        return [self.genes[gene_index] for gene_index in self.indexes[lookup].get(key, ())]
+
+    def get_gene_by_hgnc_id(self, hgnc_id: str) -> Optional[HgncGene]:
+        """Get a human gene by HGNC identifier."""
+        key = _get_lookup_key('hgnc_id', hgnc_id)
+
+        if not self._is_loaded('hgnc_id', key):
+            return self.fallback.get_gene_by_hgnc_id(hgnc_id)
+
+        return _get_single(self._get_genes('hgnc_id', str(int(hgnc_id))))
+
+    def get_gene_by_hgnc_symbol(self, hgnc_symbol: str) -> Optional[HgncGene]:
+        """Get a human gene by HGNC symbol."""
+        key = _get_lookup_key('symbol', hgnc_symbol)
+
+        if not self._is_loaded('symbol', key):
+            return self.fallback.get_gene_by_hgnc_symbol(hgnc_symbol)
+
+        return _get_single(self._get_genes('symbol', key))
+
+    def get_gene_by_entrez_id(self, entrez_id: str) -> Optional[HgncGene]:
+        """Get a human gene by its Entrez gene identifier."""
+        key = _get_lookup_key('entrez', entrez_id)
+
+        if not self._is_loaded('entrez', key):
+            return self.fallback.get_gene_by_entrez_id(entrez_id)
+
+        return _get_single(self._get_genes('entrez', key))
+
+    def get_gene_by_ensembl_id(self, ensembl_id: str) -> Optional[HgncGene]:
+        """Get a human gene by its ENSEMBL gene identifier."""
+        key = _get_lookup_key('ensembl', ensembl_id)
+
+        if not self._is_loaded('ensembl', key):
+            return self.fallback.get_gene_by_ensembl_id(ensembl_id)
+
+        return _get_single(self._get_genes('ensembl', key))
+
+    def get_gene_by_uniprot_id(self, uniprot_id: str) -> List[HgncGene]:
+        """Get the human genes of a UniProt identifier."""
+        key = _get_lookup_key('uniprot', uniprot_id)
+
+        if not self._is_loaded('uniprot', key):
+            return self.fallback.get_gene_by_uniprot_id(uniprot_id)
+
+        return self._get_genes('uniprot', key)
+
+    def get_hgnc_from_alias_symbol(self, alias_symbol: str) -> Optional[HgncGene]:
+        """Get a human gene by one of its alias symbols. The first gene with this alias is taken, as by the manager."""
+        if not self._is_loaded('alias_symbol', alias_symbol):
+            return self.fallback.get_hgnc_from_alias_symbol(alias_symbol)
+
+        genes = self._get_genes('alias_symbol', alias_symbol)
+        return genes[0] if genes else None
+
+
+def get_hgnc_resolver(hgnc_manager: HgncManager, path: Optional[str] = None) -> HgncResolver:
+    """Get a resolver with the mappings of the HGNC database of a manager.
+
+    The snapshot of the database is mapped if it exists. Otherwise, the mappings are loaded from the database and the
+    snapshot is written, so the workers of the conversion (and later runs) do not query the database again.
+
+    :param hgnc_manager: HGNC manager
+    :param path: path of the snapshot. Defaults to ``hgnc_snapshot.tables`` in the PathMe data folder
+    """
+    path = path or HGNC_SNAPSHOT
+    key = _get_database_key(hgnc_manager, (HumanGene, UniProt, AliasSymbol))
+
+    resolver = HgncResolver.from_snapshot(path, key)
+
+    if resolver is None:
+        logger.info('Loading the HGNC mappings from the database')
+        HgncResolver.from_manager(hgnc_manager).to_snapshot(path, key)
+
+        # Use the mapped tables rather than the dictionaries, which are only needed to write them
+        resolver = HgncResolver.from_snapshot(path, key)
+
+    return resolver
+
+
+def prefetch_hgnc_lookups(
+    hgnc_manager: Union[HgncManager, HgncResolver, None],
+    lookups: Iterable[Tuple[str, str]],
+) -> Union[HgncManager, HgncResolver, None]:
+    """Resolve the identifiers of a pathway (or a batch of pathways) before converting its nodes.
+
+    :param hgnc_manager: HGNC manager, resolver or None
+    :param lookups: pairs of lookup (see :data:`HGNC_LOOKUPS`) and identifier that the conversion needs
+    :return: a resolver with the mappings of the identifiers if a manager is given. Otherwise, the given resolver
+    """
+    if hgnc_manager is None or isinstance(hgnc_manager, HgncResolver):
+        return hgnc_manager
+
+    start = time.perf_counter()
+    resolver = HgncResolver.from_lookups(hgnc_manager, lookups)
+    get_resolution_metrics().record_lookup('prefetch_hgnc_lookups', time.perf_counter() - start)
+
+    return resolver
+
+
+class ChebiChemical(NamedTuple):
+    """A chemical, with the attributes of :class:`bio2bel_chebi.models.Chemical` used by the converters."""
+
+    #: ChEBI identifier
+    chebi_id: str
+    #: ChEBI name
+    name: Optional[str]
+    #: Name of the chemical, or of its parent if it has none
+    safe_name: Optional[str]
+
+
+class ChebiResolver:
+    """Resolver of chemicals to ChEBI loaded in memory.
+
+    It has the lookups of :class:`bio2bel_chebi.Manager` used by the converters, with the same results. Like the
+    manager, looking up a secondary identifier gives its parent chemical.
+    """
+
+    def __init__(self, chemicals: Sequence[ChebiChemical], indexes: Mapping[str, Mapping[str, Sequence[int]]]):
+        """Build a resolver from its chemicals and the indexes of each lookup.
+
+        :param chemicals: chemicals
+        :param indexes: dictionary from lookup ('chebi_id' or 'name') to a dictionary from each key to the positions
+         of its chemicals
+        """
+        self.chemicals = chemicals
+        self.indexes = indexes
+
+    @classmethod
+    def from_manager(cls, chebi_manager: ChebiManager) -> 'ChebiResolver':
+        """Load the mappings from the ChEBI database, with a single query."""
+        rows = chebi_manager.session.query(
+            Chemical.id, Chemical.chebi_id, Chemical.name, Chemical.parent_id,
+        ).order_by(Chemical.id).all()
+
+        names = {
+            chemical_id: name
+            for chemical_id, _, name, _ in rows
+        }
+        positions = {
+            chemical_id: position
+            for position, (chemical_id, _, _, _) in enumerate(rows)
+        }
+
+        chemicals = []
+        indexes = {'chebi_id': {}, 'name': defaultdict(list)}
+
+        for position, (_, chebi_id, name, parent_id) in enumerate(rows):
+            chemicals.append(ChebiChemical(chebi_id, name, name or names.get(parent_id)))
+
+            # The manager gives the parent of secondary identifiers
+            indexes['chebi_id'][chebi_id] = [positions.get(parent_id, position)]
+
+            if name is not None:
+                indexes['name'][name].append(position)
+
+        return cls(chemicals, indexes)
+
+    def to_snapshot(self, path: str, key: Optional[Dict] = None) -> None:
+        """Export the mappings to a snapshot file (see :mod:`pathme.tables`).
+
+        :param path: path of the snapshot
+        :param key: database the mappings come from (see :func:`get_chebi_resolver`)
+        """
+        _write_snapshot(path, self.chemicals, ChebiChemical._fields, self.indexes, key)
+
+    @classmethod
+    def from_snapshot(cls, path: str, key: Optional[Dict] = None) -> Optional['ChebiResolver']:
+        """Map the mappings of a snapshot file.
+
+        :param path: path of the snapshot
+        :param key: if given, the snapshot is only loaded if it comes from this database
+        :return: the resolver. None if the snapshot does not exist, has another version or comes from another database
+        """
+        tables = _map_snapshot(path, key)
+
+        if tables is None:
+            return None
+
+        return cls(
+            _MappedRecords(tables, ChebiChemical),
+            {
+                lookup: tables.get_index(lookup)
+                for lookup in ('chebi_id', 'name')
+            },
+        )
+
+    def _get_chemicals(self, lookup: str, key: str) -> List[ChebiChemical]:
+        """Get the chemicals of a key in a lookup."""
+        get_resolution_metrics().record_cache(f'chebi_{lookup}', True)
+        return [self.chemicals[position] for position in self.indexes[lookup].get(key, ())]
+
+    def get_chemical_by_chebi_id(self, chebi_id: str) -> Optional[ChebiChemical]:
+        """Get a chemical by ChEBI identifier, or its parent for secondary identifiers."""
+        chemicals = self._get_chemicals('chebi_id', chebi_id)
+        return chemicals[0] if chemicals else None
+
+    def get_chemical_by_chebi_name(self, name: str) -> Optional[ChebiChemical]:
+        """Get a chemical by ChEBI name. Ambiguous names raise the same error as in the ChEBI manager."""
+        chemicals = self._get_chemicals('name', name)
+
+        if 1 < len(chemicals):
+            raise MultipleResultsFound(f'Multiple chemicals named {name}')
+
+        return chemicals[0] if chemicals else None
+
+
+def get_chebi_resolver(chebi_manager: ChebiManager, path: Optional[str] = None) -> ChebiResolver:
+    """Get a resolver with the mappings of the ChEBI database of a manager.
+
+    As for :func:`get_hgnc_resolver`, the snapshot of the database is mapped if it exists and written otherwise.
+
+    :param chebi_manager: ChEBI manager
+    :param path: path of the snapshot. Defaults to ``chebi_snapshot.tables`` in the PathMe data folder
+    """
+    path = path or CHEBI_SNAPSHOT
+    key = _get_database_key(chebi_manager, (Chemical,))
+
+    resolver = ChebiResolver.from_snapshot(path, key)
+
+    if resolver is None:
+        logger.info('Loading the ChEBI mappings from the database')
+        ChebiResolver.from_manager(chebi_manager).to_snapshot(path, key)
+        resolver = ChebiResolver.from_snapshot(path, key)
+
+    return resolver
+
+
+def _get_manager_session(manager):
+    """Get the session of a manager, or of the fallback manager of a resolver."""
+    manager = getattr(manager, 'fallback', manager)
+    return getattr(manager, 'session', None)
+
+
+def get_thread_safe_manager(manager):
+    """Get a manager (or resolver) whose lookups can be made from several threads at the same time.
+
+    Bio2BEL managers usually have a :class:`sqlalchemy.orm.scoped_session`, which already opens one session per
+    thread. Managers built with a plain session get a copy with a scoped session on the same engine. Resolvers loaded
+    from snapshots are read only, so they are returned as they are.
+
+    :param manager: HGNC or ChEBI manager or resolver
+    :raises ValueError: if the database is an in-memory SQLite database, which each thread would see empty
+    """
+    if manager is None:
+        return None
+
+    if isinstance(manager, (HgncResolver, ChebiResolver)):
+        fallback = getattr(manager, 'fallback', None)
+        if fallback is not None and not isinstance(fallback.session, scoped_session):
+            raise ValueError('the fallback manager of the resolver is not thread safe')
+        return manager
+
+    if manager.engine.url.drivername.startswith('sqlite') and manager.engine.url.database in {None, '', ':memory:'}:
+        raise ValueError('in-memory SQLite databases can not be shared by threads')
+
+    if isinstance(manager.session, scoped_session):
+        return manager
+
+    return type(manager)(engine=manager.engine, session=scoped_session(sessionmaker(bind=manager.engine)))
+
+
+def release_thread_session(*managers) -> None:
+    """Close the sessions of the current thread, e.g. at the end of each task run in a thread pool.
+
+    Otherwise, the database connection of a thread is closed by the garbage collector, which might run in another
+    thread (SQLite does not allow it).
+    """
+    for manager in managers:
+        session = _get_manager_session(manager)
+
+        if isinstance(session, scoped_session):
+            session.remove()
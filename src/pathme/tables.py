@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+"""Read-only tables of identifier mappings shared by worker processes.
+
+The resolvers of :mod:`pathme.resolver` keep their mappings in a single file made of sorted string arrays and offset
+arrays. The file is memory mapped instead of loaded: opening it only reads its header, lookups are binary searches
+over the mapped pages and all the processes reading the same file share these pages through the cache of the operating
+system. A conversion with many workers therefore holds the mappings in memory once.
+
+A file has the following layout, with every section aligned to 8 bytes:
+
+- the magic string, followed by the length of the header
+- the header, a JSON object with the metadata of the file and the position of each section
+- columns: a sequence of numbers (``int``) or strings (``str``, offsets in a blob of UTF-8 strings)
+- indexes: sorted keys (offsets in a blob of UTF-8 strings), with the offsets of their values in an array of numbers
+
+Numbers and offsets are unsigned 32-bit integers in the byte order of the machine, so the files are caches of the
+machine that wrote them rather than a format to exchange.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+__all__ = [
+    'MappedTables',
+    'write_tables',
+]
+
+#: First bytes of the table files
+MAGIC = b'PATHMETB'
+
+#: Version of the format of the table files
+TABLES_VERSION = 1
+
+#: Type code of the numbers and offsets (unsigned 32-bit integers)
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+_HEADER_LENGTH = struct.Struct('=Q')
+
+
+def _pad(length: int) -> bytes:
+    """Get the padding that aligns a section of the given length to 8 bytes."""
+    return b'\0' * (-length % 8)
+
+
+def _get_strings_sections(strings: Iterable[str]) -> Tuple[array, bytes]:
+    """Encode strings as their offsets in a blob."""
+    offsets = array(_UINT32, [0])
+    blob = bytearray()
+
+    for string in strings:
+        blob += string.encode('utf-8')
+        offsets.append(len(blob))
+
+    return offsets, bytes(blob)
+
+
+def write_tables(
+    path: str,
+    columns: Mapping[str, Sequence[Union[int, str, None]]],
+    indexes: Mapping[str, Mapping[str, Iterable[int]]],
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Write tables to a file that can be opened with :class:`MappedTables`.
+
+    :param path: path of the file. It is replaced atomically, so processes that already mapped it keep reading the
+     previous version
+    :param columns: dictionary from column name to its values. Columns with only numbers are stored as numbers, other
+     columns as strings. None is stored as an empty string
+    :param indexes: dictionary from index name to a dictionary from each key to its values (e.g., row numbers)
+    :param metadata: JSON serializable metadata of the tables
+    """
+    sections = []
+    position = 0
+
+    def _add_section(data: Union[array, bytes]) -> Tuple[int, int]:
+        nonlocal position
+        data = data.tobytes() if isinstance(data, array) else data
+        sections.append(data + _pad(len(data)))
+        start, position = position, position + len(data) + len(_pad(len(data)))
+        return start, len(data)
+
+    header = {
+        'version': TABLES_VERSION,
+        'metadata': metadata,
+        'columns': {},
+        'indexes': {},
+    }
+
+    for name, values in columns.items():
+        if all(isinstance(value, int) for value in values):
+            header['columns'][name] = {
+                'type': 'int',
+                'values': _add_section(array(_UINT32, values)),
+            }
+        else:
+            offsets, blob = _get_strings_sections('' if value is None else str(value) for value in values)
+            header['columns'][name] = {
+                'type': 'str',
+                'offsets': _add_section(offsets),
+                'blob': _add_section(blob),
+            }
+
+    for name, index in indexes.items():
+        # Keys are compared as bytes when searched, so they are sorted as bytes
+        items = sorted(
+            (key.encode('utf-8'), list(values))
+            for key, values in index.items()
+        )
+
+        key_offsets, key_blob = _get_strings_sections(key.decode('utf-8') for key, _ in items)
+
+        value_offsets = array(_UINT32, [0])
+        values = array(_UINT32)
+        for _, key_values in items:
+            values.extend(key_values)
+            value_offsets.append(len(values))
+
+        header['indexes'][name] = {
+            'key_offsets': _add_section(key_offsets),
+            'key_blob': _add_section(key_blob),
+            'value_offsets': _add_section(value_offsets),
+            'values': _add_section(values),
+        }
+
+    header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header += _pad(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header)))
+        file.write(header)
+        for section in sections:
+            file.write(section)
+
+    os.replace(tmp_path, path)
+
+
+class _StringArray(Sequence[bytes]):
+    """Strings of a blob, as bytes, given their offsets."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+
+class _StringColumn(Sequence[Optional[str]]):
+    """Column of strings. Empty strings are read as None."""
+
+    def __init__(self, strings: _StringArray):
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        return self._strings[index].decode('utf-8') or None
+
+
+class _Index(Mapping[str, Tuple[int, ...]]):
+    """Sorted keys with their values, searched without loading them."""
+
+    def __init__(self, keys: _StringArray, value_offsets: memoryview, values: memoryview):
+        self._keys = keys
+        self._value_offsets = value_offsets
+        self._values = values
+
+    def _find(self, key: str) -> Optional[int]:
+        if not isinstance(key, str):
+            return None
+
+        encoded_key = key.encode('utf-8')
+        position = bisect.bisect_left(self._keys, encoded_key)
+
+        if position < len(self._keys) and self._keys[position] == encoded_key:
+            return position
+
+        return None
+
+    def __getitem__(self, key: str) -> Tuple[int, ...]:
+        position = self._find(key)
+
+        if position is None:
+            raise KeyError(key)
+
+        return tuple(self._values[self._value_offsets[position]:self._value_offsets[position + 1]])
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        for key in self._keys:
+            yield key.decode('utf-8')
+
+
+class MappedTables:
+    """Tables written by :func:`write_tables`, memory mapped in read-only mode."""
+
+    def __init__(self, path: str):
+        """Map a file and read its header.
+
+        :param path: path of the file
+        :raises ValueError: if the file is not a table file of the current version
+        """
+        self.path = path
+
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._view = memoryview(self._mmap)
+
+        if self._view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a table file')
+
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        header_length, = _HEADER_LENGTH.unpack(self._view[len(MAGIC):start])
+        self._header = json.loads(self._view[start:start + header_length].tobytes().rstrip(b'\0'))
+
+        if self._header['version'] != TABLES_VERSION:
+            raise ValueError(f'{path} has version {self._header["version"]} instead of {TABLES_VERSION}')
+
+        self._data_start = start + header_length
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        """Get the metadata given to :func:`write_tables`."""
+        return self._header['metadata']
+
+    def _get_section(self, section: Tuple[int, int], numbers: bool = False) -> memoryview:
+        start, length = section
+        view = self._view[self._data_start + start:self._data_start + start + length]
+        return view.cast(_UINT32) if numbers else view
+
+    def _get_strings(self, offsets: Tuple[int, int], blob: Tuple[int, int]) -> _StringArray:
+        return _StringArray(self._get_section(offsets, numbers=True), self._get_section(blob))
+
+    def get_column(self, name: str) -> Sequence[Union[int, str, None]]:
+        """Get a column."""
+        column = self._header['columns'][name]
+
+        if column['type'] == 'int':
+            return self._get_section(column['values'], numbers=True)
+
+        return _StringColumn(self._get_strings(column['offsets'], column['blob']))
+
+    def get_index(self, name: str) -> Mapping[str, Tuple[int, ...]]:
+        """Get an index, as a read-only dictionary from each key to its values."""
+        index = self._header['indexes'][name]
+
+        return _Index(
+            self._get_strings(index['key_offsets'], index['key_blob']),
+            self._get_section(index['value_offsets'], numbers=True),
+            self._get_section(index['values'], numbers=True),
+        )
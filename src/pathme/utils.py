@@ -4,9 +4,9 @@
 
 import collections
 import itertools as itt
+import json
 import logging
 import os
-import pickle
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 from urllib.request import urlretrieve
@@ -21,28 +21,15 @@ from pybel.constants import GRAPH_NAMESPACE_URL
 from pybel.dsl import CentralDogma
 from pybel.struct.summary import count_functions, count_relations
 from .constants import (
-    BEL_STATS_COLUMN_NAMES, BRENDA, CHEBI, ENSEMBL, ENTREZ, EXPASY, HGNC, INTERPRO, KEGG, MIRBASE, PFAM, PUBCHEM,
-    REACTOME, UNIPROT, UNKNOWN, WIKIPATHWAYS, WIKIPEDIA,
+    ALL_SPECIES, BEL_STATS_COLUMN_NAMES, BRENDA, CHEBI, DEFAULT_SPECIES, ENSEMBL, ENTREZ, EXPASY, HGNC, INTERPRO, KEGG,
+    MIRBASE, PFAM, PUBCHEM, RDF_CACHE, REACTOME, UNIPROT, UNKNOWN, WIKIPATHWAYS, WIKIPEDIA,
 )
 from .export_utils import get_paths_in_folder
+from .rdf_cache import RdfCache, get_file_sha1
 
 logger = logging.getLogger(__name__)
 
 
-class CallCounted:
-    """Decorator to determine number of calls for a method."""
-
-    def __init__(self, method):
-        """Init method."""
-        self.method = method
-        self.counter = 0
-
-    def __call__(self, *args, **kwargs):
-        """Counter method."""
-        self.counter += 1
-        return self.method(*args, **kwargs)
-
-
 def parse_id_uri(uri: str) -> Tuple[str, str, str, str]:
     """Get the components of a given uri (with identifier at the last position).
 
@@ -87,32 +74,29 @@ def parse_namespace_uri(uri: str) -> Tuple[str, str, str]:
     return prefix, namespace, vocabulary
 
 
-def parse_rdf(path: str, fmt: Optional[str] = None) -> rdflib.Graph:
+def parse_rdf(path: str, fmt: Optional[str] = None, cache_path: Optional[str] = RDF_CACHE) -> rdflib.Graph:
     """Import a queried pathway into a rdflib Graph object.
 
     :param path: RDF file path
     :param fmt: RDF file format, default is turtle
+    :param cache_path: path of the cache of parsed RDF files (see :class:`pathme.rdf_cache.RdfCache`). If None, the
+     file is parsed without cache
     """
     if fmt is None:
         fmt = 'ttl'
 
-    pickle_path = f'{path}.pickle'
-    if os.path.exists(pickle_path):
-        with open(pickle_path, 'rb') as file:
-            return pickle.load(file)
-
     if not os.path.exists(path):
         raise FileNotFoundError(
             'You have still not downloaded the database file.'
             'Please run "python3 -m pathme "database" download"',
         )
 
+    if cache_path is not None:
+        return RdfCache(cache_path).parse(path, fmt)
+
     graph = rdflib.Graph()
     graph.parse(path, format=fmt)
 
-    with open(pickle_path, 'wb') as file:
-        pickle.dump(graph, file)
-
     return graph
 
 
@@ -270,13 +254,7 @@ def get_pathway_statitics(nodes_types, edges_types, bel_graph, **kwargs):
     }
 
     if 'global_statistics' in kwargs and pathway_statistics:
-        global_statistics = kwargs.get('global_statistics')
-        for statistics_type, rdf_types in pathway_statistics.items():
-            if not rdf_types:
-                continue
-
-            for rdf_type, value in rdf_types.items():
-                global_statistics[statistics_type][rdf_type] += value
+        global_statistics = add_pathway_statistics(kwargs.get('global_statistics'), pathway_statistics)
 
         if 'all_pathways_statistics' in kwargs and pathway_statistics:
             all_pathways_statistics = kwargs.get('all_pathways_statistics')
@@ -322,6 +300,83 @@ def statistics_to_df(all_pathways_statistics):
     return df
 
 
+def add_pathway_statistics(global_statistics, pathway_statistics):
+    """Add the statistics of a pathway to the global statistics.
+
+    :param dict global_statistics: global statistics (nested default dictionaries of integers)
+    :param dict pathway_statistics: statistics of a pathway as returned by :func:`get_pathway_statitics`
+    """
+    for statistics_type, rdf_types in pathway_statistics.items():
+        for rdf_type, value in rdf_types.items():
+            global_statistics[statistics_type][rdf_type] += value
+
+    return global_statistics
+
+
+def get_statistics_cache_key(resource_file: str) -> Dict[str, str]:
+    """Get the key of the statistics computed from a resource file, which changes with its content.
+
+    :param resource_file: path of the resource file (e.g., the Reactome BioPAX file of a species)
+    """
+    return {'resource': os.path.basename(resource_file), 'sha1': get_file_sha1(resource_file)}
+
+
+def export_statistics_cache(
+    pathways_statistics: Dict[str, Dict],
+    path: str,
+    key: Optional[Dict[str, str]] = None,
+) -> None:
+    """Export the statistics of each pathway to a JSON file.
+
+    :param pathways_statistics: dictionary from pathway identifier to the pathway name and its statistics
+    :param path: path of the JSON file
+    :param key: key of the resources the statistics were computed from (see :func:`get_statistics_cache_key`)
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump({'key': key, 'pathways': pathways_statistics}, file, indent=2, sort_keys=True)
+
+    os.replace(tmp_path, path)
+
+
+def load_statistics_cache(path: str, key: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+    """Load the statistics of each pathway written by :func:`export_statistics_cache`.
+
+    :param path: path of the JSON file
+    :param key: if given, the statistics are only loaded if they were computed from the same resources
+    :return: dictionary from pathway identifier to the pathway name and its statistics. Empty if the file does not
+     exist or its statistics are outdated
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as file:
+        statistics_cache = json.load(file)
+
+    if key is not None and statistics_cache.get('key') != key:
+        logger.info('Ignoring the statistics in %s, which were computed from other resources', path)
+        return {}
+
+    return statistics_cache.get('pathways', {})
+
+
+def summarize_statistics_cache(pathways_statistics: Dict[str, Dict]):
+    """Compute the global statistics and the statistics keyed by pathway name from a statistics cache.
+
+    :param pathways_statistics: dictionary from pathway identifier to the pathway name and its statistics
+    :return: global statistics and statistics of all pathways (as returned by the statistics functions of each
+     database)
+    """
+    global_statistics = collections.defaultdict(lambda: collections.defaultdict(int))
+    all_pathways_statistics = {}
+
+    for entry in pathways_statistics.values():
+        add_pathway_statistics(global_statistics, entry['statistics'])
+        all_pathways_statistics[entry['name']] = entry['statistics']
+
+    return global_statistics, all_pathways_statistics
+
+
 def get_bel_types(path: str):
     """Get BEL node and edge type statistics.
 
@@ -488,15 +543,54 @@ def jaccard_similarity(database_gene_set, bel_genes_set):
     return jaccard_similarities
 
 
+"""Species"""
+
+
+def parse_species_option(species: Iterable[str]) -> Optional[List[str]]:
+    """Parse the values given to a ``--species`` option.
+
+    Species can be given multiple times or as a comma separated list (e.g., "Homo_sapiens,Mus_musculus").
+
+    :param species: values of the option
+    :return: species names or None if all species were requested
+    """
+    names = [
+        name.strip().replace(' ', '_')
+        for value in species
+        for name in value.split(',')
+        if name.strip()
+    ]
+
+    if ALL_SPECIES in names:
+        return None
+
+    return names
+
+
+def get_species_export_folder(export_folder: str, species: str) -> str:
+    """Return the folder where the BEL graphs of a given species are exported.
+
+    Human graphs are kept in the export folder read by the export commands, other species get their own sub-folder.
+
+    :param export_folder: BEL export folder of the database
+    :param species: species name (e.g., Mus_musculus)
+    """
+    if species == DEFAULT_SPECIES:
+        return export_folder
+
+    return os.path.join(export_folder, species)
+
+
 """Downloader"""
 
 
-def make_downloader(url, path, export_path, decompress_file):
+def make_downloader(url, path, export_path, decompress_file, **kwargs):
     """Make a function that downloads the data for you, or uses a cached version at the given path.
 
     :param str url: The URL of some data
     :param str export_path: folder where decompressed file will be exported
-    :param method decompress_file: method to decompress file
+    :param method decompress_file: method to decompress file. If None, the file is only downloaded
+    :param kwargs: keyword arguments passed to the decompress method
     :return: A function that downloads the data and returns the path of the data
     :rtype: (bool -> str)
     """
@@ -518,8 +612,11 @@ def make_downloader(url, path, export_path, decompress_file):
 
     data = download_data()
 
-    logger.info('unzipping file %s, da')
-    decompress_file(data, export_path)
+    if decompress_file is None:
+        return
+
+    logger.info('decompressing %s to %s', data, export_path)
+    decompress_file(data, export_path, **kwargs)
 
 
 def summarize_helper(graphs: Iterable[BELGraph]):
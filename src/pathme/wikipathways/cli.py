@@ -2,22 +2,38 @@
 
 """Command line interface for WikiPathways."""
 
+import json
 import logging
 import os
 import time
+from typing import Dict, List, Optional, Tuple
 
 import click
 from tqdm import tqdm
 
 from bio2bel_hgnc import Manager as HgncManager
 from pybel import from_pickle
-from .rdf_sparql import get_wp_statistics, wikipathways_to_pickles
-from .utils import get_file_name_from_url, iterate_wikipathways_paths, unzip_file
+from .gpml import iterate_gpml_archive, iterate_gpml_paths
+from .rdf_sparql import (
+    get_wp_statistics, load_files_statistics, remove_deleted_pathways, remove_outdated_statistics,
+    wikipathways_release_to_pickles, wikipathways_species_to_pickles,
+)
+from .utils import (
+    WIKIPATHWAYS_ARCHIVE_FOLDER, WIKIPATHWAYS_ARCHIVE_ROOT, filter_wikipathways_files, get_file_name_from_url,
+    get_manifest_path, get_wikipathways_species_files, is_wikipathways_archive, iterate_wikipathways_archive,
+    iterate_wikipathways_paths, unzip_file,
+)
 from ..constants import (
-    DATA_DIR, DEFAULT_CACHE_CONNECTION, RDF_WIKIPATHWAYS, WIKIPATHWAYS_BEL, WIKIPATHWAYS_DIR, WIKIPATHWAYS_FILES,
+    DATA_DIR, DEFAULT_CACHE_CONNECTION, DEFAULT_SPECIES, GPML_WIKIPATHWAYS, RDF_WIKIPATHWAYS, WIKIPATHWAYS_BEL,
+    WIKIPATHWAYS_FILES, WIKIPATHWAYS_GPML_FILES,
 )
 from ..export_utils import get_paths_in_folder
-from ..utils import CallCounted, make_downloader, statistics_to_df, summarize_helper
+from ..metrics import export_resolution_metrics
+from ..resolver import get_hgnc_resolver
+from ..utils import (
+    get_species_export_folder, make_downloader, parse_species_option, statistics_to_df, summarize_helper,
+    summarize_statistics_cache,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,54 +47,265 @@ def main():
     """Manage WikiPathways."""
 
 
+#: WikiPathways release archive
+WIKIPATHWAYS_ARCHIVE = os.path.join(WIKIPATHWAYS_FILES, get_file_name_from_url(RDF_WIKIPATHWAYS))
+
+#: WikiPathways GPML release archive
+WIKIPATHWAYS_GPML_ARCHIVE = os.path.join(WIKIPATHWAYS_GPML_FILES, get_file_name_from_url(GPML_WIKIPATHWAYS))
+
+#: Per-pathway statistics written during the conversion
+WIKIPATHWAYS_STATISTICS_CACHE = os.path.join(DATA_DIR, 'wikipathways_statistics.json')
+
+
+def _get_statistics_cache(species: str) -> str:
+    """Return the path of the per-pathway statistics written during the conversion of a species."""
+    if species == DEFAULT_SPECIES:
+        return WIKIPATHWAYS_STATISTICS_CACHE
+
+    return os.path.join(DATA_DIR, f'wikipathways_{species}_statistics.json')
+
+
+def _get_resource_files(
+    resource_folder: Optional[str],
+    connection: str,
+    only_canonical: bool,
+    fmt: str = 'rdf',
+) -> Tuple[str, List[str]]:
+    """Get the WikiPathways RDF (or GPML) files to convert.
+
+    By default, the files are read from the release archive. The extracted files are used if there is no archive.
+
+    :param resource_folder: folder with the RDF files or release archive
+    :param fmt: format of the files, 'rdf' or 'gpml'
+    :return: the folder or archive and the names of the files in it
+    """
+    if fmt == 'gpml':
+        if resource_folder is None:
+            resource_folder = WIKIPATHWAYS_GPML_ARCHIVE
+
+        if is_wikipathways_archive(resource_folder):
+            logger.info('Reading GPML files from %s', resource_folder)
+            return resource_folder, iterate_gpml_archive(resource_folder, connection, only_canonical)
+
+        return resource_folder, iterate_gpml_paths(resource_folder, connection, only_canonical)
+
+    if resource_folder is None:
+        if os.path.exists(WIKIPATHWAYS_ARCHIVE):
+            resource_folder = WIKIPATHWAYS_ARCHIVE
+        else:
+            resource_folder = os.path.join(WIKIPATHWAYS_FILES, WIKIPATHWAYS_ARCHIVE_FOLDER)
+
+    if is_wikipathways_archive(resource_folder):
+        logger.info('Reading RDF files from %s', resource_folder)
+        resource_files = iterate_wikipathways_archive(
+            resource_folder, connection=connection, only_canonical=only_canonical,
+        )
+    else:
+        resource_files = iterate_wikipathways_paths(resource_folder, connection, only_canonical)
+
+    return resource_folder, resource_files
+
+
+def _is_species_folder(resource_folder: str) -> bool:
+    """Check if a folder has the RDF files of a single species instead of the per-species folders."""
+    return os.path.isdir(resource_folder) and bool(filter_wikipathways_files(get_paths_in_folder(resource_folder)))
+
+
+def _get_species_files(
+    resource_folder: Optional[str],
+    connection: str,
+    only_canonical: bool,
+    species_names: Optional[List[str]],
+    fmt: str = 'rdf',
+) -> Tuple[str, Dict[str, List[str]]]:
+    """Get the WikiPathways files of each species to convert.
+
+    By default, the files of every species are read from the release archive (or the extracted per-species folders
+    if there is no archive). A folder with the files of a single species can also be given.
+
+    :param resource_folder: release archive, folder with the per-species folders or folder with the RDF files of a
+     single species
+    :param species_names: species to convert. If None, all species in the release are converted
+    :param fmt: format of the files, 'rdf' or 'gpml'. GPML files are only read for human
+    :return: the folder or archive and the names of the files of each species in it
+    """
+    if fmt == 'gpml' and species_names != [DEFAULT_SPECIES]:
+        raise click.UsageError(f'GPML files are only converted for {DEFAULT_SPECIES}')
+
+    if fmt == 'gpml' or (resource_folder is not None and _is_species_folder(resource_folder)):
+        if species_names is None or len(species_names) != 1:
+            raise click.UsageError(f'{resource_folder} has the files of a single species. Please give its name')
+
+        resource_folder, resource_files = _get_resource_files(resource_folder, connection, only_canonical, fmt)
+        return resource_folder, {species_names[0]: resource_files}
+
+    if resource_folder is None:
+        if os.path.exists(WIKIPATHWAYS_ARCHIVE):
+            resource_folder = WIKIPATHWAYS_ARCHIVE
+        else:
+            resource_folder = os.path.join(WIKIPATHWAYS_FILES, WIKIPATHWAYS_ARCHIVE_ROOT)
+
+    logger.info('Reading RDF files from %s', resource_folder)
+
+    return resource_folder, get_wikipathways_species_files(resource_folder, species_names, connection, only_canonical)
+
+
+format_option = click.option(
+    '--format', 'fmt', type=click.Choice(['rdf', 'gpml']), default='rdf', show_default=True,
+    help='Format of the WikiPathways files',
+)
+
+
 @main.command(help='Downloads WikiPathways RDF files')
-def download():
+@click.option('--extract', is_flag=True, help='Also extract the RDF files from the release archive')
+@format_option
+def download(extract, fmt):
     """Download WikiPathways RDF."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
     logger.setLevel(logging.INFO)
 
-    cached_file = os.path.join(WIKIPATHWAYS_FILES, get_file_name_from_url(RDF_WIKIPATHWAYS))
-    make_downloader(RDF_WIKIPATHWAYS, cached_file, WIKIPATHWAYS_FILES, unzip_file)
+    # The files are read from the archive, so extracting them is only needed by other tools
+    if fmt == 'gpml':
+        make_downloader(
+            GPML_WIKIPATHWAYS, WIKIPATHWAYS_GPML_ARCHIVE, WIKIPATHWAYS_GPML_FILES, unzip_file if extract else None,
+        )
+    else:
+        make_downloader(RDF_WIKIPATHWAYS, WIKIPATHWAYS_ARCHIVE, WIKIPATHWAYS_FILES, unzip_file if extract else None)
     logger.info('WikiPathways was downloaded')
 
 
 @main.command()
 @click.option('-c', '--connection', default=DEFAULT_CACHE_CONNECTION, show_default=True)
-@click.option('-r', '--resource-folder')
+@click.option(
+    '-s', '--species', multiple=True, default=[DEFAULT_SPECIES], show_default=True,
+    help='Species to convert. Can be given multiple times, comma separated or "all"',
+)
+@click.option(
+    '-r', '--resource-folder',
+    help='Release archive, folder with the per-species folders or folder with the files of a single species. '
+         'Defaults to the archive',
+)
 @click.option('-d', '--export-folder', default=WIKIPATHWAYS_BEL)
 @click.option('-v', '--debug', is_flag=True, default=False, help='Debug mode')
 @click.option('-x', '--only-canonical', default=True, help='Parse only canonical pathways')
-def bel(connection: str, resource_folder: str, export_folder: str, debug: bool, only_canonical: bool):
+@click.option('-j', '--jobs', type=int, default=1, show_default=True, help='Number of files converted in parallel')
+@click.option(
+    '--engine', type=click.Choice(['file', 'release']), default='file', show_default=True,
+    help='Load each file in its own graph or the whole release in a single store',
+)
+@click.option('--batch-size', type=int, help='Number of files loaded in each store by the release engine')
+@click.option('--statistics', is_flag=True, help='Also compute the RDF and BEL statistics of each pathway')
+@click.option(
+    '--incremental/--no-incremental', default=True, show_default=True,
+    help='Only convert the pathways that changed since the last conversion',
+)
+@click.option(
+    '--remove-deleted', is_flag=True,
+    help='Remove the exported pathways that are not in the release anymore (the manifest of each species is needed)',
+)
+@click.option(
+    '--hgnc-snapshot/--no-hgnc-snapshot', default=True, show_default=True,
+    help='Load all the HGNC mappings in memory. Otherwise, the genes of each pathway are resolved in batch',
+)
+@click.option('--metrics-path', help='JSON file with the resolution metrics. Defaults to next to the export folder')
+@format_option
+def bel(
+    connection: str,
+    species: List[str],
+    resource_folder: str,
+    export_folder: str,
+    debug: bool,
+    only_canonical: bool,
+    jobs: int,
+    engine: str,
+    batch_size: Optional[int],
+    statistics: bool,
+    incremental: bool,
+    remove_deleted: bool,
+    hgnc_snapshot: bool,
+    metrics_path: Optional[str],
+    fmt: str,
+):
     """Convert WikiPathways to BEL."""
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
 
+    if engine == 'release' and fmt == 'gpml':
+        raise click.UsageError('The release engine only reads RDF files')
+
     if debug:
         logger.setLevel(logging.DEBUG)
 
-    logging.debug = CallCounted(logging.debug)
-
     logger.info('Initiating HGNC Manager')
-    hgnc_manager = HgncManager()
+    hgnc_manager = HgncManager(connection=connection)
 
     if not hgnc_manager.is_populated():
         click.echo('bio2bel_hgnc was not populated. Populating now.')
         hgnc_manager.populate()
 
+    # Also writes the snapshot of the HGNC mappings loaded by the worker processes
+    if hgnc_snapshot:
+        hgnc_manager = get_hgnc_resolver(hgnc_manager)
+
     t = time.time()
 
-    if resource_folder is None:
-        resource_folder = os.path.join(WIKIPATHWAYS_FILES, 'wp', 'Human')
+    species_names = parse_species_option(species)
 
-    resource_files = iterate_wikipathways_paths(resource_folder, connection, only_canonical)
+    if remove_deleted:
+        # Compare with all the files of the release, so the pathways only left out of this conversion are kept
+        _, release_species_files = _get_species_files(resource_folder, connection, False, species_names, fmt)
 
-    os.makedirs(export_folder, exist_ok=True)
-    wikipathways_to_pickles(resource_files, resource_folder, hgnc_manager, export_folder)
+        for species_name, release_files in release_species_files.items():
+            remove_deleted_pathways(
+                release_files,
+                get_species_export_folder(export_folder, species_name),
+                get_manifest_path(export_folder, species_name),
+                _get_statistics_cache(species_name),
+            )
 
-    logger.info(
-        'WikiPathways exported in %.2f seconds. A total of %d warnings regarding entities that could not be converted '
-        'to standard identifiers were found.',
-        time.time() - t, logging.debug.counter,
+    resource_folder, species_files = _get_species_files(
+        resource_folder, connection, only_canonical, species_names, fmt,
     )
+    logger.info('Converting WikiPathways for: %s', ', '.join(species_files))
+
+    statistics_paths = {
+        species_name: _get_statistics_cache(species_name)
+        for species_name in species_files
+    } if statistics else None
+
+    manifest_paths = {
+        species_name: get_manifest_path(export_folder, species_name)
+        for species_name in species_files
+    } if incremental else None
+
+    if engine == 'release':
+        # Each species is loaded in its own stores
+        for species_name, resource_files in species_files.items():
+            species_export_folder = get_species_export_folder(export_folder, species_name)
+            os.makedirs(species_export_folder, exist_ok=True)
+
+            wikipathways_release_to_pickles(
+                resource_files, resource_folder, hgnc_manager, species_export_folder, batch_size=batch_size,
+                processes=jobs, connection=connection,
+                statistics_path=statistics_paths[species_name] if statistics_paths else None,
+                manifest_path=manifest_paths[species_name] if manifest_paths else None,
+                species=species_name,
+            )
+    else:
+        wikipathways_species_to_pickles(
+            species_files, resource_folder, hgnc_manager, export_folder, processes=jobs, connection=connection,
+            fmt=fmt, statistics_paths=statistics_paths, manifest_paths=manifest_paths,
+        )
+
+    # The statistics of the pathways converted again without them are not the ones of their files anymore
+    if incremental and not statistics:
+        for species_name in species_files:
+            remove_outdated_statistics(
+                get_manifest_path(export_folder, species_name), _get_statistics_cache(species_name),
+            )
+
+    logger.info('WikiPathways exported in %.2f seconds', time.time() - t)
+
+    export_resolution_metrics(export_folder, metrics_path)
 
 
 @main.command()
@@ -108,15 +335,25 @@ def statistics(connection, verbose, only_canonical, export):
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    logger.info('Initiating HGNC Manager')
-    hgnc_manager = HgncManager()
-
     # TODO: Allow for an optional parameter giving the folder of the files
-    resource_folder = os.path.join(WIKIPATHWAYS_DIR, 'wp', 'Human')
+    resource_folder, resource_files = _get_resource_files(None, connection, only_canonical)
+    resource_files = list(resource_files)
+
+    # Reuse the statistics computed by "pathme wikipathways bel --statistics" if they cover the same files, instead of
+    # converting everything again
+    pathways_statistics = load_files_statistics(resource_files, resource_folder, WIKIPATHWAYS_STATISTICS_CACHE)
+
+    if pathways_statistics is not None:
+        logger.info('Loading statistics from %s', WIKIPATHWAYS_STATISTICS_CACHE)
+        global_statistics, all_pathways_statistics = summarize_statistics_cache(pathways_statistics)
+
+    else:
+        logger.info('Initiating HGNC Manager')
+        hgnc_manager = get_hgnc_resolver(HgncManager())
 
-    resource_files = iterate_wikipathways_paths(resource_folder, connection, only_canonical)
+        global_statistics, all_pathways_statistics = get_wp_statistics(resource_files, resource_folder, hgnc_manager)
 
-    global_statistics, all_pathways_statistics = get_wp_statistics(resource_files, resource_folder, hgnc_manager)
+    logger.info('WikiPathways: %s', json.dumps(global_statistics['bel_vs_rdf']))
 
     df = statistics_to_df(all_pathways_statistics)
 
@@ -9,8 +9,10 @@ import pybel
 from bio2bel_hgnc import Manager
 from pybel import BELGraph
 from pybel.dsl import BaseEntity, abundance, activity, bioprocess, complex_abundance, gene, protein, rna
-from .utils import check_multiple, evaluate_wikipathways_metadata, get_valid_gene_identifier
+from .utils import check_multiple, evaluate_wikipathways_metadata, get_gene_lookups, get_valid_gene_identifier
 from ..constants import ACTIVITY_ALLOWED_MODIFIERS, HGNC
+from ..metrics import InstrumentedManager
+from ..resolver import prefetch_hgnc_lookups
 from ..utils import add_bel_metadata, parse_id_uri
 
 __all__ = [
@@ -36,7 +38,7 @@ def convert_to_bel(
     nodes: Dict[str, Dict],
     complexes: Dict[str, Dict],
     interactions: Dict[str, Dict],
-    pathway_info, hgnc_manager: Manager,
+    pathway_info, hgnc_manager: Optional[Manager],
 ) -> BELGraph:
     """Convert  RDF graph info to BEL."""
     graph = BELGraph(
@@ -51,20 +53,37 @@ def convert_to_bel(
 
     pathway_id = graph.graph['pathway_id'] = pathway_info['pathway_id']
 
+    # Resolve the genes of all the nodes at once instead of one query per node
+    hgnc_manager = prefetch_hgnc_lookups(hgnc_manager, (
+        lookup
+        for node in nodes.values()
+        if _is_gene_node(node)
+        for lookup in get_gene_lookups(node.get('identifiers', node))
+    ))
+    hgnc_manager = InstrumentedManager.wrap(hgnc_manager)
+
     nodes = {
         node_id: node_to_bel(node, hgnc_manager, pathway_id)
         for node_id, node in nodes.items()
     }
     nodes.update(complexes_to_bel(complexes, nodes, graph))
 
+    # Reactions built in this pathway, shared by all the interactions referring to them
+    reactions = {}
+
     for interaction in interactions.values():
         participants = interaction['participants']
-        add_edges(graph, participants, nodes, interactions, interaction)
+        add_edges(graph, participants, nodes, interactions, interaction, reactions)
 
     return graph
 
 
-def node_to_bel(node: Dict, hgnc_manager: Manager, pathway_id) -> BaseEntity:
+def _is_gene_node(node: Dict) -> bool:
+    """Check whether the gene of a node is looked up in HGNC."""
+    return any(node_type in node['node_types'] for node_type in ('Protein', 'Rna', 'GeneProduct'))
+
+
+def node_to_bel(node: Dict, hgnc_manager: Optional[Manager], pathway_id) -> BaseEntity:
     """Create a BEL node."""
     node_types = node['node_types']
     uri_id = node['uri_id']
@@ -88,7 +107,7 @@ def node_to_bel(node: Dict, hgnc_manager: Manager, pathway_id) -> BaseEntity:
     else:
         node_ids_dict = node
 
-    if any(node_type in node_types for node_type in ('Protein', 'Rna', 'GeneProduct')):
+    if _is_gene_node(node):
         namespace, name, identifier = get_valid_gene_identifier(node_ids_dict, hgnc_manager, pathway_id)
         if 'Protein' in node_types:
             return protein(namespace=namespace.upper(), name=name, identifier=identifier)
@@ -145,66 +164,136 @@ def complex_to_bel(complex_dict, nodes, graph: BELGraph):
     return complex_bel_node
 
 
+#: Placeholder of the reactions being built, to detect interactions that (indirectly) refer to themselves
+_BUILDING = object()
+
+
 def get_reaction_node(
     participants: Iterable[Tuple[str, str]],
     nodes,
     interactions,
+    reactions: Optional[Dict[str, Any]] = None,
 ) -> pybel.dsl.Reaction:
+    """Build the reaction of the participants of an interaction.
+
+    :param participants: pairs of source and target of the interaction
+    :param nodes: dictionary from node identifiers to BEL nodes
+    :param interactions: dictionary from interaction identifiers to interactions
+    :param reactions: reactions already built in the pathway, keyed by interaction identifier
+    """
+    if reactions is None:
+        reactions = {}
+
     reactants = set()
     products = set()
 
     for source, target in participants:
-        source = get_node(source, nodes, interactions)
+        source = get_node(source, nodes, interactions, reactions)
         if source:
             reactants.add(source)
         else:
-            logging.debug(f'Could not find source for reaction: {source}')
+            logger.debug('Could not find source for reaction: %s', source)
 
-        target = get_node(target, nodes, interactions)
+        target = get_node(target, nodes, interactions, reactions)
         if target:
             products.add(target)
         else:
-            logging.debug(f'Could not find target for reaction: {target}')
+            logger.debug('Could not find target for reaction: %s', target)
 
     return pybel.dsl.Reaction(reactants=reactants, products=products)
 
 
+def get_interaction_reaction_node(
+    identifier: str,
+    nodes,
+    interactions,
+    reactions: Dict[str, Any],
+) -> Optional[pybel.dsl.Reaction]:
+    """Get the reaction of an interaction, building it only the first time it is referred to.
+
+    :param identifier: interaction identifier
+    :param nodes: dictionary from node identifiers to BEL nodes
+    :param interactions: dictionary from interaction identifiers to interactions
+    :param reactions: reactions already built in the pathway, keyed by interaction identifier
+    :return: the reaction, or None if the interaction is part of a cycle of interactions
+    """
+    reaction = reactions.get(identifier)
+
+    if reaction is _BUILDING:
+        logger.debug('Interaction %s refers to itself', identifier)
+        return None
+
+    if reaction is None:
+        reactions[identifier] = _BUILDING
+        reaction = reactions[identifier] = get_reaction_node(
+            interactions[identifier]['participants'], nodes, interactions, reactions,
+        )
+
+    return reaction
+
+
 def get_node(
     node: str,
     nodes: Mapping[str, BaseEntity],
     interactions: Mapping[str, Any],
+    reactions: Optional[Dict[str, Any]] = None,
 ) -> Optional[BaseEntity]:
+    """Get the BEL node of a participant, which is either a node or another interaction.
+
+    :param node: participant URI or identifier
+    :param nodes: dictionary from node identifiers to BEL nodes
+    :param interactions: dictionary from interaction identifiers to interactions
+    :param reactions: reactions already built in the pathway, keyed by interaction identifier
+    """
     if node in nodes:
         return nodes[node]
 
     if '/Interaction/' in str(node):
         _, _, _, identifier = parse_id_uri(node)
         if identifier in interactions:
-            return get_reaction_node(interactions[identifier]['participants'], nodes, interactions)
+            return get_interaction_reaction_node(
+                identifier, nodes, interactions, {} if reactions is None else reactions,
+            )
 
     logger.debug('No valid id for node %s', node)
 
 
-def add_edges(graph: BELGraph, participants, nodes, interactions: Dict, att: Dict):
+def add_edges(
+    graph: BELGraph,
+    participants,
+    nodes,
+    interactions: Dict,
+    att: Dict,
+    reactions: Optional[Dict[str, Any]] = None,
+):
     """Add edges to BELGraph."""
+    if reactions is None:
+        reactions = {}
+
     uri_id = att['uri_id']
     edge_types = att['interaction_types']
     _, _, namespace, interaction_id = parse_id_uri(uri_id)
 
     if 'Conversion' in edge_types:
-        graph.add_node_from_data(get_reaction_node(participants, nodes, interactions))
+        if interaction_id in interactions:
+            reaction = get_interaction_reaction_node(interaction_id, nodes, interactions, reactions)
+        else:
+            reaction = get_reaction_node(participants, nodes, interactions, reactions)
+
+        if reaction is not None:
+            graph.add_node_from_data(reaction)
 
     else:
         for source, target in participants:
-            u = get_node(source, nodes, interactions)
-            v = get_node(target, nodes, interactions)
+            u = get_node(source, nodes, interactions, reactions)
+            v = get_node(target, nodes, interactions, reactions)
 
             if u and v:
                 add_simple_edge(graph, u, v, edge_types, uri_id)
             if u is None:
-                logger.debug(f'Source is none: {source}')
+                logger.debug('Source is none: %s', source)
             if v is None:
-                logger.debug(f'Target is none: {target}')
+                logger.debug('Target is none: %s', target)
 
 
 def add_simple_edge(graph: BELGraph, u: BaseEntity, v: BaseEntity, edge_types, uri_id):
@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+
+"""This module reads the WikiPathways GPML files.
+
+GPML is the XML format WikiPathways is edited in and the RDF files are generated from. It is much smaller and faster to
+parse than the RDF files, so reading it gives the same nodes, complexes, interactions and metadata as
+:mod:`pathme.wikipathways.rdf_triples` without going through rdflib. The entries are built following the conversion
+from GPML to RDF done by WikiPathways (e.g., data nodes are identified by their cross-reference and interactions
+pointing to an anchor of another interaction refer to that interaction).
+
+The only information missing in GPML are the cross-references mapped with BridgeDb (``wp:bdb*`` in RDF). The nodes
+only have the cross-reference of their own database (e.g., an Entrez Gene node has its Entrez Gene identifier but not
+its HGNC symbol).
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+from .rdf_triples import QueryRow, iterate_rows
+from .utils import GPML_FILE_NAME_RE, filter_canonical_files, get_canonical_pathways, get_wikipathways_archive
+from ..utils import query_result_to_dict
+
+__all__ = [
+    'get_gpml_pathway_components',
+    'get_gpml_file_identifier',
+    'parse_gpml',
+    'filter_gpml_files',
+    'iterate_gpml_paths',
+    'iterate_gpml_archive',
+    'read_gpml_file',
+]
+
+logger = logging.getLogger(__name__)
+
+#: URI prefixes of the cross-reference databases and the label of the corresponding BridgeDb cross-reference
+GPML_DATABASES = {
+    'Entrez Gene': ('http://identifiers.org/ncbigene/', 'bdb_ncbigene'),
+    'HGNC': ('http://identifiers.org/hgnc.symbol/', 'bdb_hgncsymbol'),
+    'HGNC Accession number': ('http://identifiers.org/hgnc/', None),
+    'Ensembl': ('http://identifiers.org/ensembl/', 'bdb_ensembl'),
+    'Uniprot-TrEMBL': ('http://identifiers.org/uniprot/', 'bdb_uniprot'),
+    'Uniprot-SwissProt': ('http://identifiers.org/uniprot/', 'bdb_uniprot'),
+    'ChEBI': ('http://identifiers.org/chebi/', 'bdb_chebi'),
+    'ChemSpider': ('http://identifiers.org/chemspider/', 'bdb_chemspider'),
+    'Wikidata': ('http://identifiers.org/wikidata/', 'bdb_wikidata'),
+    'PubChem-compound': ('http://identifiers.org/pubchem.compound/', None),
+    'HMDB': ('http://identifiers.org/hmdb/', None),
+    'KEGG Compound': ('http://identifiers.org/kegg.compound/', None),
+    'KEGG Genes': ('http://identifiers.org/kegg.genes/', None),
+    'CAS': ('http://identifiers.org/cas/', None),
+    'WikiPathways': ('http://identifiers.org/wikipathways/', None),
+    'Reactome': ('http://identifiers.org/reactome/', None),
+    'Enzyme Nomenclature': ('http://identifiers.org/ec-code/', None),
+    'miRBase': ('http://identifiers.org/mirbase.mature/', None),
+    'miRBase Sequence': ('http://identifiers.org/mirbase/', None),
+    'InterPro': ('http://identifiers.org/interpro/', None),
+    'Pfam': ('http://identifiers.org/pfam/', None),
+    'ChEMBL compound': ('http://identifiers.org/chembl.compound/', None),
+    'Wikipedia': ('http://identifiers.org/wikipedia.en/', None),
+    'BRENDA': ('http://identifiers.org/brenda/', None),
+    'NCBI Protein': ('http://identifiers.org/ncbiprotein/', None),
+    'EMBL': ('http://identifiers.org/ena.embl/', None),
+    'LIPID MAPS': ('http://identifiers.org/lipidmaps/', None),
+}
+
+#: Interaction types given by the arrow heads (MIM notation). Plain arrows are only directed interactions
+GPML_ARROW_HEADS = {
+    'Arrow': None,
+    'mim-conversion': 'Conversion',
+    'mim-stimulation': 'Stimulation',
+    'mim-necessary-stimulation': 'NecessaryStimulation',
+    'mim-catalysis': 'Catalysis',
+    'mim-inhibition': 'Inhibition',
+    'TBar': 'Inhibition',
+    'mim-transcription-translation': 'TranscriptionTranslation',
+    'mim-binding': 'Binding',
+    'mim-cleavage': 'Cleavage',
+    'mim-translocation': 'Translocation',
+}
+
+#: Data node types that are not typed in RDF
+UNTYPED_DATA_NODES = {'Pathway', 'Unknown', ''}
+
+PATHWAY_URI = 'http://identifiers.org/wikipathways/{identifier}_r{revision}'
+ENTRY_URI = 'http://rdf.wikipathways.org/Pathway/{identifier}_r{revision}/{entry}/{graph_id}'
+
+
+def get_gpml_file_identifier(file_name: str) -> Tuple[Optional[str], Optional[str]]:
+    """Get the pathway identifier and revision from the name of a GPML file.
+
+    :param file_name: file name or path (e.g., Hs_IL-9_Signaling_Pathway_WP22_97775.gpml)
+    :return: pathway identifier and revision (e.g., WP22 and 97775). None if they are not in the file name
+    """
+    match = GPML_FILE_NAME_RE.search(os.path.basename(file_name))
+    if match is None:
+        return None, None
+
+    return match.group(1), match.group(2)
+
+
+def parse_gpml(source: Union[str, bytes]) -> ElementTree.Element:
+    """Parse a GPML file.
+
+    :param source: path of the file or its content
+    :return: root (Pathway) element
+    """
+    if isinstance(source, bytes):
+        return ElementTree.fromstring(source)
+
+    return ElementTree.parse(source).getroot()
+
+
+class _GpmlPathway:
+    """Index of the elements of a GPML pathway and how they are referred to in RDF."""
+
+    def __init__(self, root: ElementTree.Element, identifier: str, revision: str):
+        self.root = root
+        self.identifier = identifier
+        self.revision = revision
+
+        # Elements are in the GPML namespace of the version of the file (e.g., {http://pathvisio.org/GPML/2013a})
+        self.namespace = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+
+        self.data_nodes = self.findall('DataNode')
+        self.groups = self.findall('Group')
+        self.interactions = self.findall('Interaction')
+
+        #: URI of the interaction of each anchor
+        self.anchors = {
+            anchor.get('GraphId'): self.get_entry_uri('WP/Interaction', interaction.get('GraphId'))
+            for interaction in self.interactions
+            for anchor in interaction.iter(self.namespace + 'Anchor')
+            if anchor.get('GraphId')
+        }
+
+        #: How each data node is referred to (Entrez Gene identifier, otherwise identifier, otherwise URI)
+        self.references = {
+            data_node.get('GraphId'): self.get_data_node_reference(data_node)
+            for data_node in self.data_nodes
+        }
+
+        #: URI of the complexes, by group identifier
+        self.complexes = {
+            group.get('GroupId'): self.get_entry_uri('Complex', group.get('GraphId') or group.get('GroupId'))
+            for group in self.groups
+            if group.get('Style') == 'Complex'
+        }
+        for group in self.groups:
+            if group.get('GroupId') in self.complexes and group.get('GraphId'):
+                self.references[group.get('GraphId')] = self.complexes[group.get('GroupId')]
+
+    def findall(self, tag: str) -> List[ElementTree.Element]:
+        """Get the children of the pathway with a given tag."""
+        return self.root.findall(self.namespace + tag)
+
+    def get_entry_uri(self, entry: str, graph_id: str) -> str:
+        """Get the URI of an entry that does not have cross-references (e.g., an interaction)."""
+        return ENTRY_URI.format(identifier=self.identifier, revision=self.revision, entry=entry, graph_id=graph_id)
+
+    def get_xref(self, data_node: ElementTree.Element) -> Tuple[str, str]:
+        """Get the database and identifier of the cross-reference of a data node."""
+        xref = data_node.find(self.namespace + 'Xref')
+        if xref is None:
+            return '', ''
+
+        return xref.get('Database', '').strip(), xref.get('ID', '').strip()
+
+    def get_data_node_uri(self, data_node: ElementTree.Element) -> str:
+        """Get the URI of a data node, given by its cross-reference."""
+        database, identifier = self.get_xref(data_node)
+
+        if identifier and database in GPML_DATABASES:
+            return GPML_DATABASES[database][0] + identifier
+
+        return self.get_entry_uri('WP/DataNode', data_node.get('GraphId'))
+
+    def get_data_node_reference(self, data_node: ElementTree.Element) -> str:
+        """Get how a data node is referred to by the complexes and interactions."""
+        database, identifier = self.get_xref(data_node)
+
+        if identifier and database in GPML_DATABASES:
+            return identifier
+
+        return self.get_data_node_uri(data_node)
+
+    def get_point_reference(self, point: ElementTree.Element) -> Optional[str]:
+        """Get the data node, complex or interaction (if pointing to one of its anchors) a point refers to."""
+        graph_ref = point.get('GraphRef')
+
+        if graph_ref in self.references:
+            return self.references[graph_ref]
+
+        return self.anchors.get(graph_ref)
+
+
+def _iterate_gpml_node_rows(pathway: _GpmlPathway) -> Iterable[QueryRow]:
+    """Generate the rows of the data nodes, like :func:`pathme.wikipathways.rdf_triples._iterate_node_rows`."""
+    for data_node in pathway.data_nodes:
+        name = data_node.get('TextLabel')
+        if not name:
+            continue
+
+        uri_id = pathway.get_data_node_uri(data_node)
+        reference = pathway.references[data_node.get('GraphId')]
+
+        node_types = ['DataNode']
+        if data_node.get('Type', '') not in UNTYPED_DATA_NODES:
+            node_types.append(data_node.get('Type'))
+
+        values = {
+            'name': [name],
+            'node_types': node_types,
+        }
+
+        database, _ = pathway.get_xref(data_node)
+        bdb_label = GPML_DATABASES.get(database, (None, None))[1]
+        if bdb_label is not None:
+            values[bdb_label] = [reference]
+
+        yield from iterate_rows(values, fixed={'uri_id': uri_id, 'identifier': reference})
+
+
+def _iterate_gpml_complex_rows(pathway: _GpmlPathway) -> Iterable[QueryRow]:
+    """Generate the rows of the complexes, like :func:`pathme.wikipathways.rdf_triples._iterate_complex_rows`."""
+    participants = {}
+
+    for data_node in pathway.data_nodes:
+        if data_node.get('GroupRef') in pathway.complexes:
+            participants.setdefault(data_node.get('GroupRef'), []).append(
+                pathway.references[data_node.get('GraphId')],
+            )
+
+    for group_id, uri_id in pathway.complexes.items():
+        if group_id not in participants:
+            continue
+
+        values = {
+            'node_types': ['Complex'],
+            'participants': participants[group_id],
+        }
+
+        yield from iterate_rows(values, fixed={'uri_id': uri_id})
+
+
+def _iterate_gpml_interaction_rows(pathway: _GpmlPathway) -> Iterable[QueryRow]:
+    """Generate the rows of the interactions, like :func:`pathme.wikipathways.rdf_triples._iterate_interaction_rows`.
+
+    The source is the first point of the line and the target the last one, which has the arrow head.
+    """
+    for interaction in pathway.interactions:
+        graphics = interaction.find(pathway.namespace + 'Graphics')
+        if graphics is None:
+            continue
+
+        points = graphics.findall(pathway.namespace + 'Point')
+        if len(points) < 2:
+            continue
+
+        # Only the lines with an arrow head are directed interactions
+        arrow_head = points[-1].get('ArrowHead')
+        if arrow_head is None:
+            continue
+
+        source = pathway.get_point_reference(points[0])
+        target = pathway.get_point_reference(points[-1])
+        if source is None or target is None:
+            continue
+
+        interaction_types = ['DirectedInteraction', 'Interaction']
+        if GPML_ARROW_HEADS.get(arrow_head) is not None:
+            interaction_types.append(GPML_ARROW_HEADS[arrow_head])
+
+        uri_id = pathway.get_entry_uri('WP/Interaction', interaction.get('GraphId'))
+
+        fixed = {
+            'uri_id': uri_id,
+            'identifier': interaction.get('GraphId'),
+            'source': source,
+            'target': target,
+        }
+
+        yield from iterate_rows({'interaction_types': interaction_types}, fixed=fixed)
+
+
+def _get_gpml_pathway_metadata(pathway: _GpmlPathway) -> Dict[str, str]:
+    """Get the metadata of the pathway, like :func:`pathme.wikipathways.rdf_triples.get_pathway_metadata`."""
+    row = QueryRow(
+        title=pathway.root.get('Name'),
+        identifier=pathway.identifier,
+        pathway_id=PATHWAY_URI.format(identifier=pathway.identifier, revision=pathway.revision),
+    )
+
+    for comment in pathway.findall('Comment'):
+        if comment.get('Source') == 'WikiPathways-description' and comment.text:
+            row['description'] = comment.text
+            break
+
+    return query_result_to_dict(
+        [row],
+        attr_empty=['title', 'identifier', 'description', 'pathway_id'],
+        id_dict=False,
+    )
+
+
+def get_gpml_pathway_components(
+    source: Union[str, bytes],
+    identifier: Optional[str] = None,
+    revision: Optional[str] = None,
+) -> Tuple[Dict[str, Dict], Dict[str, Dict], Dict[str, Dict], Dict[str, str]]:
+    """Get the components of a GPML file in the same data structures as the RDF files.
+
+    :param source: path of the file or its content
+    :param identifier: pathway identifier (e.g., WP22). Defaults to the one in the file name
+    :param revision: pathway revision (e.g., 97775). Defaults to the one in the file name
+    :return: nodes, complexes, interactions and metadata, as consumed by
+     :func:`pathme.wikipathways.convert_to_bel.convert_to_bel`
+    """
+    if identifier is None and isinstance(source, str):
+        identifier, revision = get_gpml_file_identifier(source)
+
+    if identifier is None:
+        raise ValueError('The identifier of the pathway is neither given nor in the file name')
+
+    pathway = _GpmlPathway(parse_gpml(source), identifier, revision)
+
+    nodes = query_result_to_dict(_iterate_gpml_node_rows(pathway), ids_argument=True)
+    complexes = query_result_to_dict(_iterate_gpml_complex_rows(pathway))
+    interactions = query_result_to_dict(
+        _iterate_gpml_interaction_rows(pathway),
+        directed_interaction=('source', 'target'),
+    )
+
+    return nodes, complexes, interactions, _get_gpml_pathway_metadata(pathway)
+
+
+def filter_gpml_files(file_names: Iterable[str]) -> List[str]:
+    """Filter the files that are not GPML files of a WikiPathways pathway."""
+    return [
+        file_name
+        for file_name in file_names
+        if get_gpml_file_identifier(file_name)[0] is not None
+    ]
+
+
+def iterate_gpml_paths(
+    directory: str,
+    connection: Optional[str] = None,
+    only_canonical: bool = True,
+) -> List[str]:
+    """Get the WikiPathways GPML files in a folder.
+
+    :param directory: folder path
+    :param connection: database connection
+    :param only_canonical: only identifiers present in WP bio2bel db
+    """
+    if not os.path.exists(directory):
+        raise FileNotFoundError(
+            f'{directory} does not exist. Please ensure you have downloaded WikiPathways using '
+            f'the "pathme wikipathways download --format gpml" command or you have passed the right argument.',
+        )
+
+    paths = filter_gpml_files(os.listdir(directory))
+
+    if only_canonical:
+        paths = filter_canonical_files(paths, get_canonical_pathways(directory, connection))
+
+    return paths
+
+
+def iterate_gpml_archive(
+    archive_path: str,
+    connection: Optional[str] = None,
+    only_canonical: bool = True,
+) -> List[str]:
+    """Get the WikiPathways GPML files in the release archive, without extracting them.
+
+    :param archive_path: path to the release zip archive
+    :param connection: database connection
+    :param only_canonical: only identifiers present in WP bio2bel db
+    :return: names of the archive members
+    """
+    members = filter_gpml_files(get_wikipathways_archive(archive_path).namelist())
+
+    if only_canonical:
+        members = filter_canonical_files(members, get_canonical_pathways(archive_path, connection))
+
+    return members
+
+
+def read_gpml_file(
+    file_name: str,
+    resource_folder: str,
+    archive: bool,
+) -> Tuple[Dict[str, Dict], Dict[str, Dict], Dict[str, Dict], Dict[str, str]]:
+    """Read the components of a GPML file from a folder or from the release archive.
+
+    :param file_name: name of the file in the folder or archive
+    :param resource_folder: folder with the GPML files or release archive containing them
+    :param archive: whether the resource folder is the release archive
+    """
+    identifier, revision = get_gpml_file_identifier(file_name)
+
+    if archive:
+        source = get_wikipathways_archive(resource_folder).read(file_name)
+    else:
+        source = os.path.join(resource_folder, file_name)
+
+    return get_gpml_pathway_components(source, identifier, revision)
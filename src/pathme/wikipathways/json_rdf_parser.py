@@ -1,19 +1,35 @@
 # -*- coding: utf-8 -*-
 
-"""This module contains the custom parser for RDF."""
+"""This module contains the custom parser for RDF.
 
-import json
+The parser walks the triples of the RDF graph grouped by subject. The URIs are decomposed once and cached, since the
+same URIs (e.g., predicates, types and pathway identifiers) are repeated across all the entries. The caches are bounded,
+so the URIs of the nodes of a whole release are not kept during the conversion.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 
 import rdflib
+from rdflib import Literal, RDF, URIRef
 
 from .utils import convert_to_nx
 from ..utils import parse_rdf
 
 """RDF CUSTOM PARSER FUNCTIONS"""
 
+WP_SOURCE = 'http://vocabularies.wikipathways.org/wp#source'
+WP_TARGET = 'http://vocabularies.wikipathways.org/wp#target'
+WP_IS_ABOUT = 'http://vocabularies.wikipathways.org/wp#isAbout'
+
+#: Number of URIs kept by the cache of each URI parser. It is much more than the number of URIs of the largest pathway
+URI_CACHE_SIZE = 2 ** 14
+
 """URI Parsers"""
 
 
+@lru_cache(maxsize=URI_CACHE_SIZE)
 def parse_id_uri(uri):
     """Get the components of a given uri (with identifier at the last position).
 
@@ -36,6 +52,7 @@ def parse_id_uri(uri):
     return prefix, prefix_namespaces, namespace, identifier
 
 
+@lru_cache(maxsize=URI_CACHE_SIZE)
 def parse_namespace_uri(uri):
     """Get the prefix and namespace of a given URI (without identifier, only with a namspace at last position).
 
@@ -134,10 +151,21 @@ def match_entry(entry):
     :returns: entry_type:  type identifier, used as first key to the main graph ('nodes' -> graph[entry_type][node_id])
     :rtype: Optional[tuple[str,str]]
     """
+    return match_entry_uri(entry['@id'], entry.get('@type'))
+
+
+def match_entry_uri(uri, types=None):
+    """For a given entry URI and its types, get the identifier of the entry and also the entry_type.
+
+    :param str uri: entry URI
+    :param Optional[iter[str]] types: URIs of the types of the entry
+    :returns: entry_id: for nodes would be the ncbi id and edges the interaction wp id
+    :returns: entry_type:  type identifier, used as first key to the main graph ('nodes' -> graph[entry_type][node_id])
+    :rtype: Optional[tuple[str,str]]
+    """
     # Get the components of the entry identifier URI.
     # The URI identifier will be used as the entry id and the namespace for
     # type identification, wheras the prefix to match the entry handling
-    uri = entry['@id']
     prefix, _, namespace, entry_id = parse_id_uri(uri)
 
     # Check if the prefix is recognized (could also be treated different for specific prefix cases)
@@ -145,8 +173,8 @@ def match_entry(entry):
         raise Exception('Entry not recognised: %s', prefix)
 
     # Get the entry type id calling the get_entry_type function, if the the entry has an attribute with type
-    if '@type' in entry:
-        entry_type = get_entry_type(entry['@type'])
+    if types:
+        entry_type = get_entry_type(types)
 
     # Assign literally the entry type when the entry has no type attribute,
     # if the entry id namespace is recognized (like the pathway id entry), else raise an exeption
@@ -159,6 +187,7 @@ def match_entry(entry):
     return entry_id, entry_type
 
 
+@lru_cache(maxsize=URI_CACHE_SIZE)
 def match_attribute(uri):
     """For a given attribute @id URI, get the label to be assigned to the attribute.
 
@@ -244,22 +273,29 @@ def set_interaction(entry, graph):
     :param dict graph: pathway network graph object
     """
     # Get the participants of the interaction, picking directly the node identifiers from the entry attributes with
-    # the
-    # corresponding argument URI namespace (wp#source or wp#interaction). After, for each participant, parse the
-    # URI
-    # value to obtine the nodes identifier.
-    # Get the node source id
-    uri_source_id = entry['http://vocabularies.wikipathways.org/wp#source'][0]['@id']
-    _, _, _, source_id = parse_id_uri(uri_source_id)
+    # the corresponding argument URI namespace (wp#source or wp#target).
+    add_interaction(
+        entry[WP_SOURCE][0]['@id'],
+        entry[WP_TARGET][0]['@id'],
+        entry[WP_IS_ABOUT][0]['@id'],
+        graph,
+    )
 
-    # Get the node target id
-    uri_target_id = entry['http://vocabularies.wikipathways.org/wp#target'][0]['@id']
-    _, _, _, target_id = parse_id_uri(uri_target_id)
 
-    # Also get the isAbout as the identifier of the interaction. For now will be the literal URI, due to no further
-    # information (like inhibits, increments) is indicated
-    uri_interaction_type = entry['http://vocabularies.wikipathways.org/wp#isAbout'][0]['@id']
+def add_interaction(uri_source_id, uri_target_id, uri_interaction_type, graph):
+    """Add the source and target (and the interaction id) of an interaction into the pathway graph.
 
+    :param str uri_source_id: URI of the source node
+    :param str uri_target_id: URI of the target node
+    :param str uri_interaction_type: isAbout URI of the interaction
+    :param dict graph: pathway network graph object
+    """
+    # For each participant, parse the URI value to obtain the nodes identifier.
+    _, _, _, source_id = parse_id_uri(uri_source_id)
+    _, _, _, target_id = parse_id_uri(uri_target_id)
+
+    # The isAbout is the identifier of the interaction. For now will be the literal URI, due to no further
+    # information (like inhibits, increments) is indicated.
     # Finally, add directy to the interactions set of the graph the three identifiers of the interaction as a tuple.
     graph['interactions'].add((source_id, target_id, uri_interaction_type))
 
@@ -272,13 +308,11 @@ def get_entry_type(types) -> str:
      (ex: 'nodes' -> graph[entry_type][node_id])
     :returns: entry_type: type identifier, used as first key to the main graph ('nodes' -> graph[entry_type][node_id])
     """
-    types_set = set()
-
     # For each type indicated in the attribute of the entry, add the namespace to a set
-    for typ in types:
-        _, namespace, _ = parse_namespace_uri(typ)
-
-        types_set.add(namespace)
+    types_set = {
+        parse_namespace_uri(typ)[1]
+        for typ in types
+    }
 
     # Get the type identifier in function of the namespaces of the type set (call match_entry_type).
     entry_type = match_entry_type(types_set)
@@ -298,27 +332,48 @@ def parse_attribute_values(entry_label, entry_id, attribute_values, attribute_la
     :param str attribute_label: label
     :param dict graph: graph object
     """
+    terms = []
+
+    for attribute_raw_value in attribute_values:
+        for value_label in attribute_raw_value:
+            if value_label not in {'@id', '@value', '@language'}:
+                raise Exception(f'Error with attribute {value_label}')
+
+        if '@id' in attribute_raw_value:
+            terms.append(URIRef(attribute_raw_value['@id']))
+        else:
+            terms.append(Literal(attribute_raw_value['@value'], lang=attribute_raw_value.get('@language')))
+
+    parse_attribute_terms(entry_label, entry_id, terms, attribute_label, graph)
+
+
+def parse_attribute_terms(entry_label, entry_id, terms, attribute_label, graph):
+    """For each RDF term in terms, taking into account the attribute_label type.
+
+    :param str entry_label: entry label
+    :param str entry_id: entry identifier
+    :param list[rdflib.term.Node] terms: values
+    :param str attribute_label: label
+    :param dict graph: graph object
+    """
     # If it is specified value_namespace thus would be the value namespace), adds a new entry to the graph
     # (calling set_entry_attribute method) being the last level of parsing. The value is added as a set if there are
-    # multiple values for the same attribute_label or as a sigle value.
+    # multiple values for the same attribute_label or as a sigle value. Typed literals are taken by their lexical form.
     attribute_value = set()
 
-    for attribute_raw_value in attribute_values:
-        for value_label, value in attribute_raw_value.items():
-            if value_label == '@id':
-                _, _, value_namespace, value_identifier = parse_id_uri(value)
-                attribute_value.add(value_identifier)
+    for term in terms:
+        if isinstance(term, Literal):
+            attribute_value.add(str(term))
 
-                if attribute_label == 'value_namespace':
-                    attribute_label = value_namespace
+            if term.language:
+                set_entry_attribute(entry_label, entry_id, 'language', term.language, graph)
 
-            elif value_label == '@value':
-                attribute_value.add(value)
+        else:
+            _, _, value_namespace, value_identifier = parse_id_uri(str(term))
+            attribute_value.add(value_identifier)
 
-            elif value_label == '@language':
-                set_entry_attribute(entry_label, entry_id, 'language', value, graph)
-            else:
-                raise Exception(f'Error with attribute {value_label}')
+            if attribute_label == 'value_namespace':
+                attribute_label = value_namespace
 
     if len(attribute_value) == 1:
         attribute_value = list(attribute_value)[0]
@@ -347,6 +402,56 @@ def generate_empty_pathway_graph():
     return {'interactions': set(), 'nodes': {}, 'pathway_info': {}}
 
 
+def iterate_entries(rdf_graph: rdflib.Graph) -> Iterable[Tuple[str, List[str], Dict[str, List[rdflib.term.Node]]]]:
+    """Group the triples of a RDF graph by subject.
+
+    :param rdf_graph: RDF graph
+    :returns: URI, URIs of the types and objects of each predicate of each subject
+    """
+    entries = {}
+
+    for subject, predicate, obj in rdf_graph:
+        if subject not in entries:
+            entries[subject] = [], defaultdict(list)
+
+        types, attributes = entries[subject]
+
+        if predicate == RDF.type:
+            types.append(str(obj))
+        else:
+            attributes[str(predicate)].append(obj)
+
+    for subject, (types, attributes) in entries.items():
+        yield str(subject), types, dict(attributes)
+
+
+def parse_triples(rdf_graph: rdflib.Graph) -> Dict:
+    """Parse the entries of a RDF graph walking its triples.
+
+    :param rdf_graph: RDF graph
+    :returns: pathway network graph object
+    """
+    # Same statements parser as parse_entries, without the JSON-LD representation of the entries
+    graph = generate_empty_pathway_graph()
+
+    for uri, types, attributes in iterate_entries(rdf_graph):
+        entry_id, entry_type = match_entry_uri(uri, types)
+
+        if entry_type == 'interactions':
+            add_interaction(
+                str(attributes[WP_SOURCE][0]),
+                str(attributes[WP_TARGET][0]),
+                str(attributes[WP_IS_ABOUT][0]),
+                graph,
+            )
+
+        elif entry_type != 'complex':
+            for attribute_label, terms in attributes.items():
+                parse_attribute_terms(entry_type, entry_id, terms, match_attribute(attribute_label), graph)
+
+    return graph
+
+
 def parse_entries(entries):
     """Parse entries.
 
@@ -372,30 +477,18 @@ def parse_entries(entries):
     return graph
 
 
-def convert_json(graph: rdflib.Graph):
-    """Convert from rdflib importated graph object to python data structure (list of dicts of each entry).
-
-    :param graph: graph object
-    :rtype: list[dict]
-    """
-    serialized_json = graph.serialize(format='json-ld')
-    return json.loads(serialized_json.decode("utf-8"))
-
-
 def parse_pathway(pathway_path):
     """Parse pathway.
 
     :param str pathway_path: pathway identifier
     :rtype: networkx.MultiDiGraph
     """
-    # After importing the indicated pathway from text file resources into a graph rdflib object(import_pathway),
-    # calls the different data types transformations (convert_json function) and the first statement of the parser that
-    # will return a graph data structure (parse_entries function). This retrieved graph will be converted to a networkx
-    # graph (convert_to_nx function)
+    # After importing the indicated pathway from text file resources into a graph rdflib object, calls the first
+    # statement of the parser that will return a graph data structure (parse_triples function). This retrieved graph
+    # will be converted to a networkx graph (convert_to_nx function)
     graph = parse_rdf(pathway_path, fmt='turtle')
 
-    json_wp_pathway = convert_json(graph)
-    pathway_network = parse_entries(json_wp_pathway)
+    pathway_network = parse_triples(graph)
 
     nodes = pathway_network['nodes']
     interactions = pathway_network['interactions']
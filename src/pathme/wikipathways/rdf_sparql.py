@@ -2,10 +2,12 @@
 
 """This module contains the methods that run SPARQL queries to create the WikiPathways Graphs."""
 
+import itertools as itt
 import logging
 import os
 from collections import defaultdict
-from typing import Dict, Iterable, Tuple
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 import rdflib
 import tqdm
@@ -14,8 +16,19 @@ from rdflib.namespace import DC, DCTERMS, Namespace, RDF, RDFS
 import bio2bel_hgnc
 from pybel import BELGraph, to_pickle
 from .convert_to_bel import convert_to_bel
-from .utils import debug_pathway_info
-from ..utils import get_pathway_statitics, parse_rdf, query_result_to_dict
+from .gpml import read_gpml_file
+from .rdf_triples import WP, get_pathway_components, get_pathway_metadata, iterate_pathways_components
+from .utils import (
+    debug_pathway_info, export_manifest, get_wikipathways_archive, get_wikipathways_file_hash,
+    get_wikipathways_file_identifier, is_wikipathways_archive, load_manifest, parse_wikipathways_archive_member,
+)
+from ..constants import DEFAULT_SPECIES
+from ..metrics import ResolutionMetrics, collect_resolution_metrics, get_resolution_metrics
+from ..resolver import HgncResolver, get_hgnc_resolver
+from ..utils import (
+    add_pathway_statistics, export_statistics_cache, get_pathway_statitics, get_species_export_folder,
+    load_statistics_cache, parse_rdf, query_result_to_dict,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -214,43 +227,60 @@ def _get_pathway_components(graph) -> Tuple[
 """Statistics functions"""
 
 
+def _get_wikipathways_pathway_statistics(nodes, complexes, interactions, bel_graph: BELGraph) -> Dict[str, Dict]:
+    """Get the RDF and BEL types statistics of a WikiPathways pathway.
+
+    :param dict nodes: nodes extracted from the RDF
+    :param dict complexes: complexes extracted from the RDF
+    :param dict interactions: interactions extracted from the RDF
+    :param bel_graph: BEL graph converted from the nodes, complexes and interactions
+    :return: the name of the pathway and its statistics
+    """
+    nodes_types = [
+        node['node_types']
+        for node in itt.chain(nodes.values(), complexes.values())
+    ]
+    edges_types = [
+        interaction['interaction_types']
+        for interaction in interactions.values()
+    ]
+
+    return {
+        'name': bel_graph.name,
+        'statistics': get_pathway_statitics(nodes_types, edges_types, bel_graph),
+    }
+
+
 def get_wp_statistics(resource_files, resource_folder, hgnc_manager) -> Tuple[
     Dict[str, Dict[str, int]],
     Dict[str, Dict[str, Dict[str, int]]],
 ]:
     """Load WikiPathways RDF to BELGraph.
 
+    The same statistics can be computed during the conversion with the ``statistics_path`` argument of
+    :func:`wikipathways_to_pickles`, which avoids converting all the pathways again.
+
     :param iter[str] resource_files: RDF file path
-    :param str resource_folder: RDF file path
+    :param str resource_folder: folder with the RDF files or release archive containing them
     """
     global_statistics = defaultdict(lambda: defaultdict(int))
     all_pathways_statistics = {}
 
+    archive = is_wikipathways_archive(resource_folder)
+
     for rdf_file in tqdm.tqdm(resource_files, desc='Parsing WikiPathways'):
         # Parse pathway rdf_file
-        pathway_path = os.path.join(resource_folder, rdf_file)
-        rdf_graph = parse_rdf(pathway_path, fmt='turtle')
+        rdf_graph = _load_wikipathways_graph(rdf_file, resource_folder, archive)
 
-        pathway_metadata = _get_pathway_metadata(rdf_graph)
+        pathway_metadata = get_pathway_metadata(rdf_graph)
 
-        nodes, complexes, interactions = _get_pathway_components(rdf_graph)
+        nodes, complexes, interactions = get_pathway_components(rdf_graph)
         bel_graph = convert_to_bel(nodes, complexes, interactions, pathway_metadata, hgnc_manager)
 
-        nodes.update(complexes)
+        pathway_statistics = _get_wikipathways_pathway_statistics(nodes, complexes, interactions, bel_graph)
 
-        nodes_types = [
-            node['node_types']
-            for node in nodes.values()
-        ]
-        edges_types = [
-            interaction['interaction_types']
-            for interaction in interactions
-        ]
-
-        global_statistics, all_pathways_statistics = get_pathway_statitics(
-            nodes_types, edges_types, bel_graph, global_statistics=global_statistics,
-            all_pathways_statistics=all_pathways_statistics,
-        )
+        add_pathway_statistics(global_statistics, pathway_statistics['statistics'])
+        all_pathways_statistics[pathway_statistics['name']] = pathway_statistics['statistics']
 
     return global_statistics, all_pathways_statistics
 
@@ -261,11 +291,14 @@ def get_wp_statistics(resource_files, resource_folder, hgnc_manager) -> Tuple[
 def rdf_wikipathways_to_bel(rdf_graph: rdflib.Graph, hgnc_manager) -> BELGraph:
     """Convert RDF graph to BELGraph.
 
+    The components are extracted with :mod:`pathme.wikipathways.rdf_triples`, which gives the same results as the
+    SPARQL queries in this module.
+
     :param rdf_graph: RDF graph
     :param bio2bel_hgnc.Manager: HGNC manager
     """
-    nodes, complexes, interactions = _get_pathway_components(rdf_graph)
-    metadata = _get_pathway_metadata(rdf_graph)
+    nodes, complexes, interactions = get_pathway_components(rdf_graph)
+    metadata = get_pathway_metadata(rdf_graph)
     return convert_to_bel(nodes, complexes, interactions, metadata, hgnc_manager)
 
 
@@ -280,43 +313,722 @@ def wikipathways_to_bel(file_path: str, hgnc_manager):
     return rdf_wikipathways_to_bel(rdf_graph, hgnc_manager)
 
 
+def _load_wikipathways_graph(rdf_file: str, resource_folder: str, archive: bool) -> rdflib.Graph:
+    """Parse a WikiPathways RDF file from a folder or from the release archive.
+
+    :param rdf_file: name of the file in the folder or archive
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param archive: whether the resource folder is the release archive
+    """
+    if archive:
+        return parse_wikipathways_archive_member(resource_folder, rdf_file)
+
+    return parse_rdf(os.path.join(resource_folder, rdf_file), fmt='turtle')
+
+
 WIKIPATHWAYS_BLACKLIST = {
     'WP1772.ttl',
 }
 
 
+def _export_wikipathways_file(
+    resource_file: str,
+    resource_folder: str,
+    archive: bool,
+    hgnc_manager: Optional[bio2bel_hgnc.Manager],
+    pickle_path: str,
+    fmt: str = 'rdf',
+    statistics: bool = False,
+) -> Optional[Dict]:
+    """Convert a WikiPathways RDF (or GPML) file to BEL and export it to a pickle.
+
+    :return: the name and the statistics of the pathway if statistics are computed
+    """
+    # Parse pathway file and logger stats
+    pathway_path = os.path.join(resource_folder, resource_file)
+
+    if fmt == 'gpml':
+        nodes, complexes, interactions, metadata = read_gpml_file(resource_file, resource_folder, archive)
+    else:
+        rdf_graph = _load_wikipathways_graph(resource_file, resource_folder, archive)
+        nodes, complexes, interactions = get_pathway_components(rdf_graph)
+        metadata = get_pathway_metadata(rdf_graph)
+
+    bel_graph = convert_to_bel(nodes, complexes, interactions, metadata, hgnc_manager)
+
+    debug_pathway_info(bel_graph, pathway_path)
+
+    # Export BELGraph to pickle
+    to_pickle(bel_graph, pickle_path)
+
+    if statistics:
+        return _get_wikipathways_pathway_statistics(nodes, complexes, interactions, bel_graph)
+
+
+#: HGNC manager of a conversion worker process
+_worker_hgnc_manager = None
+
+
+def _init_wikipathways_worker(connection: Optional[str], hgnc_snapshot: bool = True) -> None:
+    """Open the HGNC manager of a worker process.
+
+    :param connection: database connection of the HGNC manager
+    :param hgnc_snapshot: load the HGNC mappings from the snapshot of the database. Otherwise, the genes of each
+     pathway are resolved in batch
+    """
+    # Forked workers start with a copy of the metrics of the parent process, which are already counted there
+    collect_resolution_metrics()
+
+    global _worker_hgnc_manager
+    _worker_hgnc_manager = bio2bel_hgnc.Manager(connection=connection)
+
+    if hgnc_snapshot:
+        _worker_hgnc_manager = get_hgnc_resolver(_worker_hgnc_manager)
+
+
+def _get_species_hgnc_manager(
+    hgnc_manager: Optional[bio2bel_hgnc.Manager],
+    species: str,
+) -> Optional[bio2bel_hgnc.Manager]:
+    """Get the HGNC manager used for the pathways of a species.
+
+    HGNC only has human genes, so the genes of other species are not looked up in it.
+    """
+    return hgnc_manager if species == DEFAULT_SPECIES else None
+
+
+def _wikipathways_file_to_pickle(
+    task: Tuple[str, str, str, bool, str, str, bool],
+) -> Tuple[Dict, str, str, Optional[Dict]]:
+    """Convert a WikiPathways RDF (or GPML) file in a worker process.
+
+    :param task: species, file name, resource folder, whether it is the release archive, pickle path, format and
+     whether statistics are computed
+    :return: resolution metrics of the conversion (see :mod:`pathme.metrics`), species, pickle path and pathway
+     statistics
+    """
+    species, resource_file, resource_folder, archive, pickle_path, fmt, statistics = task
+
+    pathway_statistics = _export_wikipathways_file(
+        resource_file, resource_folder, archive, _get_species_hgnc_manager(_worker_hgnc_manager, species),
+        pickle_path, fmt, statistics,
+    )
+
+    return collect_resolution_metrics().to_dict(), species, pickle_path, pathway_statistics
+
+
+def _get_pickle_name(pickle_path: str) -> str:
+    """Get the name of a pickle without extension (e.g., WP22), which keys the statistics of its pathway."""
+    return os.path.splitext(os.path.basename(pickle_path))[0]
+
+
+def _update_statistics(
+    pathways_statistics: Optional[Dict[str, Dict]],
+    pickle_path: str,
+    pathway_statistics: Optional[Dict],
+) -> None:
+    """Keep the statistics of a converted pathway, keyed by the name of its pickle.
+
+    :param pathways_statistics: statistics of each pathway, updated in place if statistics are computed
+    :param pickle_path: path of the pickle of the pathway
+    :param pathway_statistics: name and statistics of the pathway
+    """
+    if pathways_statistics is not None:
+        pathways_statistics[_get_pickle_name(pickle_path)] = pathway_statistics
+
+
+def _get_file_pickle_name(resource_file: str) -> str:
+    """Get the name of the pickle of a WikiPathways file without extension.
+
+    Pickles are named after the pathway (e.g., WP22.pickle) whatever the format of the file.
+
+    :param resource_file: file name (name of the archive member if reading from the archive)
+    """
+    file_name = os.path.basename(resource_file)
+
+    if file_name.endswith('.gpml'):
+        return get_wikipathways_file_identifier(file_name)
+
+    if file_name.endswith('.ttl'):
+        return file_name[:-len('.ttl')]
+
+    return file_name
+
+
+def _is_current_statistics(pathway_statistics: Optional[Dict], file_hash: str, fmt: str) -> bool:
+    """Check if the statistics of a pathway were computed from the current content of its file.
+
+    :param pathway_statistics: name, statistics and hash and format of the file of the pathway
+    :param file_hash: hash of the file (see :func:`pathme.wikipathways.utils.get_wikipathways_file_hash`)
+    :param fmt: format of the file, 'rdf' or 'gpml'
+    """
+    return (
+        pathway_statistics is not None
+        and pathway_statistics.get('hash') == file_hash
+        and pathway_statistics.get('format') == fmt
+    )
+
+
+def _get_pending_files(
+    resource_files: Iterable[str],
+    export_folder: str,
+    pathways_statistics: Optional[Dict[str, Dict]] = None,
+    manifest: Optional[Dict[str, Dict[str, str]]] = None,
+    file_hashes: Optional[Dict[str, str]] = None,
+    fmt: str = 'rdf',
+) -> List[Tuple[str, str]]:
+    """Get the files that have not been exported yet with the path of their pickle.
+
+    :param resource_files: iterator with file names (names of the archive members if reading from the archive)
+    :param export_folder: export folder
+    :param pathways_statistics: if given, the exported files without statistics of their current content are
+     converted again
+    :param manifest: if given, the exported files whose hash is not the one recorded in the manifest (i.e., the files
+     that changed since they were converted) are converted again
+    :param file_hashes: hash of each file. Required with the manifest or the statistics
+    :param fmt: format of the files, 'rdf' or 'gpml'
+    """
+    pending_files = []
+
+    for resource_file in resource_files:
+        pickle_name = _get_file_pickle_name(resource_file)
+        pickle_path = os.path.join(export_folder, f'{pickle_name}.pickle')
+
+        # TODO: Remove pathway from blacklist
+        if f'{pickle_name}.ttl' in WIKIPATHWAYS_BLACKLIST:
+            continue
+
+        # Files without a pathway are not exported (see :func:`wikipathways_release_to_pickles`) until they change
+        manifest_entry = manifest.get(pickle_name, {}) if manifest is not None else {}
+        if manifest_entry.get('skipped') and manifest_entry.get('hash') == file_hashes[resource_file]:
+            continue
+
+        # Skip if BEL file already exists (and is up to date)
+        if (
+            os.path.exists(pickle_path)
+            and (
+                pathways_statistics is None
+                or _is_current_statistics(pathways_statistics.get(pickle_name), file_hashes[resource_file], fmt)
+            )
+            and (manifest is None or manifest.get(pickle_name, {}).get('hash') == file_hashes[resource_file])
+        ):
+            continue
+
+        pending_files.append((resource_file, pickle_path))
+
+    return pending_files
+
+
+def remove_deleted_pathways(
+    release_files: Iterable[str],
+    export_folder: str,
+    manifest_path: str,
+    statistics_path: Optional[str] = None,
+) -> List[str]:
+    """Remove the exported pathways recorded in the manifest whose files are not in the release anymore.
+
+    The files must be all the files of the release (e.g., also the pathways that are not canonical), so the pathways
+    that were only left out of a conversion are kept.
+
+    :param release_files: names of all the files of the release (names of the archive members if reading from the
+     archive)
+    :param export_folder: export folder
+    :param manifest_path: path of the manifest of the exported pathways, updated
+    :param statistics_path: path of the statistics of each pathway, updated if it exists
+    :return: names of the removed pathways
+    """
+    manifest = load_manifest(manifest_path)
+
+    deleted_pathways = sorted(set(manifest).difference(map(_get_file_pickle_name, release_files)))
+    if not deleted_pathways:
+        return deleted_pathways
+
+    for pickle_name in deleted_pathways:
+        logger.info('Removing %s, which is not in the release anymore', pickle_name)
+
+        pickle_path = os.path.join(export_folder, f'{pickle_name}.pickle')
+        if os.path.exists(pickle_path):
+            os.remove(pickle_path)
+
+        del manifest[pickle_name]
+
+    export_manifest(manifest, manifest_path)
+
+    if statistics_path is not None and os.path.exists(statistics_path):
+        pathways_statistics = load_statistics_cache(statistics_path)
+        for pickle_name in deleted_pathways:
+            pathways_statistics.pop(pickle_name, None)
+        export_statistics_cache(pathways_statistics, statistics_path)
+
+    return deleted_pathways
+
+
+def remove_outdated_statistics(manifest_path: str, statistics_path: str) -> List[str]:
+    """Remove the statistics of the pathways converted again from another file since they were computed.
+
+    Conversions without statistics leave the statistics of the pathways they convert again untouched, so they are
+    compared with the files recorded in the manifest afterwards.
+
+    :param manifest_path: path of the manifest of the exported pathways
+    :param statistics_path: path of the statistics of each pathway, updated if it exists
+    :return: names of the pathways whose statistics were removed
+    """
+    if not os.path.exists(statistics_path):
+        return []
+
+    manifest = load_manifest(manifest_path)
+    pathways_statistics = load_statistics_cache(statistics_path)
+
+    outdated_pathways = sorted(
+        pickle_name
+        for pickle_name, pathway_statistics in pathways_statistics.items()
+        if pickle_name in manifest and pathway_statistics.get('hash') != manifest[pickle_name]['hash']
+    )
+    if not outdated_pathways:
+        return outdated_pathways
+
+    for pickle_name in outdated_pathways:
+        del pathways_statistics[pickle_name]
+
+    export_statistics_cache(pathways_statistics, statistics_path)
+
+    return outdated_pathways
+
+
+def load_files_statistics(
+    resource_files: Iterable[str],
+    resource_folder: str,
+    statistics_path: str,
+    fmt: str = 'rdf',
+) -> Optional[Dict[str, Dict]]:
+    """Load the statistics of some files computed during their conversion.
+
+    The statistics of the pathways of other conversions (e.g., the pathways that are not canonical) are left out.
+
+    :param resource_files: file names (names of the archive members if reading from the archive)
+    :param resource_folder: folder with the files or release archive containing them
+    :param statistics_path: path of the statistics of each pathway (see :func:`pathme.utils.load_statistics_cache`)
+    :param fmt: format of the files, 'rdf' or 'gpml'
+    :return: dictionary from pathway identifier to the pathway name and its statistics. None if some of the files have
+     no statistics of their current content
+    """
+    pathways_statistics = load_statistics_cache(statistics_path)
+    archive = is_wikipathways_archive(resource_folder)
+
+    pickle_names = {}
+    for resource_file in resource_files:
+        pickle_name = _get_file_pickle_name(resource_file)
+        if f'{pickle_name}.ttl' not in WIKIPATHWAYS_BLACKLIST:
+            pickle_names[pickle_name] = resource_file
+
+    outdated_pathways = [
+        pickle_name
+        for pickle_name, resource_file in pickle_names.items()
+        if not _is_current_statistics(
+            pathways_statistics.get(pickle_name),
+            get_wikipathways_file_hash(resource_file, resource_folder, archive),
+            fmt,
+        )
+    ]
+    if outdated_pathways:
+        logger.info('%d files have no statistics of their content in %s', len(outdated_pathways), statistics_path)
+        return None
+
+    return {
+        pickle_name: pathways_statistics[pickle_name]
+        for pickle_name in pickle_names
+    }
+
+
+def _prepare_export(
+    resource_files: Iterable[str],
+    resource_folder: str,
+    archive: bool,
+    export_folder: str,
+    statistics_path: Optional[str],
+    manifest_path: Optional[str],
+    fmt: str = 'rdf',
+) -> Tuple[List[Tuple[str, str]], Optional[Dict[str, Dict]], Optional[Dict[str, Dict[str, str]]], Dict[str, str]]:
+    """Get the files to convert, loading the statistics and the manifest of the previous conversion if given.
+
+    :return: the files to convert with the paths of their pickles, the statistics of each pathway, the manifest and the
+     hash of each file
+    """
+    pathways_statistics = load_statistics_cache(statistics_path) if statistics_path else None
+    manifest = load_manifest(manifest_path) if manifest_path else None
+
+    if pathways_statistics is None and manifest is None:
+        return _get_pending_files(resource_files, export_folder), None, None, {}
+
+    resource_files = list(resource_files)
+
+    # Both the manifest and the statistics record the hash of the files they come from
+    file_hashes = {
+        resource_file: get_wikipathways_file_hash(resource_file, resource_folder, archive)
+        for resource_file in resource_files
+    }
+
+    pending_files = _get_pending_files(
+        resource_files, export_folder, pathways_statistics, manifest, file_hashes, fmt,
+    )
+    if manifest is not None:
+        logger.info('%d of %d files changed since the last conversion', len(pending_files), len(resource_files))
+
+    return pending_files, pathways_statistics, manifest, file_hashes
+
+
+def _finish_export(
+    pending_files: List[Tuple[str, str]],
+    pathways_statistics: Optional[Dict[str, Dict]],
+    statistics_path: Optional[str],
+    manifest: Optional[Dict[str, Dict[str, str]]],
+    file_hashes: Dict[str, str],
+    manifest_path: Optional[str],
+    fmt: str = 'rdf',
+    skipped_files: Optional[Set[str]] = None,
+) -> None:
+    """Export the statistics and the manifest updated with the converted files.
+
+    :param skipped_files: converted files without a pathway, which were not exported
+    """
+    if pathways_statistics is not None:
+        for resource_file, pickle_path in pending_files:
+            pathway_statistics = pathways_statistics.get(_get_pickle_name(pickle_path))
+            if pathway_statistics is not None:
+                pathway_statistics.update(hash=file_hashes[resource_file], format=fmt)
+
+        export_statistics_cache(pathways_statistics, statistics_path)
+
+    if manifest is not None:
+        for resource_file, pickle_path in pending_files:
+            manifest_entry = {'file': resource_file, 'hash': file_hashes[resource_file]}
+            if skipped_files and resource_file in skipped_files:
+                manifest_entry['skipped'] = True
+
+            manifest[_get_pickle_name(pickle_path)] = manifest_entry
+
+        export_manifest(manifest, manifest_path)
+
+
 def wikipathways_to_pickles(
     resource_files: Iterable[str],
     resource_folder: str,
     hgnc_manager: bio2bel_hgnc.Manager,
     export_folder: str,
+    processes: int = 1,
+    connection: Optional[str] = None,
+    fmt: str = 'rdf',
+    statistics_path: Optional[str] = None,
+    manifest_path: Optional[str] = None,
 ) -> None:
     """Export WikiPathways to Pickles.
 
-    :param resource_files: iterator with file names
-    :param resource_folder: path folder
-    :param hgnc_manager: HGNC manager
+    The resolution metrics of all the processes are merged in :func:`pathme.metrics.get_resolution_metrics`.
+
+    :param resource_files: iterator with file names (names of the archive members if reading from the archive)
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param hgnc_manager: HGNC manager, or resolver (see :mod:`pathme.resolver`). The workers only load the HGNC
+     mappings in memory if a resolver is given
+    :param export_folder: export folder
+    :param processes: number of worker processes. Each of them opens its own HGNC manager with the given connection
+    :param connection: database connection of the HGNC managers of the worker processes
+    :param fmt: format of the files, 'rdf' (Turtle) or 'gpml' (see :mod:`pathme.wikipathways.gpml`)
+    :param statistics_path: if given, the RDF and BEL statistics of each pathway are computed during the conversion
+     and exported to this JSON file (see :func:`pathme.utils.load_statistics_cache`)
+    :param manifest_path: if given, only the files that are new or changed since the conversion recorded in this
+     manifest are converted (see :func:`pathme.wikipathways.utils.load_manifest` and :func:`remove_deleted_pathways`)
+    """
+    return wikipathways_species_to_pickles(
+        {DEFAULT_SPECIES: resource_files},
+        resource_folder,
+        hgnc_manager,
+        export_folder,
+        processes=processes,
+        connection=connection,
+        fmt=fmt,
+        statistics_paths={DEFAULT_SPECIES: statistics_path} if statistics_path else None,
+        manifest_paths={DEFAULT_SPECIES: manifest_path} if manifest_path else None,
+    )
+
+
+def wikipathways_species_to_pickles(
+    species_files: Mapping[str, Iterable[str]],
+    resource_folder: str,
+    hgnc_manager: bio2bel_hgnc.Manager,
+    export_folder: str,
+    processes: int = 1,
+    connection: Optional[str] = None,
+    fmt: str = 'rdf',
+    statistics_paths: Optional[Mapping[str, str]] = None,
+    manifest_paths: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Export the WikiPathways pathways of many species to Pickles, converting the files of all species in one pool.
+
+    The pathways of each species are exported to their own folder (see :func:`pathme.utils.get_species_export_folder`).
+    Only human genes are looked up in HGNC.
+
+    The resolution metrics of all the processes are merged in :func:`pathme.metrics.get_resolution_metrics`.
+
+    :param species_files: dictionary from species name to the names of its files (names of the archive members if
+     reading from the archive)
+    :param resource_folder: folder with the files or release archive containing them
+    :param hgnc_manager: HGNC manager, or resolver (see :mod:`pathme.resolver`). The workers only load the HGNC
+     mappings in memory if a resolver is given
     :param export_folder: export folder
+    :param processes: number of worker processes. Each of them opens its own HGNC manager with the given connection
+    :param connection: database connection of the HGNC managers of the worker processes
+    :param fmt: format of the files, 'rdf' (Turtle) or 'gpml' (see :mod:`pathme.wikipathways.gpml`)
+    :param statistics_paths: if given, the RDF and BEL statistics of each pathway are computed during the conversion
+     and exported to the JSON file of its species (see :func:`pathme.utils.load_statistics_cache`)
+    :param manifest_paths: if given, only the files that are new or changed since the conversion recorded in the
+     manifest of their species are converted (see :func:`pathme.wikipathways.utils.load_manifest` and
+     :func:`remove_deleted_pathways`)
     """
-    for rdf_file in tqdm.tqdm(resource_files, desc=f'Exporting WikiPathways to BEL in {export_folder}'):
-        if rdf_file.endswith('.ttl'):
-            pickle_name = rdf_file[:-len('.ttl')]
+    archive = is_wikipathways_archive(resource_folder)
+
+    exports = {}
+    tasks = []
+
+    for species, resource_files in species_files.items():
+        species_export_folder = get_species_export_folder(export_folder, species)
+        os.makedirs(species_export_folder, exist_ok=True)
+
+        statistics_path = statistics_paths[species] if statistics_paths else None
+        manifest_path = manifest_paths[species] if manifest_paths else None
+
+        pending_files, pathways_statistics, manifest, file_hashes = _prepare_export(
+            resource_files, resource_folder, archive, species_export_folder, statistics_path, manifest_path, fmt,
+        )
+        exports[species] = (
+            pending_files, pathways_statistics, statistics_path, manifest, file_hashes, manifest_path, fmt,
+        )
+
+        tasks.extend(
+            (species, resource_file, resource_folder, archive, pickle_path, fmt, pathways_statistics is not None)
+            for resource_file, pickle_path in pending_files
+        )
+
+    desc = f'Exporting WikiPathways to BEL in {export_folder}'
+
+    if processes <= 1 or len(tasks) <= 1:
+        for species, resource_file, resource_folder, archive, pickle_path, fmt, statistics in tqdm.tqdm(
+            tasks, desc=desc,
+        ):
+            pathway_statistics = _export_wikipathways_file(
+                resource_file, resource_folder, archive, _get_species_hgnc_manager(hgnc_manager, species),
+                pickle_path, fmt, statistics,
+            )
+
+            _update_statistics(exports[species][1], pickle_path, pathway_statistics)
+
+    else:
+        # Submit the (small) files in chunks so the overhead of sending each task to the workers is amortized
+        chunksize = max(1, len(tasks) // (processes * 4))
+
+        # Workers load the HGNC mappings in memory only if the given manager does
+        initargs = (connection, isinstance(hgnc_manager, HgncResolver))
+
+        with Pool(processes=processes, initializer=_init_wikipathways_worker, initargs=initargs) as pool:
+            for pathway_metrics, species, pickle_path, pathway_statistics in tqdm.tqdm(
+                pool.imap_unordered(_wikipathways_file_to_pickle, tasks, chunksize=chunksize),
+                total=len(tasks),
+                desc=desc,
+            ):
+                get_resolution_metrics().merge(ResolutionMetrics.from_dict(pathway_metrics))
+                _update_statistics(exports[species][1], pickle_path, pathway_statistics)
+
+    for export in exports.values():
+        _finish_export(*export)
+
+
+"""Release engine"""
+
+
+def _load_release_graph(
+    rdf_files: Iterable[str],
+    resource_folder: str,
+    archive: bool,
+) -> Tuple[rdflib.ConjunctiveGraph, Dict[rdflib.term.Node, str]]:
+    """Load many WikiPathways RDF files in a single store, each of them as a named graph.
+
+    :param rdf_files: names of the files in the folder or archive
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param archive: whether the resource folder is the release archive
+    :return: the store and a dictionary from the pathways to the files they come from
+    """
+    release_graph = rdflib.ConjunctiveGraph()
+    pathway_files = {}
+
+    for rdf_file in rdf_files:
+        file_graph = release_graph.get_context(rdflib.URIRef(f'file:{rdf_file}'))
+
+        if archive:
+            file_graph.parse(data=get_wikipathways_archive(resource_folder).read(rdf_file), format='turtle')
         else:
-            pickle_name = rdf_file
+            file_graph.parse(os.path.join(resource_folder, rdf_file), format='turtle')
 
-        pickle_path = os.path.join(export_folder, f'{pickle_name}.pickle')
+        pathways = list(file_graph.subjects(RDF.type, WP.Pathway))
+        if not pathways:
+            logger.warning('No pathway found in %s', rdf_file)
 
-        # Skip if BEL file already exists
-        # TODO: Remove pathway from blacklist
-        if os.path.exists(pickle_path) or rdf_file in WIKIPATHWAYS_BLACKLIST:
+        for pathway in pathways:
+            pathway_files[pathway] = rdf_file
+
+    return release_graph, pathway_files
+
+
+def _export_wikipathways_batch(
+    batch: List[Tuple[str, str]],
+    resource_folder: str,
+    archive: bool,
+    hgnc_manager: Optional[bio2bel_hgnc.Manager],
+    statistics: bool = False,
+) -> List[Tuple[str, Optional[Dict]]]:
+    """Convert a batch of WikiPathways RDF files loaded in a single store to BEL and export them to pickles.
+
+    :param batch: file names and the paths of their pickles
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param archive: whether the resource folder is the release archive
+    :param hgnc_manager: HGNC manager. If None, genes are not looked up in HGNC
+    :param statistics: whether the statistics of each pathway are computed
+    :return: the pickle path and the statistics of each converted pathway
+    """
+    pickle_paths = dict(batch)
+    results = []
+
+    release_graph, pathway_files = _load_release_graph(pickle_paths, resource_folder, archive)
+
+    for pathway, metadata, nodes, complexes, interactions in iterate_pathways_components(
+        release_graph, pathway_files,
+    ):
+        rdf_file = pathway_files[pathway]
+
+        bel_graph = convert_to_bel(nodes, complexes, interactions, metadata, hgnc_manager)
+
+        debug_pathway_info(bel_graph, os.path.join(resource_folder, rdf_file))
+
+        to_pickle(bel_graph, pickle_paths[rdf_file])
+
+        results.append((
+            pickle_paths[rdf_file],
+            _get_wikipathways_pathway_statistics(nodes, complexes, interactions, bel_graph) if statistics else None,
+        ))
+
+    return results
+
+
+def _wikipathways_batch_to_pickles(
+    task: Tuple[List[Tuple[str, str]], str, str, bool, bool],
+) -> Tuple[Dict, List[Tuple[str, Optional[Dict]]]]:
+    """Convert a batch of WikiPathways RDF files in a worker process.
+
+    :param task: file names with the paths of their pickles, species, resource folder, whether it is the release
+     archive and whether statistics are computed
+    :return: resolution metrics of the conversion (see :mod:`pathme.metrics`) and the pickle path and statistics of
+     each converted pathway
+    """
+    batch, species, resource_folder, archive, statistics = task
+
+    results = _export_wikipathways_batch(
+        batch, resource_folder, archive, _get_species_hgnc_manager(_worker_hgnc_manager, species), statistics,
+    )
+
+    return collect_resolution_metrics().to_dict(), results
+
+
+def wikipathways_release_to_pickles(
+    resource_files: Iterable[str],
+    resource_folder: str,
+    hgnc_manager: bio2bel_hgnc.Manager,
+    export_folder: str,
+    batch_size: Optional[int] = None,
+    processes: int = 1,
+    connection: Optional[str] = None,
+    statistics_path: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+    species: str = DEFAULT_SPECIES,
+) -> None:
+    """Export WikiPathways to Pickles, loading the whole release (or large batches of it) in a single store.
+
+    The entries of all the pathways in the store are extracted at once and grouped by pathway (see
+    :func:`pathme.wikipathways.rdf_triples.iterate_pathways_components`), so the extraction is set up once per batch
+    instead of once per file, at the cost of keeping the whole batch in memory. It gives the same graphs as
+    :func:`wikipathways_to_pickles`, except for the files without a pathway, which are logged and skipped instead of
+    being exported as empty graphs. They are recorded as skipped in the manifest, so they are not converted again until
+    they change.
+
+    The resolution metrics of all the processes are merged in :func:`pathme.metrics.get_resolution_metrics`.
+
+    :param resource_files: iterator with file names (names of the archive members if reading from the archive)
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param hgnc_manager: HGNC manager, or resolver (see :mod:`pathme.resolver`). The workers only load the HGNC
+     mappings in memory if a resolver is given
+    :param export_folder: export folder
+    :param batch_size: number of files loaded in each store. Defaults to the whole release
+    :param processes: number of worker processes converting batches in parallel
+    :param connection: database connection of the HGNC managers of the worker processes
+    :param statistics_path: if given, the RDF and BEL statistics of each pathway are computed during the conversion
+     and exported to this JSON file (see :func:`pathme.utils.load_statistics_cache`)
+    :param manifest_path: if given, only the files that are new or changed since the conversion recorded in this
+     manifest are converted (see :func:`pathme.wikipathways.utils.load_manifest` and :func:`remove_deleted_pathways`)
+    :param species: species of the files. Only human genes are looked up in HGNC
+    """
+    archive = is_wikipathways_archive(resource_folder)
+    pending_files, pathways_statistics, manifest, file_hashes = _prepare_export(
+        resource_files, resource_folder, archive, export_folder, statistics_path, manifest_path,
+    )
+
+    if batch_size is None:
+        batch_size = max(1, len(pending_files))
+
+    tasks = [
+        (pending_files[start:start + batch_size], species, resource_folder, archive, pathways_statistics is not None)
+        for start in range(0, len(pending_files), batch_size)
+    ]
+
+    desc = f'Exporting WikiPathways to BEL in {export_folder}'
+    exported_pickles = set()
+
+    if processes <= 1 or len(tasks) <= 1:
+        for batch, species, resource_folder, archive, statistics in tqdm.tqdm(tasks, desc=desc, unit='batch'):
+            for pickle_path, pathway_statistics in _export_wikipathways_batch(
+                batch, resource_folder, archive, _get_species_hgnc_manager(hgnc_manager, species), statistics,
+            ):
+                exported_pickles.add(pickle_path)
+                _update_statistics(pathways_statistics, pickle_path, pathway_statistics)
+
+    else:
+        # Workers load the HGNC mappings in memory only if the given manager does
+        initargs = (connection, isinstance(hgnc_manager, HgncResolver))
+
+        with Pool(processes=processes, initializer=_init_wikipathways_worker, initargs=initargs) as pool:
+            for batch_metrics, results in tqdm.tqdm(
+                pool.imap_unordered(_wikipathways_batch_to_pickles, tasks),
+                total=len(tasks),
+                desc=desc,
+                unit='batch',
+            ):
+                get_resolution_metrics().merge(ResolutionMetrics.from_dict(batch_metrics))
+
+                for pickle_path, pathway_statistics in results:
+                    exported_pickles.add(pickle_path)
+                    _update_statistics(pathways_statistics, pickle_path, pathway_statistics)
+
+    skipped_files = set()
+    for resource_file, pickle_path in pending_files:
+        if pickle_path in exported_pickles:
             continue
 
-        # Parse pathway rdf_file and logger stats
-        pathway_path = os.path.join(resource_folder, rdf_file)
+        skipped_files.add(resource_file)
 
-        bel_graph = wikipathways_to_bel(pathway_path, hgnc_manager)
+        # The pathway of a previous version of the file is gone
+        if os.path.exists(pickle_path):
+            os.remove(pickle_path)
 
-        debug_pathway_info(bel_graph, pathway_path)
+        if pathways_statistics is not None:
+            pathways_statistics.pop(_get_pickle_name(pickle_path), None)
 
-        # Export BELGraph to pickle
-        to_pickle(bel_graph, pickle_path)
+    _finish_export(
+        pending_files, pathways_statistics, statistics_path, manifest, file_hashes, manifest_path,
+        skipped_files=skipped_files,
+    )
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""This module extracts the WikiPathways components by walking the triples of the RDF graph.
+
+It gives the same nodes, complexes, interactions and metadata as the SPARQL queries in
+:mod:`pathme.wikipathways.rdf_sparql` without going through the SPARQL engine. Instead of the cross product of all
+the optional patterns, one row per value is generated and the rows are merged with
+:func:`pathme.utils.query_result_to_dict`, exactly like the query results.
+"""
+
+import itertools as itt
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import rdflib
+from rdflib.namespace import DC, DCTERMS, Namespace, RDF, RDFS
+
+from ..utils import query_result_to_dict
+
+__all__ = [
+    'QueryRow',
+    'iterate_rows',
+    'get_pathway_metadata',
+    'get_nodes',
+    'get_complexes',
+    'get_interactions',
+    'get_pathway_components',
+    'iterate_pathways_components',
+]
+
+WP = Namespace('http://vocabularies.wikipathways.org/wp#')
+NCBIGENE = 'http://identifiers.org/ncbigene/'
+
+#: Labels of the data nodes cross-references with the predicates and URI prefixes they come from. HMDB
+#: cross-references are left out since the SPARQL query never binds them.
+DATA_NODE_XREFS = [
+    ('bdb_hgncsymbol', WP.bdbHgncSymbol, 'http://identifiers.org/hgnc.symbol/'),
+    ('bdb_ensembl', WP.bdbEnsembl, 'http://identifiers.org/ensembl/'),
+    ('bdb_ncbigene', WP.bdbEntrezGene, NCBIGENE),
+    ('bdb_uniprot', WP.bdbUniprot, 'http://identifiers.org/uniprot/'),
+    ('bdb_chebi', WP.bdbChEBI, 'http://identifiers.org/chebi/'),
+    ('bdb_chemspider', WP.bdbChemspider, 'http://identifiers.org/chemspider/'),
+    ('bdb_pubchem', WP.bdbPubChem, 'http://rdf.ncbi.nlm.nih.gov/pubchem/compound/'),
+    ('bdb_wikidata', WP.bdbWikidata, 'http://www.wikidata.org/entity/'),
+]
+
+
+class QueryRow(dict):
+    """A query result row, with the interface of :class:`rdflib.query.ResultRow` used by the result parsers."""
+
+    @property
+    def labels(self):
+        """Return the bound labels."""
+        return self
+
+    def __getattr__(self, label):
+        """Get the value bound to a label, or None if it is not bound."""
+        return self.get(label)
+
+
+def _strafter(value: rdflib.term.Node, prefix: str) -> rdflib.Literal:
+    """Reproduce the SPARQL STRAFTER(STR(value), prefix) function."""
+    value = str(value)
+    position = value.find(prefix)
+
+    if position == -1:
+        return rdflib.Literal('')
+
+    return rdflib.Literal(value[position + len(prefix):])
+
+
+def _get_objects(
+    rdf_graph: rdflib.Graph,
+    subject: rdflib.term.Node,
+    predicate: rdflib.URIRef,
+) -> List[rdflib.term.Node]:
+    """Get the objects of a subject and predicate, sorted.
+
+    The order of the triples in the store is not stable (e.g., it changes once the graph is read from the RDF cache),
+    but the last value bound wins when the rows are parsed, e.g. for nodes with several labels.
+    """
+    return sorted(rdf_graph.objects(subject, predicate), key=str)
+
+
+def _get_pathway_entries(rdf_graph: rdflib.Graph, rdf_type: rdflib.URIRef) -> List[rdflib.term.Node]:
+    """Get the entries of a given type that are part of a pathway."""
+    pathways = set(rdf_graph.subjects(RDF.type, WP.Pathway))
+
+    return [
+        entry
+        for entry in rdf_graph.subjects(RDF.type, rdf_type)
+        if any(pathway in pathways for pathway in rdf_graph.objects(entry, DCTERMS.isPartOf))
+    ]
+
+
+def _group_pathway_entries(
+    rdf_graph: rdflib.Graph,
+    rdf_type: rdflib.URIRef,
+    pathways: Set[rdflib.term.Node],
+) -> Dict[rdflib.term.Node, List[rdflib.term.Node]]:
+    """Group the entries of a given type by the pathways they are part of."""
+    entries = defaultdict(list)
+
+    for entry in rdf_graph.subjects(RDF.type, rdf_type):
+        for pathway in set(rdf_graph.objects(entry, DCTERMS.isPartOf)):
+            if pathway in pathways:
+                entries[pathway].append(entry)
+
+    return entries
+
+
+def _get_types(rdf_graph: rdflib.Graph, entry: rdflib.term.Node) -> List[rdflib.Literal]:
+    """Get the types of an entry relative to the WikiPathways vocabulary."""
+    return [
+        _strafter(uri_type, str(WP))
+        for uri_type in _get_objects(rdf_graph, entry, RDF.type)
+    ]
+
+
+def _get_references(rdf_graph: rdflib.Graph, entry: rdflib.term.Node) -> List[rdflib.term.Node]:
+    """Get how an entry is referenced in the source, target and participants of the SPARQL queries.
+
+    The last bound projection wins, so it is the Entrez Gene identifier if any, otherwise the identifier or the URI.
+    """
+    ncbigenes = [_strafter(uri, NCBIGENE) for uri in _get_objects(rdf_graph, entry, WP.bdbEntrezGene)]
+    if ncbigenes:
+        return ncbigenes
+
+    identifiers = _get_objects(rdf_graph, entry, DCTERMS.identifier)
+    if identifiers:
+        return identifiers
+
+    return [entry]
+
+
+def iterate_rows(values: Mapping[str, Sequence], fixed: Optional[Mapping] = None) -> Iterable[QueryRow]:
+    """Generate enough rows to cover every value of each label.
+
+    :param values: dictionary from labels to all their values (labels without values are not bound)
+    :param fixed: labels with the same value in all rows
+    """
+    values = {label: label_values for label, label_values in values.items() if label_values}
+    number_rows = max((len(label_values) for label_values in values.values()), default=1)
+
+    for i in range(number_rows):
+        row = QueryRow(fixed or {})
+        for label, label_values in values.items():
+            row[label] = label_values[i % len(label_values)]
+        yield row
+
+
+def _iterate_node_rows(rdf_graph: rdflib.Graph, entries: Iterable[rdflib.term.Node]) -> Iterable[QueryRow]:
+    """Generate the rows of the data nodes query."""
+    for uri_id in entries:
+        names = _get_objects(rdf_graph, uri_id, RDFS.label)
+        if not names:
+            continue
+
+        values = {
+            label: [_strafter(uri, prefix) for uri in _get_objects(rdf_graph, uri_id, predicate)]
+            for label, predicate, prefix in DATA_NODE_XREFS
+        }
+        values['name'] = names
+        values['node_types'] = _get_types(rdf_graph, uri_id)
+
+        # The identifier is given by the last bound projection: ChEBI, Entrez Gene, identifier and finally URI
+        if values['bdb_chebi']:
+            key_label = 'bdb_chebi'
+            identifiers = values['bdb_chebi']
+        elif values['bdb_ncbigene']:
+            key_label = 'bdb_ncbigene'
+            identifiers = values['bdb_ncbigene']
+        else:
+            key_label = None
+            identifiers = _get_objects(rdf_graph, uri_id, DCTERMS.identifier) or [uri_id]
+
+        for identifier in identifiers:
+            identifier_values = dict(values)
+            if key_label is not None:
+                identifier_values[key_label] = [identifier]
+
+            yield from iterate_rows(identifier_values, fixed={'uri_id': uri_id, 'identifier': identifier})
+
+
+def _iterate_complex_rows(rdf_graph: rdflib.Graph, entries: Iterable[rdflib.term.Node]) -> Iterable[QueryRow]:
+    """Generate the rows of the complexes query."""
+    for uri_id in entries:
+        participants = [
+            reference
+            for participant in _get_objects(rdf_graph, uri_id, WP.participants)
+            for reference in _get_references(rdf_graph, participant)
+        ]
+        if not participants:
+            continue
+
+        values = {
+            'node_types': _get_types(rdf_graph, uri_id),
+            'participants': participants,
+        }
+
+        yield from iterate_rows(values, fixed={'uri_id': uri_id})
+
+
+def _iterate_interaction_rows(rdf_graph: rdflib.Graph, entries: Iterable[rdflib.term.Node]) -> Iterable[QueryRow]:
+    """Generate the rows of the directed interactions query."""
+    for uri_id in entries:
+        sources = [
+            reference
+            for source in _get_objects(rdf_graph, uri_id, WP.source)
+            for reference in _get_references(rdf_graph, source)
+        ]
+        targets = [
+            reference
+            for target in _get_objects(rdf_graph, uri_id, WP.target)
+            for reference in _get_references(rdf_graph, target)
+        ]
+
+        # Every source/target pair is an interaction participant
+        pairs = list(itt.product(sources, targets))
+        if not pairs:
+            continue
+
+        values = {
+            'interaction_types': _get_types(rdf_graph, uri_id),
+            'pair': pairs,
+        }
+
+        fixed = {
+            'uri_id': uri_id,
+            'identifier': _strafter(uri_id, '/Interaction/'),
+        }
+
+        for row in iterate_rows(values, fixed=fixed):
+            row['source'], row['target'] = row.pop('pair')
+            yield row
+
+
+def _iterate_pathway_rows(rdf_graph: rdflib.Graph, pathways: Iterable[rdflib.term.Node]) -> Iterable[QueryRow]:
+    """Generate the rows of the pathway information query."""
+    for pathway_id in pathways:
+        for title, description, identifier in itt.product(
+            _get_objects(rdf_graph, pathway_id, DC.title),
+            _get_objects(rdf_graph, pathway_id, DCTERMS.description),
+            _get_objects(rdf_graph, pathway_id, DCTERMS.identifier),
+        ):
+            yield QueryRow(title=title, identifier=identifier, description=description, pathway_id=pathway_id)
+
+
+def get_pathway_metadata(rdf_graph: rdflib.Graph) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Get information from a pathway network.
+
+    :param rdf_graph: RDF graph object
+    :returns: Metadata of a pathway as a dictionary, if empty 'unknown' will be assigned by default
+    """
+    return query_result_to_dict(
+        list(_iterate_pathway_rows(rdf_graph, rdf_graph.subjects(RDF.type, WP.Pathway))),
+        attr_empty=['title', 'identifier', 'description', 'pathway_id'],
+        id_dict=False,
+    )
+
+
+def get_nodes(rdf_graph: rdflib.Graph) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Get all nodes from a RDF pathway network.
+
+    :param rdf_graph: RDF graph object
+    :returns: Nodes dict with nodes ids as keys and their metadata as values
+    """
+    return query_result_to_dict(
+        _iterate_node_rows(rdf_graph, _get_pathway_entries(rdf_graph, WP.DataNode)),
+        ids_argument=True,
+    )
+
+
+def get_complexes(rdf_graph: rdflib.Graph) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Get all complexes from a pathway RDF network.
+
+    :param rdf_graph: RDF graph object
+    :returns: Nodes dict with nodes ids as keys and their metadata as values
+    """
+    return query_result_to_dict(_iterate_complex_rows(rdf_graph, _get_pathway_entries(rdf_graph, WP.Complex)))
+
+
+def get_interactions(rdf_graph: rdflib.Graph) -> Dict[str, Dict]:
+    """Get all interactions from a RDF pathway network.
+
+    :param rdf_graph: RDF graph object
+    :returns: Interactions as a list of dictionaries, participants are in an entry and the interaction metadata in other
+    """
+    return query_result_to_dict(
+        _iterate_interaction_rows(rdf_graph, _get_pathway_entries(rdf_graph, WP.DirectedInteraction)),
+        directed_interaction=('source', 'target'),
+    )
+
+
+def get_pathway_components(rdf_graph: rdflib.Graph) -> Tuple[
+    Dict[str, Dict[str, Dict[str, str]]],
+    Dict[str, Dict[str, Dict[str, str]]],
+    Dict[str, Dict[str, Dict[str, str]]],
+]:
+    """Get all components in data structures from a RDF pathway network.
+
+    :param rdf_graph: RDF graph object
+    :returns: Returns at once the retrievals of each component type (nodes, complexes, interactions) functions.
+    """
+    return get_nodes(rdf_graph), get_complexes(rdf_graph), get_interactions(rdf_graph)
+
+
+def iterate_pathways_components(rdf_graph: rdflib.Graph, pathways: Optional[Iterable[rdflib.term.Node]] = None):
+    """Get the components of every pathway in a graph containing many pathways (e.g., a whole release).
+
+    Each type of entry is looked up once in the whole graph and grouped by the pathway it is part of, instead of
+    running the extraction once per pathway.
+
+    :param rdf_graph: RDF graph object
+    :param pathways: pathways to extract. Defaults to all the pathways in the graph
+    :return: iterator of the pathway URI, its metadata, nodes, complexes and interactions
+    """
+    if pathways is None:
+        pathways = rdf_graph.subjects(RDF.type, WP.Pathway)
+    pathways = set(pathways)
+
+    pathways_nodes = _group_pathway_entries(rdf_graph, WP.DataNode, pathways)
+    pathways_complexes = _group_pathway_entries(rdf_graph, WP.Complex, pathways)
+    pathways_interactions = _group_pathway_entries(rdf_graph, WP.DirectedInteraction, pathways)
+
+    for pathway in pathways:
+        metadata = query_result_to_dict(
+            list(_iterate_pathway_rows(rdf_graph, [pathway])),
+            attr_empty=['title', 'identifier', 'description', 'pathway_id'],
+            id_dict=False,
+        )
+        nodes = query_result_to_dict(
+            _iterate_node_rows(rdf_graph, pathways_nodes.get(pathway, [])),
+            ids_argument=True,
+        )
+        complexes = query_result_to_dict(
+            _iterate_complex_rows(rdf_graph, pathways_complexes.get(pathway, [])),
+        )
+        interactions = query_result_to_dict(
+            _iterate_interaction_rows(rdf_graph, pathways_interactions.get(pathway, [])),
+            directed_interaction=('source', 'target'),
+        )
+
+        yield pathway, metadata, nodes, complexes, interactions
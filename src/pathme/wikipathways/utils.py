@@ -2,6 +2,8 @@
 
 """This module has utilities method for parsing, handling WikiPathways RDF and data."""
 
+import hashlib
+import json
 import logging
 import os
 import re
@@ -9,18 +11,41 @@ import zipfile
 from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 import networkx as nx
+import rdflib
 
 from bio2bel_hgnc import Manager as HgncManager
 from bio2bel_wikipathways import Manager as WikiPathwaysManager
 from pybel import BELGraph
 from ..constants import (
-    BRENDA, CHEMBL, DATA_DIR, ENSEMBL, ENTREZ, EXPASY, HGNC, INTERPRO, KEGG, MIRBASE, PFAM, REACTOME, UNIPROT,
-    WIKIPATHWAYS, WIKIPEDIA,
+    BRENDA, CHEMBL, DATA_DIR, DEFAULT_SPECIES, ENSEMBL, ENTREZ, EXPASY, HGNC, INTERPRO, KEGG, MIRBASE, PFAM, REACTOME,
+    UNIPROT, WIKIPATHWAYS, WIKIPEDIA,
 )
 from ..export_utils import get_paths_in_folder
+from ..metrics import get_resolution_metrics
+from ..rdf_cache import get_file_sha1
 
 WIKIPATHWAYS_DIR = os.path.join(DATA_DIR, WIKIPATHWAYS)
 
+#: Folder of the human RDF files in the WikiPathways release archive
+WIKIPATHWAYS_ARCHIVE_FOLDER = 'wp/Human'
+
+#: Folder of the per-species folders in the WikiPathways release archive
+WIKIPATHWAYS_ARCHIVE_ROOT = 'wp'
+
+#: Species whose folder in the WikiPathways release is not named after the species (e.g., wp/Mus_musculus)
+WIKIPATHWAYS_SPECIES_FOLDERS = {
+    DEFAULT_SPECIES: 'Human',
+}
+
+#: Regular expression of the GPML file names (e.g., Hs_IL-9_Signaling_Pathway_WP22_97775.gpml)
+GPML_FILE_NAME_RE = re.compile(r'_(WP\d+)_(\d+)\.gpml$')
+
+#: Version of the format of the files with the canonical pathway identifiers
+CANONICAL_PATHWAYS_VERSION = 1
+
+#: Version of the format of the manifest of the exported pathways
+MANIFEST_VERSION = 1
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,17 +58,24 @@ def evaluate_wikipathways_metadata(metadata: Union[str, Set[str]]) -> str:
 
 
 def _get_update_alias_symbol(
-    hgnc_manager: HgncManager,
+    hgnc_manager: Optional[HgncManager],
     original_identifier: str,
     original_namespace: str,
+    pathway_id: Optional[str] = None,
 ) -> Tuple[str, str, str]:
     """Try to get current alias symbol.
 
-    :param hgnc_manager: hgnc manager
+    :param hgnc_manager: hgnc manager. If None, the identifier is kept as it is
     :param original_identifier:
     :param original_namespace:
+    :param pathway_id: pathway of the node, recorded if the identifier is not resolved (see :mod:`pathme.metrics`)
     """
-    query_result = hgnc_manager.get_hgnc_from_alias_symbol(original_identifier)
+    query_result = hgnc_manager.get_hgnc_from_alias_symbol(original_identifier) if hgnc_manager else None
+
+    if hgnc_manager:
+        get_resolution_metrics().record_resolution(
+            original_namespace, original_identifier, bool(query_result), pathway_id,
+        )
 
     if not query_result:
         logger.debug('No found HGNC Symbol for id %s in (%s)', original_identifier, original_namespace)
@@ -53,10 +85,11 @@ def _get_update_alias_symbol(
 
 
 def _validate_query(
-    hgnc_manager: HgncManager,
+    hgnc_manager: Optional[HgncManager],
     query_result,
     original_identifier: str,
     original_namespace: str,
+    pathway_id: Optional[str] = None,
 ) -> Tuple[str, str, str]:
     """Process and validate HGNC query.
 
@@ -64,10 +97,16 @@ def _validate_query(
     :param query_result:
     :param original_identifier:
     :param original_namespace:
+    :param pathway_id: pathway of the node, recorded if the identifier is not resolved (see :mod:`pathme.metrics`)
     """
     # If invalid entry from HGNC, try to find updated symbol
     if not query_result and original_namespace == HGNC:
-        return _get_update_alias_symbol(hgnc_manager, original_identifier, HGNC)
+        return _get_update_alias_symbol(hgnc_manager, original_identifier, HGNC, pathway_id)
+
+    if hgnc_manager:
+        get_resolution_metrics().record_resolution(
+            original_namespace, original_identifier, bool(query_result), pathway_id,
+        )
 
     # Invalid entry, proceed with invalid identifier
     if not query_result:
@@ -84,27 +123,73 @@ def _validate_query(
     return HGNC, query_result.symbol, query_result.identifier
 
 
-def get_valid_gene_identifier(node_ids_dict, hgnc_manager: HgncManager, pathway_id) -> Tuple[str, str, str]:
+def get_gene_lookups(node_ids_dict) -> List[Tuple[str, str]]:
+    """Get the HGNC lookups that :func:`get_valid_gene_identifier` makes for a RDF node.
+
+    They are collected for all the nodes of a pathway, so they are resolved in a few queries
+    (see :func:`pathme.resolver.prefetch_hgnc_lookups`).
+
+    :param dict node_ids_dict: node dictionary
+    :return: pairs of lookup and identifier
+    """
+    if 'bdb_hgncsymbol' in node_ids_dict or 'hgnc' in node_ids_dict['uri_id']:
+        if 'hgnc' in node_ids_dict['uri_id']:
+            return [('hgnc_id', node_ids_dict['identifier']), ('alias_symbol', node_ids_dict['name'])]
+
+        hgnc_symbol = _get_single_value(node_ids_dict['bdb_hgncsymbol'])
+        return [('symbol', hgnc_symbol), ('alias_symbol', hgnc_symbol)]
+
+    elif 'bdb_ncbigene' in node_ids_dict:
+        return [('entrez', _get_single_value(node_ids_dict['bdb_ncbigene']))]
+
+    elif 'ncbiprotein' in node_ids_dict['uri_id']:
+        return [('entrez', _get_single_value(node_ids_dict['identifier']))]
+
+    elif 'bdb_uniprot' in node_ids_dict:
+        return [('uniprot', _get_single_value(node_ids_dict['bdb_uniprot']))]
+
+    # ENSEMBL identifiers are looked up as UniProt identifiers by get_valid_gene_identifier
+    elif 'bdb_ensembl' in node_ids_dict:
+        return [('uniprot', _get_single_value(node_ids_dict['bdb_ensembl']))]
+
+    elif 'ena.embl' in node_ids_dict['uri_id']:
+        return [('uniprot', _get_single_value(node_ids_dict['identifier']))]
+
+    elif 'ec-code' in node_ids_dict['uri_id']:
+        return []
+
+    elif 'bdb_wikidata' in node_ids_dict:
+        return [('symbol', _get_single_value(node_ids_dict['name']))]
+
+    return []
+
+
+def get_valid_gene_identifier(
+    node_ids_dict,
+    hgnc_manager: Optional[HgncManager],
+    pathway_id,
+) -> Tuple[str, str, str]:
     """Return protein/gene identifier for a given RDF node.
 
     :param dict node_ids_dict: node dictionary
-    :param hgnc_manager: hgnc manager
+    :param hgnc_manager: hgnc manager. If None (e.g., for non-human pathways), genes are not looked up in HGNC and
+     keep the namespace of their identifier
     :return: namespace, name, identifier
     """
     # Try to get hgnc symbol
     if 'bdb_hgncsymbol' in node_ids_dict or 'hgnc' in node_ids_dict['uri_id']:
 
         if 'hgnc' in node_ids_dict['uri_id']:
-            hgnc_entry = hgnc_manager.get_gene_by_hgnc_id(node_ids_dict['identifier'])
+            hgnc_entry = hgnc_manager.get_gene_by_hgnc_id(node_ids_dict['identifier']) if hgnc_manager else None
             if not hgnc_entry:
                 hgnc_symbol = node_ids_dict['name']
             else:
                 hgnc_symbol = hgnc_entry.symbol
         else:
             hgnc_symbol = check_multiple(node_ids_dict['bdb_hgncsymbol'], 'bdb_hgncsymbol', pathway_id)
-            hgnc_entry = hgnc_manager.get_gene_by_hgnc_symbol(hgnc_symbol)
+            hgnc_entry = hgnc_manager.get_gene_by_hgnc_symbol(hgnc_symbol) if hgnc_manager else None
 
-        return _validate_query(hgnc_manager, hgnc_entry, hgnc_symbol, HGNC)
+        return _validate_query(hgnc_manager, hgnc_entry, hgnc_symbol, HGNC, pathway_id)
 
     # Try to get ENTREZ id
     elif 'bdb_ncbigene' in node_ids_dict or 'ncbiprotein' in node_ids_dict['uri_id']:
@@ -115,16 +200,16 @@ def get_valid_gene_identifier(node_ids_dict, hgnc_manager: HgncManager, pathway_
         else:
             raise ValueError(f'Missing entrez gene identifier [pathway={pathway_id}]')
 
-        hgnc_entry = hgnc_manager.get_gene_by_entrez_id(entrez_id)
+        hgnc_entry = hgnc_manager.get_gene_by_entrez_id(entrez_id) if hgnc_manager else None
 
-        return _validate_query(hgnc_manager, hgnc_entry, entrez_id, ENTREZ)
+        return _validate_query(hgnc_manager, hgnc_entry, entrez_id, ENTREZ, pathway_id)
 
     # Try to get UniProt id
     elif 'bdb_uniprot' in node_ids_dict:
         uniprot_id = check_multiple(node_ids_dict['bdb_uniprot'], 'bdb_uniprot', pathway_id)
-        hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(uniprot_id)
+        hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(uniprot_id) if hgnc_manager else None
 
-        return _validate_query(hgnc_manager, hgnc_entry, uniprot_id, UNIPROT)
+        return _validate_query(hgnc_manager, hgnc_entry, uniprot_id, UNIPROT, pathway_id)
 
     # Try to get ENSEMBL id
     elif 'bdb_ensembl' in node_ids_dict or 'ena.embl' in node_ids_dict['uri_id']:
@@ -137,9 +222,9 @@ def get_valid_gene_identifier(node_ids_dict, hgnc_manager: HgncManager, pathway_
         else:
             raise ValueError(f'Missing ensemble identifier [pathway={pathway_id}]')
 
-        hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(ensembl_id)
+        hgnc_entry = hgnc_manager.get_gene_by_uniprot_id(ensembl_id) if hgnc_manager else None
 
-        return _validate_query(hgnc_manager, hgnc_entry, ensembl_id, ENSEMBL)
+        return _validate_query(hgnc_manager, hgnc_entry, ensembl_id, ENSEMBL, pathway_id)
 
     elif 'ec-code' in node_ids_dict['uri_id']:
         ec_number = check_multiple(node_ids_dict['name'], 'ec-code', pathway_id)
@@ -150,7 +235,10 @@ def get_valid_gene_identifier(node_ids_dict, hgnc_manager: HgncManager, pathway_
         name = check_multiple(node_ids_dict['name'], 'wikidata', pathway_id)
 
         # Find out whether the name is a valid HGNC symbol
-        hgnc_entry = hgnc_manager.get_gene_by_hgnc_symbol(name)
+        hgnc_entry = hgnc_manager.get_gene_by_hgnc_symbol(name) if hgnc_manager else None
+
+        if hgnc_manager:
+            get_resolution_metrics().record_resolution(WIKIPATHWAYS, name, bool(hgnc_entry), pathway_id)
 
         # Correct entry, use HGNC identifier
         if hgnc_entry:
@@ -224,9 +312,17 @@ def check_multiple(element, element_name, pathway_id):
     :return:
     """
     if isinstance(element, (set, list)):
-        _pid = pathway_id.split('/')[-1]
-        logger.debug(f'Multiple values for "{element_name}": {element} [{_pid}]')
+        logger.debug('Multiple values for "%s": %s [%s]', element_name, element, pathway_id.split('/')[-1])
         # TODO: print the WikiPathways bps that return a set because they are probably wrong.
+        if not element:
+            logger.debug('Empty list/set %s', element)
+
+    return _get_single_value(element)
+
+
+def _get_single_value(element):
+    """Pick the value of an element as :func:`check_multiple` does, without logging."""
+    if isinstance(element, (set, list)):
         if len(element) == 1:
             return list(element)[0]
 
@@ -237,8 +333,6 @@ def check_multiple(element, element_name, pathway_id):
 
             return list(element)[0]
 
-        logger.debug('Empty list/set %s', element)
-
     return element
 
 
@@ -268,11 +362,11 @@ def convert_to_nx(
     """
     graph = nx.MultiDiGraph(graph_att=pathway_info)
 
-    for node, attributes in nodes.items():
-        graph.add_node(node, attr_dict=attributes)
-
-    for subj, obj, interaction in interactions:
-        graph.add_edge(subj, obj, attr=interaction)
+    graph.add_nodes_from(nodes.items())
+    graph.add_edges_from(
+        (subj, obj, {'attr': interaction})
+        for subj, obj, interaction in interactions
+    )
 
     return graph
 
@@ -340,6 +434,155 @@ def filter_wikipathways_files(file_names: Iterable[str]) -> List[str]:
     ]
 
 
+def get_canonical_pathways_path(resource_folder: str) -> str:
+    """Get the path of the file with the canonical pathway identifiers of a WikiPathways release.
+
+    The file is stored next to the release archive (or folder with the RDF files) it belongs to.
+
+    :param resource_folder: folder with the RDF files or release archive containing them
+    """
+    return f'{os.path.splitext(os.path.normpath(resource_folder))[0]}.canonical.json'
+
+
+def get_wikipathways_release(resource_folder: str) -> str:
+    """Get the name of a WikiPathways release, which changes with the files of the release.
+
+    Release archives are named after their date. The folders the releases are extracted to are not (e.g., wp/Human),
+    so their name is followed by a hash of the names, sizes and modification times of their files.
+
+    :param resource_folder: folder with the RDF (or GPML) files or release archive containing them
+    """
+    release = os.path.basename(os.path.normpath(resource_folder))
+
+    if is_wikipathways_archive(resource_folder):
+        return release
+
+    listing = hashlib.sha256()
+    for file_name in sorted(get_paths_in_folder(resource_folder)):
+        stat = os.stat(os.path.join(resource_folder, file_name))
+        listing.update(f'{file_name}\t{stat.st_size}\t{stat.st_mtime_ns}\n'.encode())
+
+    return f'{release}@{listing.hexdigest()[:16]}'
+
+
+def export_canonical_pathways(identifiers: Iterable[str], path: str, release: str) -> None:
+    """Export the canonical pathway identifiers of a WikiPathways release to a JSON file.
+
+    :param identifiers: canonical pathway identifiers
+    :param path: path of the JSON file
+    :param release: name of the release the identifiers belong to (see :func:`get_wikipathways_release`)
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(
+            {
+                'version': CANONICAL_PATHWAYS_VERSION,
+                'release': release,
+                'identifiers': sorted(identifiers),
+            },
+            file,
+            indent=2,
+        )
+
+    os.replace(tmp_path, path)
+
+
+def load_canonical_pathways(path: str, release: str) -> Optional[Set[str]]:
+    """Load the canonical pathway identifiers written by :func:`export_canonical_pathways`.
+
+    :param path: path of the JSON file
+    :param release: name of the release the identifiers should belong to (see :func:`get_wikipathways_release`)
+    :return: canonical pathway identifiers. None if the file does not exist or belongs to another release or version
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as file:
+        canonical_pathways = json.load(file)
+
+    if canonical_pathways.get('version') != CANONICAL_PATHWAYS_VERSION or canonical_pathways.get('release') != release:
+        logger.info('%s is outdated', path)
+        return None
+
+    return set(canonical_pathways['identifiers'])
+
+
+def _get_database_canonical_pathways(connection: Optional[str] = None) -> Set[str]:
+    """Get the identifiers of the pathways present in the WikiPathways Bio2BEL database.
+
+    :param connection: database connection
+    """
+    wikipathways_manager = WikiPathwaysManager(connection)
+    if not wikipathways_manager.is_populated():
+        wikipathways_manager.populate()
+
+    return {
+        resource_id
+        for resource_id, in wikipathways_manager.session.query(wikipathways_manager.pathway_model.wikipathways_id)
+    }
+
+
+#: Canonical pathway identifiers of each file and release loaded in this process. Forked worker processes inherit them
+_canonical_pathways: Dict[Tuple[str, str], Set[str]] = {}
+
+
+def get_canonical_pathways(resource_folder: str, connection: Optional[str] = None) -> Set[str]:
+    """Get the canonical pathway identifiers of a WikiPathways release.
+
+    They are loaded from the file next to the release (see :func:`get_canonical_pathways_path`). The WikiPathways
+    Bio2BEL database is only queried (and populated if needed) the first time, to write that file. They are kept in
+    memory, so worker processes forked afterwards do not load them again.
+
+    :param resource_folder: folder with the RDF files or release archive containing them
+    :param connection: database connection
+    """
+    path = get_canonical_pathways_path(resource_folder)
+    release = get_wikipathways_release(resource_folder)
+
+    canonical_pathways = _canonical_pathways.get((path, release))
+    if canonical_pathways is not None:
+        return canonical_pathways
+
+    canonical_pathways = load_canonical_pathways(path, release)
+    if canonical_pathways is None:
+        logger.info('Getting the canonical pathways from the WikiPathways database')
+        canonical_pathways = _get_database_canonical_pathways(connection)
+
+        # Do not store the identifiers of a database that could not be populated
+        if canonical_pathways:
+            export_canonical_pathways(canonical_pathways, path, release)
+
+    _canonical_pathways[path, release] = canonical_pathways
+    return canonical_pathways
+
+
+def get_wikipathways_file_identifier(file_name: str) -> str:
+    """Get the pathway identifier of a WikiPathways RDF or GPML file.
+
+    :param file_name: file name or path (e.g., WP22.ttl, wp/Human/WP22.ttl or Hs_IL-9_Signaling_Pathway_WP22_97775.gpml)
+    """
+    file_name = os.path.basename(file_name)
+
+    match = GPML_FILE_NAME_RE.search(file_name)
+    if match is not None:
+        return match.group(1)
+
+    return file_name.split('.')[0]
+
+
+def filter_canonical_files(file_names: Iterable[str], canonical_pathways: Set[str]) -> List[str]:
+    """Keep the files of the canonical pathways.
+
+    :param file_names: file names or paths (e.g., WP22.ttl or wp/Human/WP22.ttl)
+    :param canonical_pathways: canonical pathway identifiers
+    """
+    return [
+        file_name
+        for file_name in file_names
+        if get_wikipathways_file_identifier(file_name) in canonical_pathways
+    ]
+
+
 def iterate_wikipathways_paths(
     directory: str,
     connection: Optional[str] = None,
@@ -364,19 +607,214 @@ def iterate_wikipathways_paths(
 
     # Skip files not present in wikipathways bio2bel db -> stuffs from reactome and so on...
     if only_canonical:
-        wikipathways_manager = WikiPathwaysManager(connection)
-        if not wikipathways_manager.is_populated():
-            wikipathways_manager.populate()
+        paths = filter_canonical_files(paths, get_canonical_pathways(directory, connection))
+
+    return paths
 
-        wikipathways_identifiers = {
-            pathway.resource_id
-            for pathway in wikipathways_manager.get_all_pathways()
+
+def get_wikipathways_species_folder(species: str) -> str:
+    """Get the name of the folder of a species in the WikiPathways release (e.g., Human or Mus_musculus)."""
+    return WIKIPATHWAYS_SPECIES_FOLDERS.get(species, species)
+
+
+def get_wikipathways_species(resource_folder: str) -> List[str]:
+    """Get the species in a WikiPathways release.
+
+    :param resource_folder: release archive or folder with the per-species folders of the RDF files
+    :return: species names (e.g., Homo_sapiens, Mus_musculus)
+    """
+    if is_wikipathways_archive(resource_folder):
+        folders = {
+            os.path.basename(os.path.dirname(member))
+            for member in get_wikipathways_archive(resource_folder).namelist()
+            if os.path.dirname(os.path.dirname(member)) == WIKIPATHWAYS_ARCHIVE_ROOT
+        }
+    else:
+        folders = {
+            folder
+            for folder in os.listdir(resource_folder)
+            if os.path.isdir(os.path.join(resource_folder, folder))
         }
 
-        paths = [
-            path
-            for path in paths
-            if path.split('.')[0] in wikipathways_identifiers
-        ]
+    species_names = {folder: species for species, folder in WIKIPATHWAYS_SPECIES_FOLDERS.items()}
 
-    return paths
+    return sorted(species_names.get(folder, folder) for folder in folders)
+
+
+def get_wikipathways_species_files(
+    resource_folder: str,
+    species: Optional[Iterable[str]] = None,
+    connection: Optional[str] = None,
+    only_canonical: bool = True,
+) -> Dict[str, List[str]]:
+    """Get the WikiPathways RDF files of each species in a release.
+
+    Only human pathways are filtered by the canonical pathways, since the bio2bel WikiPathways database only has them.
+
+    :param resource_folder: release archive or folder with the per-species folders of the RDF files
+    :param species: species names to look for. If None, all species in the release are returned
+    :param connection: database connection
+    :param only_canonical: only identifiers present in WP bio2bel db
+    :return: dictionary from species name to the names of its files in the archive (e.g., wp/Human/WP22.ttl) or paths
+     relative to the folder (e.g., Human/WP22.ttl)
+    """
+    available_species = get_wikipathways_species(resource_folder)
+
+    if species is None:
+        species = available_species
+
+    missing_species = sorted(set(species).difference(available_species))
+    if missing_species:
+        raise FileNotFoundError(
+            f'WikiPathways files not found in {resource_folder} for: {", ".join(missing_species)}. '
+            f'Please ensure you have downloaded WikiPathways using the "pathme wikipathways download" command or '
+            f'you have passed the right argument.',
+        )
+
+    archive = is_wikipathways_archive(resource_folder)
+    species_files = {}
+
+    for species_name in species:
+        folder = get_wikipathways_species_folder(species_name)
+        species_only_canonical = only_canonical and species_name == DEFAULT_SPECIES
+
+        if archive:
+            species_files[species_name] = iterate_wikipathways_archive(
+                resource_folder, f'{WIKIPATHWAYS_ARCHIVE_ROOT}/{folder}', connection, species_only_canonical,
+            )
+        else:
+            species_files[species_name] = [
+                os.path.join(folder, path)
+                for path in iterate_wikipathways_paths(
+                    os.path.join(resource_folder, folder), connection, species_only_canonical,
+                )
+            ]
+
+    return species_files
+
+
+def is_wikipathways_archive(path: str) -> bool:
+    """Check if a path is a WikiPathways release archive instead of a folder with RDF files."""
+    return os.path.isfile(path) and zipfile.is_zipfile(path)
+
+
+def iterate_wikipathways_archive(
+    archive_path: str,
+    folder: str = WIKIPATHWAYS_ARCHIVE_FOLDER,
+    connection: Optional[str] = None,
+    only_canonical: bool = True,
+) -> List[str]:
+    """Get the WikiPathways RDF files in a folder of the release archive, without extracting them.
+
+    :param archive_path: path to the release zip archive
+    :param folder: folder of the species in the archive (e.g., wp/Human)
+    :param connection: database connection
+    :param only_canonical: only identifiers present in WP bio2bel db
+    :return: names of the archive members
+    """
+    folder = folder.strip('/')
+
+    members = [
+        member
+        for member in get_wikipathways_archive(archive_path).namelist()
+        if os.path.dirname(member) == folder
+        and filter_wikipathways_files([os.path.basename(member)])
+    ]
+
+    if only_canonical:
+        members = filter_canonical_files(members, get_canonical_pathways(archive_path, connection))
+
+    return members
+
+
+#: Archives opened in this process. They are keyed by process so forked workers do not share file offsets
+_archives: Dict[Tuple[int, str], zipfile.ZipFile] = {}
+
+
+def get_wikipathways_archive(archive_path: str) -> zipfile.ZipFile:
+    """Open a WikiPathways release archive once per process.
+
+    :param archive_path: path to the release zip archive
+    """
+    key = os.getpid(), archive_path
+
+    archive = _archives.get(key)
+    if archive is None:
+        archive = _archives[key] = zipfile.ZipFile(archive_path)
+
+    return archive
+
+
+def parse_wikipathways_archive_member(archive_path: str, member: str) -> rdflib.Graph:
+    """Parse a WikiPathways RDF file straight from the release archive.
+
+    :param archive_path: path to the release zip archive
+    :param member: name of the file in the archive (e.g., wp/Human/WP22.ttl)
+    """
+    rdf_graph = rdflib.Graph()
+    rdf_graph.parse(data=get_wikipathways_archive(archive_path).read(member), format='turtle')
+    return rdf_graph
+
+
+def get_manifest_path(export_folder: str, species: str = DEFAULT_SPECIES) -> str:
+    """Get the path of the manifest of the pathways of a species exported to a folder.
+
+    The manifest is stored next to the export folder (e.g., ``bel.manifest.json`` or
+    ``bel.Mus_musculus.manifest.json``), so it is not read as a BEL graph.
+
+    :param export_folder: export folder
+    :param species: species name
+    """
+    if species == DEFAULT_SPECIES:
+        return f'{os.path.normpath(export_folder)}.manifest.json'
+
+    return f'{os.path.normpath(export_folder)}.{species}.manifest.json'
+
+
+def get_wikipathways_file_hash(file_name: str, resource_folder: str, archive: bool) -> str:
+    """Get a hash of the content of a WikiPathways RDF or GPML file.
+
+    The CRC-32 recorded in the release archive is used for its members, so they do not need to be read.
+
+    :param file_name: name of the file in the folder or archive
+    :param resource_folder: folder with the files or release archive containing them
+    :param archive: whether the resource folder is the release archive
+    """
+    if archive:
+        return f'crc32:{get_wikipathways_archive(resource_folder).getinfo(file_name).CRC:08x}'
+
+    return f'sha1:{get_file_sha1(os.path.join(resource_folder, file_name))}'
+
+
+def export_manifest(manifest: Dict[str, Dict[str, str]], path: str) -> None:
+    """Export the manifest of the exported pathways to a JSON file.
+
+    :param manifest: dictionary from the name of the pickle of each pathway to the file it was converted from, the
+     hash of that file and whether it was skipped because it has no pathway
+    :param path: path of the JSON file
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump({'version': MANIFEST_VERSION, 'pathways': manifest}, file, indent=2, sort_keys=True)
+
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, str]]:
+    """Load the manifest written by :func:`export_manifest`.
+
+    :param path: path of the JSON file
+    :return: dictionary from the name of the pickle of each pathway to the file it was converted from and the hash of
+     that file. Empty if the file does not exist or has another version
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as file:
+        manifest = json.load(file)
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        logger.info('%s is outdated', path)
+        return {}
+
+    return manifest['pathways']
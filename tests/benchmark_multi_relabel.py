@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark expanding the nodes of Reactome pathways whose names have multiple genes (e.g., 'HTR1A,B,D,E,F,HTR5A').
+
+Run with ``python -m tests.benchmark_multi_relabel``.
+"""
+
+import random
+import timeit
+from typing import List
+
+import click
+
+from pathme.constants import REACTOME
+from pathme.normalize_names import NameNormalizer
+from pathme.pybel_utils import multi_relabel
+from pybel import BELGraph
+from pybel.dsl import Abundance, Protein
+
+NUMBER = 5
+
+#: Names with multiple genes found in Reactome
+MULTIPLE_GENES_NAMES = [
+    'HTR1A,B,D,E,F,HTR5A', 'GABRA1,2,3,5,6', 'KCNJ3,5,6,9', 'ADCY1,2,3,4,5,6,7,8,9', 'PRKACA,B,G', 'GNB1,2,3,4,5',
+    'GNG2,3,4,5,7,8,10,11,12,13', 'PIK3CA,B,D', 'CACNA1A,B,E', 'RPS6KA1,2,3', 'CHRNA1,2,3,4,5,6,7,9,10',
+    'PPP2R5A,B,C,D,E',
+]
+
+
+def _get_pathway(seed: int) -> BELGraph:
+    """Get a pathway in which the nodes with multiple genes are hubs, as the gene families in Reactome."""
+    rnd = random.Random(seed)  # noqa: S311
+
+    hubs = [Protein('UNIPROT', name, identifier=str(i)) for i, name in enumerate(MULTIPLE_GENES_NAMES)]
+    nodes = [Protein('UNIPROT', f'GENE{i}', identifier=str(i)) for i in range(300)]
+    nodes += [Abundance('CHEBI', f'chemical {i}', identifier=str(i)) for i in range(50)]
+    nodes += hubs * 20
+
+    graph = BELGraph()
+    for i in range(2000):
+        graph.add_increases(
+            rnd.choice(nodes), rnd.choice(nodes),
+            citation=str(i % 50), evidence='Reactome', annotations={'Species': {'9606': True}},
+        )
+
+    return graph
+
+
+def _multi_relabel_per_edge(graph: BELGraph, mapping_dict) -> None:
+    """Expand the victims adding each of their edges once per survivor."""
+    for victim, survivors in mapping_dict.items():
+        for survivor in survivors:
+            for u, _, k, d in list(graph.in_edges(victim, keys=True, data=True)):
+                graph.add_edge(u, survivor, key=k, **d)
+
+            for _, v, k, d in list(graph.out_edges(victim, keys=True, data=True)):
+                graph.add_edge(survivor, v, key=k, **d)
+
+    graph.remove_nodes_from(mapping_dict.keys())
+
+
+def _get_multi_mappings(graphs: List[BELGraph]):
+    """Get the survivors of the nodes with multiple genes of each pathway."""
+    normalizer = NameNormalizer()
+
+    multi_mappings = []
+    for graph in graphs:
+        multi_mapping = {}
+        for node in graph:
+            _, survivors = normalizer.normalize_node(node, REACTOME)
+            if survivors:
+                multi_mapping[node] = survivors
+        multi_mappings.append(multi_mapping)
+
+    return multi_mappings
+
+
+def main():
+    """Print the time needed to expand the nodes of the pathways with each method."""
+    graphs = [_get_pathway(seed) for seed in range(10)]
+    multi_mappings = _get_multi_mappings(graphs)
+
+    n_edges = sum(graph.number_of_edges() for graph in graphs)
+    click.echo(f'{len(graphs)} pathways with {n_edges} edges')
+
+    def copy_graphs():
+        return [graph.copy() for graph in graphs]
+
+    copy_time = timeit.timeit(copy_graphs, number=NUMBER) / NUMBER
+
+    times = {}
+    for name, relabel in (('per edge', _multi_relabel_per_edge), ('bulk', multi_relabel)):
+        def run(relabel=relabel):
+            for graph, mapping in zip(copy_graphs(), multi_mappings):
+                relabel(graph, mapping)
+
+        times[name] = timeit.timeit(run, number=NUMBER) / NUMBER - copy_time
+        click.echo(f'{name}: {times[name] * 1000:.0f} ms')
+
+    click.echo(f'bulk is {times["per edge"] / times["bulk"]:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark reading the WikiPathways test pathway from its GPML and its RDF files.
+
+Run with ``python -m tests.benchmark_wikipathways_gpml``.
+"""
+
+import timeit
+
+import click
+import rdflib
+
+from pathme.wikipathways import rdf_sparql, rdf_triples
+from pathme.wikipathways.gpml import get_gpml_pathway_components
+from tests.constants import WP22, WP22_GPML
+
+NUMBER = 20
+
+
+def _parse_rdf():
+    """Parse the RDF file."""
+    rdf_graph = rdflib.Graph()
+    rdf_graph.parse(WP22, format='turtle')
+    return rdf_graph
+
+
+def read_rdf_sparql():
+    """Read the pathway from the RDF file with SPARQL."""
+    rdf_graph = _parse_rdf()
+    return rdf_sparql._get_pathway_components(rdf_graph), rdf_sparql._get_pathway_metadata(rdf_graph)
+
+
+def read_rdf_triples():
+    """Read the pathway from the RDF file walking its triples."""
+    rdf_graph = _parse_rdf()
+    return rdf_triples.get_pathway_components(rdf_graph), rdf_triples.get_pathway_metadata(rdf_graph)
+
+
+def read_gpml():
+    """Read the pathway from the GPML file."""
+    return get_gpml_pathway_components(WP22_GPML)
+
+
+def main():
+    """Print the time needed to read the pathway from each file."""
+    gpml_time = timeit.timeit(read_gpml, number=NUMBER) / NUMBER
+    click.echo(f'GPML: {gpml_time * 1000:.1f} ms')
+
+    for name, read_rdf in (('RDF (SPARQL)', read_rdf_sparql), ('RDF (triples)', read_rdf_triples)):
+        rdf_time = timeit.timeit(read_rdf, number=NUMBER) / NUMBER
+        click.echo(f'{name}: {rdf_time * 1000:.1f} ms ({rdf_time / gpml_time:.0f}x slower than GPML)')
+
+
+if __name__ == '__main__':
+    main()
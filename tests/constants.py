@@ -20,6 +20,7 @@ TEST_FOLDER = os.path.dirname(os.path.realpath(__file__))
 KEGG_TEST_RESOURCES = os.path.join(TEST_FOLDER, 'resources', 'kegg')
 WP_TEST_RESOURCES = os.path.join(TEST_FOLDER, 'resources', 'wp')
 REACTOME_TEST_RESOURCES = os.path.join(TEST_FOLDER, 'resources', 'reactome')
+GPML_TEST_RESOURCES = os.path.join(TEST_FOLDER, 'resources', 'gpml')
 
 GLYCOLYSIS_XML = os.path.join(KEGG_TEST_RESOURCES, 'hsa00010.xml')
 NOTCH_XML = os.path.join(KEGG_TEST_RESOURCES, 'hsa04330.xml')
@@ -31,6 +32,11 @@ WP1871 = os.path.join(WP_TEST_RESOURCES, 'WP1871.ttl')
 WP2799 = os.path.join(WP_TEST_RESOURCES, 'WP2799.ttl')
 WP2359 = os.path.join(WP_TEST_RESOURCES, 'WP2359_mod.ttl')
 
+WP22_GPML = os.path.join(GPML_TEST_RESOURCES, 'Hs_IL-9_Signaling_Pathway_WP22_97775.gpml')
+WP9999_GPML = os.path.join(GPML_TEST_RESOURCES, 'Hs_Test_Complexes_And_Catalysis_WP9999_1.gpml')
+
+REACTOME_TEST = os.path.join(REACTOME_TEST_RESOURCES, 'reactome_test.ttl')
+
 dir_path = os.path.dirname(os.path.realpath(__file__))
 resources_path = os.path.join(dir_path, 'resources')
 
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for partitioning Reactome into per-pathway shards."""
+
+import os
+import tempfile
+import unittest
+
+import rdflib
+
+from pathme.reactome.partition import load_reactome_shard, load_reactome_shard_index, partition_reactome_graph
+from pathme.reactome.rdf_sparql import _get_pathway_components, _get_pathway_metadata
+from tests.constants import REACTOME_TEST
+
+
+def _canonical(value):
+    """Sort the lists in the extracted components since the order of the complex components is arbitrary."""
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+
+    if isinstance(value, tuple):
+        return tuple(_canonical(item) for item in value)
+
+    if isinstance(value, list):
+        return sorted((_canonical(item) for item in value), key=repr)
+
+    return value
+
+
+class TestPartition(unittest.TestCase):
+    """Tests that the shards give the same results as the whole release."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Parse the test BioPAX file and partition it."""
+        cls.rdf_graph = rdflib.Graph()
+        cls.rdf_graph.parse(REACTOME_TEST, format='ttl')
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.index = partition_reactome_graph(cls.rdf_graph, cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shards."""
+        cls.directory.cleanup()
+
+    def test_index(self):
+        """Test that every pathway gets a shard."""
+        self.assertEqual(self.index, load_reactome_shard_index(self.directory.name))
+        self.assertEqual({'48887#Pathway1', '48887#Pathway2', '48887#Pathway3'}, set(self.index))
+
+    def test_shard_is_smaller(self):
+        """Test that shards do not contain the statements of other pathways."""
+        shard = load_reactome_shard(os.path.join(self.directory.name, self.index['48887#Pathway3']['shard']))
+
+        self.assertLess(len(shard), len(self.rdf_graph))
+        self.assertNotIn(
+            rdflib.URIRef('http://www.reactome.org/biopax/67/48887#Complex2'),
+            set(shard.subjects()),
+        )
+
+    def test_same_components(self):
+        """Test that the pathway metadata and components extracted from each shard match the whole release."""
+        for file_name, entry in self.index.items():
+            pathway_uri = rdflib.URIRef(entry['uri'])
+            shard = load_reactome_shard(os.path.join(self.directory.name, entry['shard']))
+
+            with self.subTest(pathway=file_name):
+                self.assertEqual(
+                    _get_pathway_metadata(pathway_uri, self.rdf_graph),
+                    _get_pathway_metadata(pathway_uri, shard),
+                )
+                self.assertEqual(
+                    _canonical(_get_pathway_components(pathway_uri, self.rdf_graph)),
+                    _canonical(_get_pathway_components(pathway_uri, shard)),
+                )
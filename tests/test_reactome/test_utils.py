@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the Reactome utilities."""
+
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from pathme.reactome.utils import untar_file
+
+SPECIES_CONTENT = {
+    'Homo_sapiens': b'<rdf:RDF>human</rdf:RDF>',
+    'Mus_musculus': b'<rdf:RDF>mouse</rdf:RDF>',
+    'Rattus_norvegicus': b'<rdf:RDF>rat</rdf:RDF>',
+}
+
+
+class TestUntar(unittest.TestCase):
+    """Tests for the selective extraction of the Reactome BioPAX archive."""
+
+    def setUp(self):
+        """Write a small archive with one file per species."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self.directory.name, 'reactome-biopax.tar.bz2')
+        self.export_folder = os.path.join(self.directory.name, 'rdf')
+
+        with tarfile.open(self.archive, 'w:bz2') as tar:
+            for species, content in SPECIES_CONTENT.items():
+                info = tarfile.TarInfo(f'{species}.owl')
+                info.size = len(content)
+                info.mtime = 1500000000
+                tar.addfile(info, io.BytesIO(content))
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        self.directory.cleanup()
+
+    def test_extract_species(self):
+        """Test that only the requested species are extracted."""
+        paths = untar_file(self.archive, self.export_folder, species=['Mus_musculus'], parallel=False)
+
+        self.assertEqual([os.path.join(self.export_folder, 'Mus_musculus.owl')], paths)
+        self.assertFalse(os.path.exists(os.path.join(self.export_folder, 'Homo_sapiens.owl')))
+
+        with open(paths[0], 'rb') as file:
+            self.assertEqual(SPECIES_CONTENT['Mus_musculus'], file.read())
+
+    def test_extract_all(self):
+        """Test extracting all species."""
+        paths = untar_file(self.archive, self.export_folder, parallel=False)
+        self.assertEqual(len(SPECIES_CONTENT), len(paths))
+
+    def test_skip_extracted(self):
+        """Test that up-to-date files are not extracted again, while modified ones are."""
+        path, = untar_file(self.archive, self.export_folder, species=['Homo_sapiens'], parallel=False)
+
+        with mock.patch('pathme.reactome.utils.tarfile.open', side_effect=AssertionError):
+            self.assertEqual([path], untar_file(self.archive, self.export_folder, species=['Homo_sapiens']))
+
+        with open(path, 'ab') as file:
+            file.write(b'truncated download')
+
+        untar_file(self.archive, self.export_folder, species=['Homo_sapiens'], parallel=False)
+
+        with open(path, 'rb') as file:
+            self.assertEqual(SPECIES_CONTENT['Homo_sapiens'], file.read())
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the metrics of the resolution of identifiers."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pathme.metrics import (
+    InstrumentedManager, ResolutionMetrics, collect_resolution_metrics, export_resolution_metrics,
+    get_resolution_metrics,
+)
+
+
+def _get_metrics(pathway_id: str) -> ResolutionMetrics:
+    """Get the metrics of a worker that converted a pathway."""
+    metrics = ResolutionMetrics()
+    metrics.record_lookup('get_gene_by_uniprot_id', 0.5)
+    metrics.record_cache('hgnc_uniprot', True)
+    metrics.record_cache('hgnc_uniprot', False)
+    metrics.record_resolution('uniprot', 'P00533', True, pathway_id)
+    metrics.record_resolution('uniprot', 'P00000', False, pathway_id)
+    return metrics
+
+
+class TestResolutionMetrics(unittest.TestCase):
+    """Tests for the resolution metrics."""
+
+    def test_merge(self):
+        """Test that the metrics of several workers are merged through their dictionaries."""
+        metrics = ResolutionMetrics()
+        for pathway_id in ('WP22', 'WP706'):
+            metrics.merge(ResolutionMetrics.from_dict(json.loads(json.dumps(_get_metrics(pathway_id).to_dict()))))
+
+        self.assertEqual(
+            {
+                'version': 1,
+                'lookups': {'get_gene_by_uniprot_id': {'count': 2, 'seconds': 1.0}},
+                'caches': {'hgnc_uniprot': {'hits': 2, 'misses': 2}},
+                'resolutions': {'uniprot': {'resolved': 2, 'unresolved': 2}},
+                'unresolved': {'uniprot': {'P00000': ['WP22', 'WP706']}},
+            },
+            metrics.to_dict(),
+        )
+        self.assertEqual(1, metrics.unresolved_count)
+        self.assertEqual(metrics.to_dict(), ResolutionMetrics.from_dict(metrics.to_dict()).to_dict())
+
+    def test_collect(self):
+        """Test that collecting the metrics of the process starts new ones."""
+        collect_resolution_metrics()
+        get_resolution_metrics().record_resolution('ChEBI', '0', False)
+
+        metrics = collect_resolution_metrics()
+        self.assertEqual({'ChEBI': {'0': []}}, metrics.to_dict()['unresolved'])
+        self.assertEqual({}, get_resolution_metrics().to_dict()['unresolved'])
+
+    def test_export(self):
+        """Test that the metrics are exported next to the export folder."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        collect_resolution_metrics()
+        get_resolution_metrics().merge(_get_metrics('WP22'))
+
+        path = export_resolution_metrics(os.path.join(folder, 'bel', ''))
+        self.assertEqual(os.path.join(folder, 'bel.metrics.json'), path)
+
+        with open(path) as file:
+            self.assertEqual(get_resolution_metrics().to_dict(), json.load(file))
+
+        collect_resolution_metrics()
+
+    def test_instrumented_manager(self):
+        """Test that the lookups of a manager are counted."""
+        manager = mock.Mock(connection='sqlite://')
+        manager.get_gene_by_hgnc_symbol.return_value = None
+
+        instrumented_manager = InstrumentedManager.wrap(manager)
+        self.assertIs(instrumented_manager, InstrumentedManager.wrap(instrumented_manager))
+        self.assertIsNone(InstrumentedManager.wrap(None))
+
+        collect_resolution_metrics()
+        self.assertIsNone(instrumented_manager.get_gene_by_hgnc_symbol('NOTASYMBOL'))
+        self.assertEqual('sqlite://', instrumented_manager.connection)
+
+        manager.get_gene_by_hgnc_symbol.assert_called_once_with('NOTASYMBOL')
+        self.assertEqual({'get_gene_by_hgnc_symbol': 1}, dict(collect_resolution_metrics().lookups))
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for normalizing the names of the nodes."""
+
+import unittest
+
+import networkx as nx
+
+from pathme.constants import KEGG, REACTOME
+from pathme.normalize_names import NameNormalizer, normalize_graph_names
+from pathme.pybel_utils import multi_relabel, relabel_nodes_in_place
+from pybel import BELGraph
+from pybel.dsl import Abundance, Protein
+
+TP53 = Protein('HGNC', 'TP53', identifier='11998')
+MDM2 = Protein('HGNC', 'MDM2', identifier='6973')
+EGFR = Protein('HGNC', 'egfr', identifier='3236')
+GLUCOSE = Abundance('CHEBI', 'Glucose', identifier='17234')
+
+
+def _get_graph() -> BELGraph:
+    """Get a small graph with a cycle and nodes that are already normalized."""
+    graph = BELGraph()
+    graph.add_increases(TP53, MDM2, citation='1', evidence='e')
+    graph.add_decreases(MDM2, TP53, citation='2', evidence='e')
+    graph.add_increases(EGFR, TP53, citation='3', evidence='e')
+    graph.add_increases(GLUCOSE, EGFR, citation='4', evidence='e')
+    return graph
+
+
+def _get_edges(graph: BELGraph):
+    """Get the edges of a graph, with their data, as strings."""
+    return sorted(
+        (u.as_bel(), v.as_bel(), str(sorted(d.items(), key=str)))
+        for u, v, d in graph.edges(data=True)
+    )
+
+
+class TestNormalizeNames(unittest.TestCase):
+    """Tests for normalizing the names of the nodes."""
+
+    def test_relabel_nodes_in_place(self):
+        """Test that relabeling in place gives the same graph as relabeling a copy and expanding it."""
+        mdm2_lower = Protein('HGNC', 'mdm2', identifier='6973')
+        mapping = {TP53: MDM2, MDM2: mdm2_lower, EGFR: EGFR}
+        multi_mapping = {mdm2_lower: {Protein('HGNC', 'a'), Protein('HGNC', 'b')}}
+
+        expected = nx.relabel_nodes(_get_graph(), mapping)
+        multi_relabel(expected, multi_mapping)
+
+        graph = _get_graph()
+        relabel_nodes_in_place(graph, mapping, multi_mapping)
+
+        self.assertEqual(sorted(map(str, expected)), sorted(map(str, graph)))
+        self.assertEqual(_get_edges(expected), _get_edges(graph))
+
+    def test_normalize_graph_names(self):
+        """Test that the names are normalized in the same graph."""
+        graph = _get_graph()
+        normalize_graph_names(graph, KEGG)
+
+        self.assertEqual(
+            {'p(HGNC:tp53)', 'p(HGNC:mdm2)', 'p(HGNC:egfr)', 'a(CHEBI:glucose)'},
+            {node.as_bel() for node in graph},
+        )
+        self.assertEqual(4, graph.number_of_edges())
+        self.assertTrue(graph.has_edge(Protein('HGNC', 'mdm2'), Protein('HGNC', 'tp53')))
+
+    def test_name_normalizer(self):
+        """Test that the nodes shared by several graphs are only normalized once."""
+        normalizer = NameNormalizer()
+
+        graphs = [_get_graph(), _get_graph()]
+        for graph in graphs:
+            normalize_graph_names(graph, KEGG, normalizer)
+
+        self.assertEqual(4, len(normalizer))
+        self.assertEqual(4, normalizer.misses)
+        self.assertEqual(4, normalizer.hits)
+
+        # Nodes are normalized differently in other databases
+        normalizer.normalize_node(TP53, REACTOME)
+        self.assertEqual(5, len(normalizer))
+
+        expected = _get_graph()
+        normalize_graph_names(expected, KEGG)
+        for graph in graphs:
+            self.assertEqual(_get_edges(expected), _get_edges(graph))
+
+    def test_multi_relabel(self):
+        """Test that the edges of a node with multiple genes are given to all its survivors."""
+        graph = _get_graph()
+        htr = Protein('UNIPROT', 'HTR1A,B,HTR5A')
+        graph.add_increases(htr, htr, citation='5', evidence='e')
+        graph.add_decreases(htr, TP53, citation='6', evidence='e')
+
+        normalize_graph_names(graph, REACTOME)
+
+        survivors = {Protein('UNIPROT', name) for name in ('htr1a', 'htr1b', 'htr5a')}
+        self.assertTrue(survivors.issubset(graph))
+        self.assertNotIn(htr, graph)
+
+        # The loop links all the survivors and each edge has its own data
+        self.assertEqual(4 + 3 * 3 + 3, graph.number_of_edges())
+        data_ids = [id(data) for _, _, data in graph.edges(data=True)]
+        self.assertEqual(len(data_ids), len(set(data_ids)))
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the cache of parsed RDF files."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import rdflib
+
+from pathme.rdf_cache import RdfCache, decode_graph, encode_graph
+from tests.constants import WP22, WP706
+
+
+class TestRdfCache(unittest.TestCase):
+    """Tests for the RDF cache."""
+
+    def setUp(self):
+        """Create a temporary folder with the cache and a copy of a RDF file."""
+        self.folder = tempfile.mkdtemp()
+        self.cache = RdfCache(os.path.join(self.folder, 'rdf_cache.db'))
+        self.path = os.path.join(self.folder, 'pathway.ttl')
+        shutil.copy(WP22, self.path)
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.folder)
+
+    def test_encoding(self):
+        """Test that the encoded graphs have the same triples and namespaces as the original ones."""
+        graph = rdflib.Graph()
+        graph.parse(WP706, format='turtle')
+        graph.add((rdflib.BNode(), rdflib.RDFS.label, rdflib.Literal('label', lang='en')))
+        graph.add((rdflib.BNode(), rdflib.RDFS.comment, rdflib.Literal(1)))
+
+        decoded_graph = decode_graph(*encode_graph(graph))
+
+        self.assertEqual(set(graph), set(decoded_graph))
+        self.assertEqual(dict(graph.namespaces()), dict(decoded_graph.namespaces()))
+
+    def test_cached(self):
+        """Test that the file is only parsed the first time, even if it is touched without changing its content."""
+        graph = self.cache.parse(self.path, 'turtle')
+
+        with mock.patch.object(rdflib.Graph, 'parse') as parse:
+            self.assertEqual(set(graph), set(self.cache.parse(self.path, 'turtle')))
+
+            os.utime(self.path, (time.time() + 10, time.time() + 10))
+            self.assertEqual(set(graph), set(self.cache.parse(self.path, 'turtle')))
+
+        parse.assert_not_called()
+
+    def test_changed_file(self):
+        """Test that the file is parsed again if its content changed."""
+        self.cache.parse(self.path, 'turtle')
+
+        shutil.copy(WP706, self.path)
+        os.utime(self.path, (time.time() + 10, time.time() + 10))
+
+        graph = rdflib.Graph()
+        graph.parse(WP706, format='turtle')
+
+        self.assertEqual(set(graph), set(self.cache.parse(self.path, 'turtle')))
+
+    def test_evict(self):
+        """Test removing the entries of files that do not exist anymore."""
+        self.cache.parse(self.path, 'turtle')
+        self.assertEqual(0, self.cache.evict())
+
+        os.remove(self.path)
+        self.assertEqual(1, self.cache.evict())
+        self.assertEqual(0, self.cache.evict())
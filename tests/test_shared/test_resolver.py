@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the in-memory resolution of gene identifiers and chemicals."""
+
+import os
+import tempfile
+from unittest import mock
+
+from bio2bel.testing import TemporaryConnectionMixin
+from bio2bel_chebi import Manager as ChebiManager
+from bio2bel_chebi.models import Chemical
+from bio2bel_hgnc import Manager as HgncManager
+from pathme.resolver import HgncResolver, get_chebi_resolver, get_hgnc_resolver
+from tests.constants import chebi_test_path, hgnc_test_path
+
+
+class TestHgncResolver(TemporaryConnectionMixin):
+    """Tests for the HGNC resolver."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the HGNC database."""
+        super().setUpClass()
+        cls.hgnc_manager = HgncManager(connection=cls.connection)
+
+        # PyHGNC caches the inserted models in class attributes, which are shared with the databases of other tests
+        for attribute in ('enzymes', 'gene_families', 'refseqs', 'mgds', 'uniprots', 'pubmeds', 'enas', 'rgds'):
+            setattr(cls.hgnc_manager, attribute, {})
+
+        cls.hgnc_manager.populate(hgnc_file_path=hgnc_test_path, use_hcop=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close the HGNC database."""
+        cls.hgnc_manager.session.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Create a temporary snapshot path."""
+        fd, self.path = tempfile.mkstemp(suffix='.tables')
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        """Remove the snapshot."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def assert_gene(self, expected_gene, gene):
+        """Assert that a gene of the resolver is the gene of the manager."""
+        if expected_gene is None:
+            self.assertIsNone(gene)
+            return
+
+        self.assertEqual(
+            (expected_gene.id, expected_gene.identifier, expected_gene.symbol),
+            (gene.id, gene.identifier, gene.symbol),
+        )
+
+    def assert_same_lookups(self, resolver: HgncResolver):
+        """Assert that the resolver gives the same genes as the manager."""
+        for hgnc_gene in self.hgnc_manager.list_human_genes():
+            self.assert_gene(hgnc_gene, resolver.get_gene_by_hgnc_id(str(hgnc_gene.identifier)))
+            self.assert_gene(hgnc_gene, resolver.get_gene_by_hgnc_symbol(hgnc_gene.symbol))
+            self.assert_gene(hgnc_gene, resolver.get_gene_by_hgnc_symbol(hgnc_gene.symbol.lower()))
+
+            if hgnc_gene.entrez:
+                self.assert_gene(
+                    self.hgnc_manager.get_gene_by_entrez_id(hgnc_gene.entrez),
+                    resolver.get_gene_by_entrez_id(hgnc_gene.entrez),
+                )
+
+            if hgnc_gene.ensembl_gene:
+                self.assert_gene(
+                    self.hgnc_manager.get_gene_by_ensembl_id(hgnc_gene.ensembl_gene),
+                    resolver.get_gene_by_ensembl_id(hgnc_gene.ensembl_gene),
+                )
+
+            for uniprot in hgnc_gene.uniprots:
+                expected_genes = self.hgnc_manager.get_gene_by_uniprot_id(uniprot.uniprotid)
+                genes = resolver.get_gene_by_uniprot_id(uniprot.uniprotid)
+
+                self.assertEqual(len(expected_genes), len(genes))
+                for expected_gene, gene in zip(expected_genes, genes):
+                    self.assert_gene(expected_gene, gene)
+
+            for alias_symbol in hgnc_gene.alias_symbols:
+                self.assert_gene(
+                    self.hgnc_manager.get_hgnc_from_alias_symbol(alias_symbol.alias_symbol),
+                    resolver.get_hgnc_from_alias_symbol(alias_symbol.alias_symbol),
+                )
+
+        for identifier in ('NOTASYMBOL', 'P00000', 'ENSG00000000000'):
+            self.assertIsNone(resolver.get_gene_by_hgnc_symbol(identifier))
+            self.assertEqual([], resolver.get_gene_by_uniprot_id(identifier))
+            self.assertIsNone(resolver.get_gene_by_ensembl_id(identifier))
+            self.assertIsNone(resolver.get_hgnc_from_alias_symbol(identifier))
+
+        self.assertIsNone(resolver.get_gene_by_hgnc_id('999999999'))
+        self.assertIsNone(resolver.get_gene_by_entrez_id('999999999'))
+
+    def test_lookups(self):
+        """Test that the resolver gives the same genes as the manager."""
+        self.assert_same_lookups(HgncResolver.from_manager(self.hgnc_manager))
+
+    def test_lookups_in_batch(self):
+        """Test that the resolver of some identifiers gives the same genes as the manager, without querying it."""
+        lookups = []
+        for hgnc_gene in self.hgnc_manager.list_human_genes():
+            lookups.extend([
+                ('hgnc_id', str(hgnc_gene.identifier)),
+                ('symbol', hgnc_gene.symbol),
+                ('entrez', hgnc_gene.entrez),
+                ('ensembl', hgnc_gene.ensembl_gene),
+            ])
+            lookups.extend(('uniprot', uniprot.uniprotid) for uniprot in hgnc_gene.uniprots)
+            lookups.extend(('alias_symbol', alias_symbol.alias_symbol) for alias_symbol in hgnc_gene.alias_symbols)
+
+        resolver = HgncResolver.from_lookups(self.hgnc_manager, lookups)
+        resolver.fallback = mock.Mock(wraps=self.hgnc_manager)
+
+        self.assert_same_lookups(resolver)
+
+        # Only the identifiers that were not given are looked up in the database
+        self.assertEqual(
+            {'NOTASYMBOL', 'P00000', 'ENSG00000000000', '999999999'},
+            {args[0] for _, args, _ in resolver.fallback.method_calls},
+        )
+
+    def test_snapshot(self):
+        """Test that the resolver is reloaded from its snapshot."""
+        resolver = get_hgnc_resolver(self.hgnc_manager, self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+        with mock.patch.object(HgncResolver, 'from_manager') as from_manager:
+            snapshot_resolver = get_hgnc_resolver(self.hgnc_manager, self.path)
+
+        from_manager.assert_not_called()
+
+        self.assertEqual(list(resolver.genes), list(snapshot_resolver.genes))
+        self.assert_same_lookups(snapshot_resolver)
+
+    def test_outdated_snapshot(self):
+        """Test that the snapshot of another database is not loaded."""
+        HgncResolver.from_rows([]).to_snapshot(self.path, {'database': 'sqlite://', 'counts': [0, 0, 0]})
+
+        resolver = get_hgnc_resolver(self.hgnc_manager, self.path)
+        self.assertEqual(self.hgnc_manager.count_human_genes(), len(resolver.genes))
+
+
+class TestChebiResolver(TemporaryConnectionMixin):
+    """Tests for the ChEBI resolver."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Populate the ChEBI database."""
+        super().setUpClass()
+        cls.chebi_manager = ChebiManager(connection=cls.connection)
+        cls.chebi_manager._populate_compounds(url=chebi_test_path)
+
+        # Secondary identifier, resolved to its parent
+        parent = cls.chebi_manager.session.query(Chemical).first()
+        cls.chebi_manager.session.add(Chemical(chebi_id='999999999', parent=parent))
+        cls.chebi_manager.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close the ChEBI database."""
+        cls.chebi_manager.session.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Create a temporary snapshot path."""
+        fd, self.path = tempfile.mkstemp(suffix='.tables')
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        """Remove the snapshot."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_lookups(self):
+        """Test that the resolver gives the same chemicals as the manager."""
+        resolver = get_chebi_resolver(self.chebi_manager, self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+        chemicals = self.chebi_manager.session.query(Chemical).all()
+        self.assertEqual(len(chemicals), len(resolver.chemicals))
+
+        for chemical in chemicals:
+            expected_chemical = self.chebi_manager.get_chemical_by_chebi_id(chemical.chebi_id)
+            resolved_chemical = resolver.get_chemical_by_chebi_id(chemical.chebi_id)
+            self.assertEqual(
+                (expected_chemical.chebi_id, expected_chemical.name, expected_chemical.safe_name),
+                tuple(resolved_chemical),
+            )
+
+            if chemical.name is not None:
+                self.assertEqual(
+                    self.chebi_manager.get_chemical_by_chebi_name(chemical.name).chebi_id,
+                    resolver.get_chemical_by_chebi_name(chemical.name).chebi_id,
+                )
+
+        self.assertEqual(
+            self.chebi_manager.get_chemical_by_chebi_id('999999999').chebi_id,
+            resolver.get_chemical_by_chebi_id('999999999').chebi_id,
+        )
+        self.assertIsNone(resolver.get_chemical_by_chebi_id('0'))
+        self.assertIsNone(resolver.get_chemical_by_chebi_name('not a chemical'))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the memory mapped tables of identifier mappings."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pathme.tables import MappedTables, write_tables
+
+
+class TestTables(unittest.TestCase):
+    """Tests for the memory mapped tables."""
+
+    def setUp(self):
+        """Create a temporary folder."""
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'mappings.tables')
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.folder)
+
+    def test_tables(self):
+        """Test that the tables are read as they were written."""
+        index = {
+            'hk1': [0],
+            'ins': [1, 2],
+            'β-catenin': [2],
+            '': [],
+        }
+
+        write_tables(
+            self.path,
+            columns={
+                'identifier': [4922, 6081, 2514],
+                'symbol': ['HK1', 'INS', 'CTNNB1'],
+                'entrez': ['3098', None, '1499'],
+            },
+            indexes={'symbol': index},
+            metadata={'version': 1, 'counts': [3]},
+        )
+
+        tables = MappedTables(self.path)
+
+        self.assertEqual({'version': 1, 'counts': [3]}, tables.metadata)
+        self.assertEqual([4922, 6081, 2514], list(tables.get_column('identifier')))
+        self.assertEqual(['HK1', 'INS', 'CTNNB1'], list(tables.get_column('symbol')))
+        self.assertEqual(['3098', None, '1499'], list(tables.get_column('entrez')))
+
+        symbol_index = tables.get_index('symbol')
+        self.assertEqual(len(index), len(symbol_index))
+        self.assertEqual(
+            {key: tuple(values) for key, values in index.items()},
+            dict(symbol_index.items()),
+        )
+
+        for key in ('a', 'hk', 'hk10', 'zzz', 'HK1', 1):
+            self.assertNotIn(key, symbol_index)
+            self.assertIsNone(symbol_index.get(key))
+
+    def test_not_a_table(self):
+        """Test that other files are not mapped."""
+        with open(self.path, 'wb') as file:
+            file.write(b'{"version": 1}')
+
+        with self.assertRaises(ValueError):
+            MappedTables(self.path)
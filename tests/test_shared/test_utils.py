@@ -3,10 +3,20 @@
 """Tests for converting WikiPathways."""
 
 import os
+import shutil
+import tempfile
 import unittest
+import zipfile
 
 from pathme.export_utils import get_paths_in_folder
-from pathme.wikipathways.utils import get_file_name_from_url, merge_two_dicts
+from pathme.utils import (
+    export_statistics_cache, get_species_export_folder, get_statistics_cache_key, load_statistics_cache,
+    parse_species_option, summarize_statistics_cache,
+)
+from pathme.wikipathways.utils import (
+    export_canonical_pathways, get_canonical_pathways_path, get_file_name_from_url, get_wikipathways_release,
+    iterate_wikipathways_archive, load_canonical_pathways, merge_two_dicts, parse_wikipathways_archive_member,
+)
 from tests.constants import WP22, WP_TEST_RESOURCES
 
 
@@ -33,3 +43,107 @@ class TestUtils(unittest.TestCase):
         world = get_file_name_from_url('https://hello/world')
 
         self.assertEqual(world, 'world')
+
+    def test_parse_species_option(self):
+        """Test parsing the species given to the command line."""
+        self.assertEqual(
+            ['Homo_sapiens', 'Mus_musculus', 'Rattus_norvegicus'],
+            parse_species_option(['Homo_sapiens,Mus_musculus', ' Rattus norvegicus']),
+        )
+        self.assertIsNone(parse_species_option(['Mus_musculus', 'all']))
+
+    def test_species_export_folder(self):
+        """Test that only non-human species are exported to a sub-folder."""
+        self.assertEqual('bel', get_species_export_folder('bel', 'Homo_sapiens'))
+        self.assertEqual(os.path.join('bel', 'Mus_musculus'), get_species_export_folder('bel', 'Mus_musculus'))
+
+    def test_statistics_cache(self):
+        """Test summarizing the statistics exported during the conversion."""
+        pathways_statistics = {
+            'R-HSA-1': {'name': 'Pathway 1', 'statistics': {'bel_vs_rdf': {'RDF nodes': 2, 'BEL imported nodes': 3}}},
+            'R-HSA-2': {'name': 'Pathway 2', 'statistics': {'bel_vs_rdf': {'RDF nodes': 1, 'BEL imported nodes': 1}}},
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'statistics.json')
+            export_statistics_cache(pathways_statistics, path)
+            self.assertEqual(pathways_statistics, load_statistics_cache(path))
+
+        global_statistics, all_pathways_statistics = summarize_statistics_cache(pathways_statistics)
+
+        self.assertEqual({'RDF nodes': 3, 'BEL imported nodes': 4}, global_statistics['bel_vs_rdf'])
+        self.assertEqual({'Pathway 1', 'Pathway 2'}, set(all_pathways_statistics))
+
+    def test_statistics_cache_key(self):
+        """Test that the statistics computed from another version of a resource file are not loaded."""
+        pathways_statistics = {'R-HSA-1': {'name': 'Pathway 1', 'statistics': {'bel_vs_rdf': {'RDF nodes': 2}}}}
+
+        with tempfile.TemporaryDirectory() as directory:
+            resource_file = os.path.join(directory, 'Homo_sapiens.owl')
+            with open(resource_file, 'w') as file:
+                file.write('release 1')
+
+            key = get_statistics_cache_key(resource_file)
+
+            path = os.path.join(directory, 'statistics.json')
+            export_statistics_cache(pathways_statistics, path, key)
+            self.assertEqual(pathways_statistics, load_statistics_cache(path, key))
+
+            with open(resource_file, 'w') as file:
+                file.write('release 2')
+
+            self.assertEqual({}, load_statistics_cache(path, get_statistics_cache_key(resource_file)))
+
+    def test_wikipathways_archive(self):
+        """Test reading the WikiPathways RDF files from the release archive."""
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'wikipathways-rdf-wp.zip')
+            with zipfile.ZipFile(archive_path, 'w') as archive:
+                archive.write(WP22, 'wp/Human/WP22.ttl')
+                archive.write(WP22, 'wp/Mus_musculus/WP1.ttl')
+                archive.writestr('wp/Human/README.txt', 'Not a pathway')
+
+            members = iterate_wikipathways_archive(archive_path, 'wp/Human', only_canonical=False)
+            self.assertEqual(['wp/Human/WP22.ttl'], members)
+
+            rdf_graph = parse_wikipathways_archive_member(archive_path, members[0])
+            self.assertLess(0, len(rdf_graph))
+
+    def test_canonical_pathways(self):
+        """Test filtering the canonical pathways with the identifiers stored next to the release archive."""
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'wikipathways-rdf-wp.zip')
+            with zipfile.ZipFile(archive_path, 'w') as archive:
+                archive.write(WP22, 'wp/Human/WP22.ttl')
+                archive.write(WP22, 'wp/Human/WP1.ttl')
+
+            canonical_pathways_path = get_canonical_pathways_path(archive_path)
+            self.assertEqual(os.path.join(directory, 'wikipathways-rdf-wp.canonical.json'), canonical_pathways_path)
+
+            export_canonical_pathways(['WP22'], canonical_pathways_path, 'wikipathways-rdf-wp.zip')
+            self.assertIsNone(load_canonical_pathways(canonical_pathways_path, 'wikipathways-other-rdf-wp.zip'))
+
+            # The database is not used if the identifiers of the release were already stored
+            members = iterate_wikipathways_archive(archive_path, 'wp/Human', connection='sqlite:////nonexistent/db')
+            self.assertEqual(['wp/Human/WP22.ttl'], members)
+
+    def test_wikipathways_release(self):
+        """Test that the folders a release is extracted to are named after their files."""
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'wikipathways-rdf-wp.zip')
+            with zipfile.ZipFile(archive_path, 'w') as archive:
+                archive.write(WP22, 'wp/Human/WP22.ttl')
+
+            self.assertEqual('wikipathways-rdf-wp.zip', get_wikipathways_release(archive_path))
+
+            folder = os.path.join(directory, 'Human')
+            os.makedirs(folder)
+            shutil.copy(WP22, folder)
+
+            release = get_wikipathways_release(folder)
+            self.assertTrue(release.startswith('Human@'))
+            self.assertEqual(release, get_wikipathways_release(folder))
+
+            # Another release extracted to the same folder
+            shutil.copy(WP22, os.path.join(folder, 'WP1.ttl'))
+            self.assertNotEqual(release, get_wikipathways_release(folder))
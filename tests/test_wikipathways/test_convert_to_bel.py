@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for building the reactions of nested WikiPathways interactions."""
+
+import unittest
+from unittest import mock
+
+from pathme.wikipathways import convert_to_bel
+from pybel import BELGraph
+from pybel.dsl import Reaction, abundance
+
+PREFIX = 'http://rdf.wikipathways.org/Pathway/WP0_r0/WP/Interaction/'
+
+
+def _get_interaction(identifier, participants):
+    return {
+        'uri_id': PREFIX + identifier,
+        'interaction_types': {'Conversion'},
+        'participants': participants,
+    }
+
+
+class TestReactions(unittest.TestCase):
+    """Tests for the reactions of interactions referring to other interactions."""
+
+    def setUp(self):
+        """Create a chain of interactions, each one consuming the reaction of the previous one."""
+        self.nodes = {
+            'a': abundance(namespace='CHEBI', name='a'),
+            'b': abundance(namespace='CHEBI', name='b'),
+        }
+        self.interactions = {
+            'i0': _get_interaction('i0', [('a', 'b')]),
+        }
+        for index in range(1, 20):
+            self.interactions[f'i{index}'] = _get_interaction(f'i{index}', [(PREFIX + f'i{index - 1}', 'b')])
+
+    def test_chain(self):
+        """Test that the reaction of each interaction is built once."""
+        graph = BELGraph()
+
+        with mock.patch.object(
+            convert_to_bel, 'get_reaction_node', wraps=convert_to_bel.get_reaction_node,
+        ) as get_reaction_node:
+            reactions = {}
+            for interaction in self.interactions.values():
+                convert_to_bel.add_edges(
+                    graph, interaction['participants'], self.nodes, self.interactions, interaction, reactions,
+                )
+
+        self.assertEqual(len(self.interactions), get_reaction_node.call_count)
+        self.assertEqual(len(self.interactions), graph.number_of_nodes() - len(self.nodes))
+
+        expected_reaction = Reaction(reactants=[self.nodes['a']], products=[self.nodes['b']])
+        for _ in range(1, 20):
+            expected_reaction = Reaction(reactants=[expected_reaction], products=[self.nodes['b']])
+        self.assertEqual(expected_reaction, reactions['i19'])
+
+    def test_cycle(self):
+        """Test that interactions referring to themselves do not recurse forever."""
+        self.interactions['i0']['participants'].append((PREFIX + 'i19', 'b'))
+
+        reaction = convert_to_bel.get_node(PREFIX + 'i19', self.nodes, self.interactions)
+        self.assertIsInstance(reaction, Reaction)
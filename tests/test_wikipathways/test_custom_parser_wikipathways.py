@@ -6,9 +6,10 @@ import unittest
 
 from pathme.wikipathways.json_rdf_parser import (
     generate_empty_pathway_graph, get_entry_attribute_value, get_entry_type, match_attribute, match_attribute_label,
-    match_entry, match_entry_type, parse_attributes, parse_id_uri, parse_namespace_uri, set_entry_attribute,
-    set_interaction,
+    match_entry, match_entry_type, parse_attributes, parse_id_uri, parse_namespace_uri, parse_pathway,
+    set_entry_attribute, set_interaction,
 )
+from tests.constants import WP22
 
 
 class TestWikiPathways(unittest.TestCase):
@@ -560,3 +561,19 @@ class TestWikiPathways(unittest.TestCase):
 
         self.assertEqual('interactions', interaction_type)
         self.assertEqual('nodes', node_type)
+
+    def test_parse_pathway(self):
+        """Test parsing a pathway walking the triples of the RDF file."""
+        graph = parse_pathway(WP22)
+
+        self.assertEqual(17, graph.number_of_nodes())
+        self.assertEqual(10, graph.number_of_edges())
+
+        self.assertEqual('IL-9 Signaling Pathway', graph.graph['graph_att']['title'])
+        self.assertEqual('en', graph.graph['graph_att']['language'])
+
+        self.assertEqual('STAT1', graph.nodes['6772']['hgnc.symbol'])
+        self.assertEqual('Entrez Gene', graph.nodes['6772']['source'])
+        self.assertIn('P42224', graph.nodes['6772']['uniprot'])
+
+        self.assertTrue(graph.has_edge('6772', '6772'))
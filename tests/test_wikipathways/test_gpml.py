@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for reading WikiPathways GPML files."""
+
+import unittest
+
+import rdflib
+
+from pathme.wikipathways import rdf_triples
+from pathme.wikipathways.gpml import get_gpml_file_identifier, get_gpml_pathway_components
+from pathme.wikipathways.utils import get_wikipathways_file_identifier
+from tests.constants import WP22, WP22_GPML, WP9999_GPML
+
+PREFIX = 'http://rdf.wikipathways.org/Pathway/WP9999_r1/'
+
+
+def _remove_bridgedb_xrefs(nodes):
+    """Remove the cross-references mapped with BridgeDb, except the one of the database of each node."""
+    return {
+        node_id: {
+            label: value
+            for label, value in node.items()
+            if not label.startswith('bdb_') or value == node['identifier']
+        }
+        for node_id, node in nodes.items()
+    }
+
+
+class TestGpml(unittest.TestCase):
+    """Tests for the GPML reader."""
+
+    def test_file_identifier(self):
+        """Test getting the pathway identifier from the file names."""
+        self.assertEqual(('WP22', '97775'), get_gpml_file_identifier(WP22_GPML))
+        self.assertEqual((None, None), get_gpml_file_identifier(WP22))
+        self.assertEqual('WP22', get_wikipathways_file_identifier(WP22_GPML))
+        self.assertEqual('WP22', get_wikipathways_file_identifier(WP22))
+
+    def test_same_components_as_rdf(self):
+        """Test that the GPML file gives the same components as the RDF file generated from it."""
+        rdf_graph = rdflib.Graph()
+        rdf_graph.parse(WP22, format='turtle')
+        rdf_nodes, rdf_complexes, rdf_interactions = rdf_triples.get_pathway_components(rdf_graph)
+
+        nodes, complexes, interactions, metadata = get_gpml_pathway_components(WP22_GPML)
+
+        self.assertEqual(_remove_bridgedb_xrefs(rdf_nodes), nodes)
+        self.assertEqual(rdf_complexes, complexes)
+        self.assertEqual(rdf_interactions, interactions)
+        self.assertEqual(rdf_triples.get_pathway_metadata(rdf_graph), metadata)
+
+    def test_components(self):
+        """Test reading complexes, interactions pointing to other interactions and nodes without cross-reference."""
+        with open(WP9999_GPML, 'rb') as file:
+            nodes, complexes, interactions, metadata = get_gpml_pathway_components(file.read(), 'WP9999', '1')
+
+        self.assertEqual(
+            {'CHEBI:17234', 'HMDB0001401', '3098', 'P01308', '3643', PREFIX + 'WP/DataNode/a0006'},
+            set(nodes),
+        )
+        self.assertEqual('CHEBI:17234', nodes['CHEBI:17234']['bdb_chebi'])
+        self.assertEqual({'DataNode', 'Metabolite'}, nodes['HMDB0001401']['node_types'])
+
+        self.assertEqual({'3643', 'P01308'}, complexes[PREFIX + 'Complex/c0001']['participants'])
+
+        # Interactions without arrow head or pointing to a label are left out
+        self.assertEqual({'i0001', 'i0002', 'i0003', 'i0004'}, set(interactions))
+        self.assertIn('Conversion', interactions['i0001']['interaction_types'])
+        self.assertEqual({('3098', PREFIX + 'WP/Interaction/i0001')}, interactions['i0002']['participants'])
+        self.assertEqual({(PREFIX + 'Complex/c0001', '3098')}, interactions['i0003']['participants'])
+        self.assertIn('Inhibition', interactions['i0004']['interaction_types'])
+
+        self.assertEqual('Test complexes and catalysis', metadata['title'])
+        self.assertEqual('unknown', metadata['description'])
+        self.assertEqual('http://identifiers.org/wikipathways/WP9999_r1', metadata['pathway_id'])
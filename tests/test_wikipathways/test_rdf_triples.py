@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the triple-walking WikiPathways extraction."""
+
+import os
+import unittest
+
+import rdflib
+
+from pathme.wikipathways import rdf_sparql, rdf_triples
+from tests.constants import WP_TEST_RESOURCES
+
+WP_TEST_FILES = sorted(
+    os.path.join(WP_TEST_RESOURCES, file_name)
+    for file_name in os.listdir(WP_TEST_RESOURCES)
+    if file_name.endswith('.ttl')
+)
+
+
+class TestRdfTriples(unittest.TestCase):
+    """Test that walking the triples gives the same results as the SPARQL queries."""
+
+    def test_same_components(self):
+        """Test the nodes, complexes, interactions and metadata of all the test pathways."""
+        functions = [
+            (rdf_sparql._get_nodes, rdf_triples.get_nodes),
+            (rdf_sparql._get_complexes, rdf_triples.get_complexes),
+            (rdf_sparql._get_interactions, rdf_triples.get_interactions),
+            (rdf_sparql._get_pathway_metadata, rdf_triples.get_pathway_metadata),
+        ]
+
+        for path in WP_TEST_FILES:
+            rdf_graph = rdflib.Graph()
+            rdf_graph.parse(path, format='turtle')
+
+            for sparql_function, triples_function in functions:
+                with self.subTest(pathway=os.path.basename(path), function=triples_function.__name__):
+                    self.assertEqual(sparql_function(rdf_graph), triples_function(rdf_graph))
+
+    def test_release_components(self):
+        """Test that the components extracted from a store with many pathways are the same as file by file."""
+        file_names = [os.path.basename(path) for path in WP_TEST_FILES]
+
+        release_graph, pathway_files = rdf_sparql._load_release_graph(file_names, WP_TEST_RESOURCES, archive=False)
+        self.assertEqual(set(file_names), set(pathway_files.values()))
+
+        for pathway, metadata, nodes, complexes, interactions in rdf_triples.iterate_pathways_components(
+            release_graph, pathway_files,
+        ):
+            rdf_graph = rdflib.Graph()
+            rdf_graph.parse(os.path.join(WP_TEST_RESOURCES, pathway_files[pathway]), format='turtle')
+
+            with self.subTest(pathway=pathway_files[pathway]):
+                self.assertEqual(rdf_triples.get_pathway_components(rdf_graph), (nodes, complexes, interactions))
+                self.assertEqual(rdf_triples.get_pathway_metadata(rdf_graph), metadata)
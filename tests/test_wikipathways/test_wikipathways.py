@@ -4,16 +4,30 @@
 
 import logging
 import os
+import shutil
 import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from bio2bel.testing import TemporaryConnectionMixin
 from bio2bel_hgnc import Manager as HgncManager
 from bio2bel_kegg.manager import Manager
-from pathme.utils import parse_rdf
-from pathme.wikipathways.rdf_sparql import _get_interactions, _get_nodes, wikipathways_to_bel
+from pathme.metrics import collect_resolution_metrics
+from pathme.resolver import get_thread_safe_manager, release_thread_session
+from pathme.utils import export_statistics_cache, load_statistics_cache, parse_rdf, summarize_statistics_cache
+from pathme.wikipathways import rdf_sparql
+from pathme.wikipathways.rdf_sparql import (
+    _get_interactions, _get_nodes, get_wp_statistics, load_files_statistics, remove_deleted_pathways,
+    remove_outdated_statistics, wikipathways_release_to_pickles, wikipathways_species_to_pickles, wikipathways_to_bel,
+    wikipathways_to_pickles,
+)
+from pathme.wikipathways.utils import (
+    get_manifest_path, get_wikipathways_species, get_wikipathways_species_files, load_manifest,
+)
 from pybel import BELGraph
 from pybel_tools.summary.edge_summary import count_relations
-from tests.constants import WP1871, WP22, WP2359, WP2799, WP706
+from tests.constants import WP1871, WP22, WP2359, WP2799, WP706, WP_TEST_RESOURCES
 
 logger = logging.getLogger(__name__)
 
@@ -96,3 +110,228 @@ class TestWikipathways(WikipathwaysTest):
 
         self.assertEqual(test_graph.summary_dict()['Number of Nodes'], 11)
         self.assertEqual(test_graph.summary_dict()['Number of Edges'], 10)
+
+    def test_threads(self):
+        """Test that pathways are converted concurrently by threads sharing the same manager."""
+        paths = [WP22, WP706, WP1871, WP2799] * 3
+
+        def _get_graph_key(graph: BELGraph):
+            return sorted(map(str, graph)), sorted((str(u), str(v)) for u, v in graph.edges())
+
+        hgnc_manager = get_thread_safe_manager(self.hgnc_manager)
+
+        def _convert(path: str):
+            try:
+                return _get_graph_key(wikipathways_to_bel(path, hgnc_manager))
+            finally:
+                release_thread_session(hgnc_manager)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            graph_keys = list(executor.map(_convert, paths))
+
+        for path, graph_key in zip(paths, graph_keys):
+            self.assertEqual(_get_graph_key(wikipathways_to_bel(path, self.hgnc_manager)), graph_key)
+
+    def test_resolution_metrics(self):
+        """Test that the resolution of the gene identifiers of a pathway is recorded."""
+        collect_resolution_metrics()
+        wikipathways_to_bel(WP22, self.hgnc_manager)
+        metrics = collect_resolution_metrics()
+
+        self.assertEqual(17, metrics.lookups['get_gene_by_hgnc_symbol'])
+
+        # The test database only has a few genes, none of them in this pathway
+        self.assertEqual({'HGNC': {'resolved': 0, 'unresolved': 17}}, metrics.to_dict()['resolutions'])
+        self.assertEqual(
+            {'http://identifiers.org/wikipathways/WP22_r97775'},
+            set(metrics.unresolved_identifiers['HGNC']['STAT3']),
+        )
+
+    def test_resolution_metrics_pools(self):
+        """Test that the metrics of the workers of pools created one after the other are only counted once."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        def export(export_folder, processes):
+            export_folder = os.path.join(folder, export_folder)
+            os.makedirs(export_folder)
+            wikipathways_to_pickles(
+                ['WP22.ttl', 'WP2359_mod.ttl'], WP_TEST_RESOURCES, self.hgnc_manager, export_folder,
+                processes=processes, connection=self.connection,
+            )
+
+        collect_resolution_metrics()
+        export('sequential', 1)
+        unresolved = collect_resolution_metrics().unresolved
+
+        export('first', 2)
+        export('second', 2)
+        pools_unresolved = collect_resolution_metrics().unresolved
+
+        self.assertEqual({'HGNC': 18}, unresolved)
+        self.assertEqual({'HGNC': 2 * 18}, pools_unresolved)
+
+    def test_statistics_cache(self):
+        """Test computing the statistics of each pathway during the conversion."""
+        export_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_folder)
+        statistics_path = os.path.join(export_folder, 'statistics.json')
+
+        resource_files = ['WP22.ttl', 'WP2359_mod.ttl']
+
+        # Pathways exported without statistics are converted again to get them
+        wikipathways_to_pickles(resource_files[:1], WP_TEST_RESOURCES, self.hgnc_manager, export_folder)
+        wikipathways_to_pickles(
+            resource_files, WP_TEST_RESOURCES, self.hgnc_manager, export_folder, statistics_path=statistics_path,
+        )
+
+        pathways_statistics = load_statistics_cache(statistics_path)
+        self.assertEqual({'WP22', 'WP2359_mod'}, set(pathways_statistics))
+
+        self.assertEqual(
+            get_wp_statistics(resource_files, WP_TEST_RESOURCES, self.hgnc_manager),
+            summarize_statistics_cache(pathways_statistics),
+        )
+
+        # Only the statistics of the listed files are used, and only if all of them have statistics of their format
+        self.assertEqual(
+            {'WP22'}, set(load_files_statistics(resource_files[:1], WP_TEST_RESOURCES, statistics_path)),
+        )
+        self.assertIsNone(load_files_statistics(resource_files + ['WP1871.ttl'], WP_TEST_RESOURCES, statistics_path))
+        self.assertIsNone(load_files_statistics(resource_files, WP_TEST_RESOURCES, statistics_path, fmt='gpml'))
+
+    def test_incremental_update(self):
+        """Test converting only the pathways that changed since the last conversion."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        resource_folder = os.path.join(folder, 'wp')
+        export_folder = os.path.join(folder, 'bel')
+        manifest_path = get_manifest_path(export_folder)
+        statistics_path = os.path.join(folder, 'statistics.json')
+        os.makedirs(resource_folder)
+        os.makedirs(export_folder)
+
+        shutil.copy(WP22, resource_folder)
+        shutil.copy(WP2359, resource_folder)
+
+        def update(resource_files, statistics=False):
+            with mock.patch.object(
+                rdf_sparql, '_export_wikipathways_file', wraps=rdf_sparql._export_wikipathways_file,
+            ) as export_wikipathways_file:
+                wikipathways_to_pickles(
+                    resource_files, resource_folder, self.hgnc_manager, export_folder, manifest_path=manifest_path,
+                    statistics_path=statistics_path if statistics else None,
+                )
+
+            return export_wikipathways_file.call_count
+
+        self.assertEqual(2, update(['WP22.ttl', 'WP2359_mod.ttl'], statistics=True))
+        self.assertEqual({'WP22', 'WP2359_mod'}, set(load_manifest(manifest_path)))
+
+        self.assertEqual(0, update(['WP22.ttl', 'WP2359_mod.ttl']))
+
+        # A pathway changed and another one is not in the release anymore
+        with open(os.path.join(resource_folder, 'WP2359_mod.ttl'), 'a') as file:
+            file.write('\n# Next revision\n')
+
+        self.assertEqual(1, update(['WP2359_mod.ttl']))
+
+        # The statistics of the pathway converted again without statistics are not the ones of its file anymore
+        self.assertIsNone(load_files_statistics(['WP22.ttl', 'WP2359_mod.ttl'], resource_folder, statistics_path))
+        self.assertEqual(['WP2359_mod'], remove_outdated_statistics(manifest_path, statistics_path))
+        self.assertEqual({'WP22'}, set(load_statistics_cache(statistics_path)))
+
+        self.assertEqual(1, update(['WP22.ttl', 'WP2359_mod.ttl'], statistics=True))
+        self.assertIsNotNone(load_files_statistics(['WP22.ttl', 'WP2359_mod.ttl'], resource_folder, statistics_path))
+
+        # Pathways left out of a conversion are kept until they are not in the release anymore
+        self.assertEqual({'WP22', 'WP2359_mod'}, set(load_manifest(manifest_path)))
+        self.assertEqual({'WP22.pickle', 'WP2359_mod.pickle'}, set(os.listdir(export_folder)))
+
+        export_statistics_cache({'WP22': {}, 'WP2359_mod': {}}, statistics_path)
+
+        self.assertEqual(
+            ['WP22'],
+            remove_deleted_pathways(['WP2359_mod.ttl'], export_folder, manifest_path, statistics_path),
+        )
+        self.assertEqual({'WP2359_mod'}, set(load_manifest(manifest_path)))
+        self.assertEqual(['WP2359_mod.pickle'], os.listdir(export_folder))
+        self.assertEqual({'WP2359_mod'}, set(load_statistics_cache(statistics_path)))
+
+    def test_release_skipped_files(self):
+        """Test that the files without a pathway are not converted again by the release engine until they change."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        resource_folder = os.path.join(folder, 'wp')
+        export_folder = os.path.join(folder, 'bel')
+        manifest_path = get_manifest_path(export_folder)
+        os.makedirs(resource_folder)
+        os.makedirs(export_folder)
+
+        shutil.copy(WP22, resource_folder)
+        with open(os.path.join(resource_folder, 'WP1.ttl'), 'w') as file:
+            file.write('@prefix wp: <http://vocabularies.wikipathways.org/wp#> .\n')
+
+        def update():
+            with mock.patch.object(
+                rdf_sparql, '_load_release_graph', wraps=rdf_sparql._load_release_graph,
+            ) as load_release_graph:
+                wikipathways_release_to_pickles(
+                    ['WP1.ttl', 'WP22.ttl'], resource_folder, self.hgnc_manager, export_folder,
+                    manifest_path=manifest_path,
+                )
+
+            return load_release_graph.call_count
+
+        self.assertEqual(1, update())
+        self.assertEqual(['WP22.pickle'], os.listdir(export_folder))
+        self.assertTrue(load_manifest(manifest_path)['WP1']['skipped'])
+
+        self.assertEqual(0, update())
+
+    def test_species(self):
+        """Test converting the pathways of many species of the release archive in one job."""
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+
+        archive_path = os.path.join(folder, 'wikipathways-rdf-wp.zip')
+        export_folder = os.path.join(folder, 'bel')
+
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.write(WP22, 'wp/Human/WP22.ttl')
+            archive.write(WP2359, 'wp/Mus_musculus/WP2359_mod.ttl')
+
+        self.assertEqual(['Homo_sapiens', 'Mus_musculus'], get_wikipathways_species(archive_path))
+
+        species_files = get_wikipathways_species_files(archive_path, only_canonical=False)
+        self.assertEqual(
+            {'Homo_sapiens': ['wp/Human/WP22.ttl'], 'Mus_musculus': ['wp/Mus_musculus/WP2359_mod.ttl']},
+            species_files,
+        )
+
+        with mock.patch.object(
+            rdf_sparql, '_export_wikipathways_file', wraps=rdf_sparql._export_wikipathways_file,
+        ) as export_wikipathways_file:
+            wikipathways_species_to_pickles(
+                species_files, archive_path, self.hgnc_manager, export_folder,
+                manifest_paths={
+                    species: get_manifest_path(export_folder, species)
+                    for species in species_files
+                },
+            )
+
+        # Only human genes are looked up in HGNC
+        hgnc_managers = {
+            call[0][0]: call[0][3]
+            for call in export_wikipathways_file.call_args_list
+        }
+        self.assertEqual(
+            {'wp/Human/WP22.ttl': self.hgnc_manager, 'wp/Mus_musculus/WP2359_mod.ttl': None},
+            hgnc_managers,
+        )
+
+        self.assertTrue(os.path.exists(os.path.join(export_folder, 'WP22.pickle')))
+        self.assertTrue(os.path.exists(os.path.join(export_folder, 'Mus_musculus', 'WP2359_mod.pickle')))
+        self.assertEqual({'WP2359_mod'}, set(load_manifest(get_manifest_path(export_folder, 'Mus_musculus'))))